@@ -15,13 +15,14 @@ __name__ = "edit_container"
 
 # Library Imports
 from timeit import default_timer
-import random
 import PIL
 from PIL import Image
 import math
+import numpy
 
 # Local Imports
 import hypnic_helpers
+import hypnic_random
 
 
 class EditContainer():
@@ -42,6 +43,10 @@ class EditContainer():
 
         self.defaultScaleResampleMode = PIL.Image.LANCZOS
 
+        # How many times randomizePixelColors() has been called, which is the frame number within the keys of the random
+        #   streams it draws from (see hypnic_random), so that each call gets different values but a run can be repeated
+        self.randomizeCalls = 0
+
     # Resizes an image, preserving aspect ratio
     # o is the index of the target image slot for output, within the ImageContainer's pilImages list
     # i is the index of the image to be used for input
@@ -213,17 +218,34 @@ class EditContainer():
         # TODO: Look into PIL Image methods like load() and close(), test whether file saving+loading is needed, etc
         # TODO: Add some sort of invariant to ensure that pilImagesTemp is empty?
         self.gui.img.pilImagesTemp = [self.gui.img.pilImages[i].copy()]
-        pixelsEdit = self.gui.img.pilImagesTemp[0].load()
         # The X and Y resolutions of the current element within ImageContainer.pilImages
         xRes = self.gui.img.pilImages[i].size[0]
         yRes = self.gui.img.pilImages[i].size[1]
-        # Iterates through each row and column of the image, manipulating pixels accordingly
-        for row in range(yRes):
-            for col in range(xRes):
-                if random.random() <= ratio:
-                    pixelsEdit[col, row] = hypnic_helpers.getRandomRGB(self.gui.stateObj.chPrimaryOutputRedChannel.get(),
-                                                                       self.gui.stateObj.chPrimaryOutputGreenChannel.get(),
-                                                                       self.gui.stateObj.chPrimaryOutputBlueChannel.get())
+        region = (0, 0, xRes, yRes)
+
+        # Draws whole planes of random values at once, from streams keyed by (call, variant), where variant 0 decides
+        #   which pixels are changed and variant 1 gives their new colors
+        frame = self.randomizeCalls
+        self.randomizeCalls += 1
+        chosen = hypnic_random.randomPlane((frame, 0), region) <= ratio
+        colors = hypnic_random.randomRGBPlane((frame, 1), region,
+                                              self.gui.stateObj.chPrimaryOutputRedChannel.get(),
+                                              self.gui.stateObj.chPrimaryOutputGreenChannel.get(),
+                                              self.gui.stateObj.chPrimaryOutputBlueChannel.get())
+
+        imageEdit = self.gui.img.pilImagesTemp[0]
+        if imageEdit.mode in ("RGB", "RGBA"):
+            rgbArray = numpy.array(imageEdit)
+            rgbArray[chosen, :3] = colors[chosen]
+            # Writing an R/G/B color to an RGBA pixel makes it fully opaque
+            if imageEdit.mode == "RGBA":
+                rgbArray[chosen, 3] = 255
+            self.gui.img.pilImagesTemp[0] = Image.fromarray(rgbArray, imageEdit.mode)
+        else:
+            # Iterates through each row and column of the image, manipulating pixels accordingly
+            pixelsEdit = imageEdit.load()
+            for row, col in zip(*numpy.nonzero(chosen)):
+                pixelsEdit[int(col), int(row)] = tuple(int(c) for c in colors[row, col])
 
         # Updates the relevant ImageTk PhotoImage and GUI Image Label
         self.gui.img.updateImageLabel(o)
@@ -5,7 +5,27 @@ import random
 from tkinter import *
 from PIL import Image, ImageTk
 import PIL
-import imageio
+import numpy
+# Local Imports
+import hypnic_animation
+import hypnic_apng
+import hypnic_bands
+import hypnic_frames
+import hypnic_gif
+import hypnic_helpers
+import hypnic_luts
+import hypnic_operations
+import hypnic_quantize
+import hypnic_tiles
+import hypnic_vectorized
+import hypnic_video
+import hypnic_webp
+import hypnic_writer
+# Numba is only required when EXECUTION_BACKEND is "numba"
+try:
+    import hypnic_numba
+except ImportError:
+    hypnic_numba = None
 # VIDEO FUNCTIONALITY PLANNED FOR FUTURE
 #import cv2
 # THREADING FUNCTIONALITY PLANNED FOR FUTURE (https://pythonprogramming.net/threading-tutorial-python/)
@@ -51,14 +71,43 @@ ENABLE_GUI = False
 # Whether or not the image should be manipulated at all
 # Can be disabled, for example, in situations when non-manipulation functionality is being tested
 MANIPULATE_IMAGE = True
-# If STOP_MANIPULATING_AFTER is set to 0 or below then all manipulations define in rgbFunc() will be performed
+# If STOP_MANIPULATING_AFTER is set to 0 or below then all manipulations within MANIPULATIONS will be performed
 # If it is set to a positive integer then no manipulation with a higher index than STOP_MANIPULATING_AFTER will be done
 STOP_MANIPULATING_AFTER = 2
+# The manipulations applied during each round, in order. The first of them has a manip_index of 1, the second 2, etc.
+# See hypnic_operations.py for every available manipulation, and what each of them declares about itself
+MANIPULATIONS = [
+    hypnic_operations.averageOfNeighbors(2),
+    hypnic_operations.mostFrequentNeighbor(3),
+    hypnic_operations.averageOfNeighbors(2),
+    hypnic_operations.mostFrequentNeighbor(2),
+    hypnic_operations.saturationShift(-0.3),
+    hypnic_operations.averageOfNeighbors(4),
+    hypnic_operations.mostFrequentNeighbor(4),
+    hypnic_operations.customDomainRGB((2, 2, 2), (127, 127, 127), (128, 128, 128), (19, 39, 29), (0, 0, 0),
+                                      (32, 32, 32), (1, 1, 1)),
+    hypnic_operations.hueShiftByCoordinates(),
+    hypnic_operations.averageOfNeighbors(4),
+]
 # Path to the image used as program input
 INPUT_IMG = "github-profile-image.png"
 # Path at which the resulting image will be saved
 OUTPUT_IMG = "output\\outputLEAN1"
 OUTPUT_IMG_EXTENSION = ".jpg"
+# Extra settings for the encoder of each output image, passed on to PIL.Image.save()
+# For example {"quality": 90} for a JPEG, or {"compress_level": 1} for a PNG which is written much more quickly (but
+#     is larger) than with the default compress_level of 6
+OUTPUT_IMG_SAVE_PARAMETERS = {}
+# Whether each output image should be encoded and saved on a background thread (see hypnic_writer.py), so that the next
+#     manipulation can start as soon as a copy of the image has been taken, instead of waiting for it to be written
+# Every image is guaranteed to have been written by the time ImageManipulator.manipulate() returns
+WRITE_OUTPUT_IN_BACKGROUND = True
+# The number of threads output images are written on, when WRITE_OUTPUT_IN_BACKGROUND is True
+OUTPUT_WRITER_WORKERS = 2
+# The most output images which may be waiting to be written at once, when WRITE_OUTPUT_IN_BACKGROUND is True
+# Once this many are waiting, manipulation pauses until one of them has been written, which limits the memory used by
+#     the copies of the image that are waiting
+OUTPUT_WRITER_MAX_PENDING = 4
 # Whether every manipulation pass should cover a random range of the image (as opposed to the entire frame)
 RANDOMIZE_MANIPULATION_POSITIONS = False
 # If randomizing manipulation positions, defines the minimum and maximum boundary positions for a manipulation area
@@ -73,9 +122,9 @@ RANDOM_MIN_X_DIM = 0.5
 RANDOM_MAX_X_DIM = 0.9
 RANDOM_MIN_Y_DIM = 0.5
 RANDOM_MAX_Y_DIM = 0.9
-# If True, then each generated image from sequential values of manip_index in ImageManipulator.rgbFunc() will be
-#     applied to the output of the previous call of ImageManipulator.rgbFunc()
-# If False, then each generated image from sequential values of manip_index in ImageManipulator.rgbFunc() will be
+# If True, then each generated image from sequential values of manip_index within MANIPULATIONS will be
+#     applied to the output of the previous manipulation
+# If False, then each generated image from sequential values of manip_index within MANIPULATIONS will be
 #     applied to the input image, effectively causing zero interaction between different manip_index values
 MANIPULATE_PREVIOUS_OUTPUT = True
 # How many times to repeat the entire image manipulation process
@@ -84,21 +133,143 @@ MANIPULATE_PREVIOUS_OUTPUT = True
 # In the case where MANIPULATE_PREVIOUS_OUTPUT == False, then this isn't a useful variable as it just creates copies
 #     of images that have already been created
 NUM_ROUNDS_OF_MANIPULATION = 1
-# Determines whether to use the manipulation order as listed in rgb(func) or to randomize the order
+# Determines whether to use the manipulation order as listed in MANIPULATIONS or to randomize the order
 RANDOM_MANIPULATION_ORDER = False
+# Determines how each manipulation is carried out. Options available are as follows
+# "python": ImageManipulator.rgbFunc() is called separately for every pixel
+# "numpy": Manipulations which have a whole-frame version within ImageManipulator.rgbFuncArray() are applied to the
+#     entire manipulation area at once as array operations, producing the exact same output as "python"
+#     Any manipulation without a whole-frame version falls back to the "python" approach
+# "numba": Manipulations which have a compiled version within ImageManipulator.rgbFuncNumba() are run as compiled
+#     loops split across every CPU core, producing the exact same output as "python". This includes the neighborhood
+#     functions and the coordinate-dependent ones. Anything else falls back to "numpy" and then to "python"
+#     Requires the numba package, and the very first run compiles every function (cached afterwards)
+EXECUTION_BACKEND = "numpy"
+# Whether ImageManipulator.setToAverageOfNeighbors() (and its whole-frame versions) should look each average up from a
+#     summed-area table of the reference image, taking the same time per pixel no matter how large searchDistance is
+# The table is built once and reused by every call until the reference image changes
+# Only used where the result is guaranteed to be identical to summing every neighbor directly, meaning whenever
+#     positiveOnly is True, MANIPULATE_PREVIOUS_OUTPUT is False, or NEIGHBORHOOD_FEEDBACK is False
+USE_SUMMED_AREA_TABLES = True
+# Whether neighborhood manipulations with positiveOnly=False (such as hypnic_operations.averageOfNeighbors(4, False))
+#     read the pixels which were already rewritten earlier in the same pass, when MANIPULATE_PREVIOUS_OUTPUT is True
+# True: Each pixel reads the image as it is at that moment, so colors are smeared along the order in which pixels are
+#     visited (rows top to bottom, each row left to right). Every pixel depends on the ones before it, so such a pass
+#     can't be split into tiles or bands (see TILE_EXECUTOR and OUT_OF_CORE). The "numba" backend reproduces it exactly
+#     with compiled single-core sweeps, while "numpy" falls back to the "python" approach
+# False: Each pass reads from a copy of the image taken before it started and writes to the image itself (ping-pong,
+#     or double-buffering), so every pixel is independent and any backend, TILE_EXECUTOR, or OUT_OF_CORE may be used
+# Manipulations with positiveOnly=True never read a rewritten pixel, so they give the same output either way
+NEIGHBORHOOD_FEEDBACK = True
+# Whether whole-frame manipulations which only depend on each pixel's own color (such as modSaturationShift()) should
+#     be baked into a 3D lookup table holding the result for every possible color, and then applied with a single
+#     lookup per pixel (see hypnic_luts.py). Tables are kept for the rest of the run, keyed by function and parameters
+# A table is only baked when it will pay for itself: when the manipulation area has at least as many pixels as the
+#     table has entries, or when COLOR_LUT_DIRECTORY is set (so that later runs can reuse it)
+# Palette matching manipulations (see hypnic_operations.limitColors()) are never baked, as every color list would need a
+#     table of its own
+USE_COLOR_LUTS = True
+# The number of entries along each axis of the lookup tables. 256 gives results identical to manipulating every pixel
+# Smaller sizes such as 33 or 65 are baked far more quickly but interpolate between entries, so the results are no
+#     longer identical to those of every other option. They're only used for manipulations whose result changes
+#     smoothly along with a pixel's color (see hypnic_operations.ColorOperation), such as hueShift() and the R/G/B
+#     rotations, which stay within a few values of the exact result. Anything else, such as the S and V shifts (whose
+#     values wrap around from 1 to 0), always uses tables of size 256
+COLOR_LUT_SIZE = 256
+# Path to a directory in which baked lookup tables are saved, to be reused by any later run with the same manipulations
+#     (such as when running the same settings over a whole batch of images). Set to None to never save them
+COLOR_LUT_DIRECTORY = None
+# Whole-frame manipulations which only depend on each pixel's own color are applied to each distinct color of the image
+#     just once (and the results copied to every pixel of that color) whenever the number of distinct colors divided by
+#     the number of pixels is estimated to be at or below this value. Set to 0 to never do so
+# Also used by the per-pixel ImageManipulator.limitColorsBy*() functions, which remember the result for each color
+UNIQUE_COLOR_RATIO_THRESHOLD = 0.25
+# Whether each run of consecutive manipulations which only depend on each pixel's own color (such as
+#     modSaturationShift()) should be applied as a single pass, reading and writing the image once for the whole run
+#     (see hypnic_operations.FusedColorOperation). Whole-frame passes apply a single composite function, or a single
+#     lookup table composed from the table of each manipulation, and the output is identical to applying them one by one
+# Only one output image is rendered for each run, so runs are never fused when the image after every manipulation is
+#     needed (CREATE_GIF, CREATE_VIDEO, CREATE_WEBP or CREATE_APNG is True). They're also never fused when
+#     MANIPULATE_PREVIOUS_OUTPUT is False or RANDOMIZE_MANIPULATION_POSITIONS is True, as each manipulation then reads
+#     from or covers a different image area
+FUSE_COLOR_MANIPULATIONS = True
+# Whether (and how) each manipulation pass should be split into tiles which are manipulated in parallel
+# None: Every pass is applied as described by EXECUTION_BACKEND, without any splitting
+# "thread": Whole-frame "numpy" manipulations are split between a pool of threads, which share the same copy of the
+#     image. Has no effect on manipulations which fall back to the "python" approach, as those never release the GIL
+# "process": Manipulations which fall back to the "python" approach are split between a pool of processes, each of
+#     which calls ImageManipulator.rgbFunc() for the pixels of its own tiles
+# Only manipulations given a footprint by ImageManipulator.manipulationFootprint() are split, and the output is
+#     identical to that of an unsplit pass. "numba" manipulations are never split, as they already use every CPU core
+TILE_EXECUTOR = None
+# The width and height (in pixels) of each tile, when TILE_EXECUTOR is not None
+TILE_SIZE = 256
+# The number of threads or processes used when TILE_EXECUTOR is not None. Set to 0 to use one per CPU core
+TILE_WORKERS = 0
+# Whether to keep the working copies of the image in memory-mapped raw files within OUT_OF_CORE_DIRECTORY, instead of
+#     decoding the image into memory three times over, and to manipulate them OUT_OF_CORE_BAND_ROWS rows at a time
+# Intended for images that are too large to otherwise fit in memory. Each band is manipulated by the whole-frame version
+#     of a manipulation for EXECUTION_BACKEND (where "python" is treated as "numpy"), or else by its "numba" version
+#     (when numba is installed), or else by its per-pixel version (see ImageManipulator.rgbFuncBand())
+# Only manipulations with a footprint (see ImageManipulator.manipulationFootprint()) can be split into bands, and any
+#     others stop the program with an error rather than being skipped
+OUT_OF_CORE = False
+# The number of rows manipulated at a time when OUT_OF_CORE is True, which determines how much memory is used
+OUT_OF_CORE_BAND_ROWS = 256
+# Path to the directory in which the memory-mapped files are kept when OUT_OF_CORE is True
+OUT_OF_CORE_DIRECTORY = "output\\buffers"
 
 # GIF/VIDEO-RELATED VARIABLES
-# VIDEO RENDERING FUNCTIONALITY HAS NOT YET BEEN COMPLETED
 # Whether or not to generate an animated GIF from all rendered images
 CREATE_GIF = False
 # Whether or not to generate a video from all rendered images
+# Requires the imageio-ffmpeg package, which comes with its own copy of ffmpeg (see hypnic_video.py)
 CREATE_VIDEO = False
 # Path at which the resulting animated GIF will be saved, if CREATE_GIF = True
 GIF_PATH = "output\\outputLEAN1.gif"
+# Whether or not to generate an animated WebP from all rendered images, which (unlike a GIF) keeps every color of every
+#     frame, so no palette has to be built or applied. Requires PIL to have been built with WebP support
+CREATE_WEBP = False
+# Whether or not to generate an animated PNG from all rendered images, which also keeps every color of every frame
+CREATE_APNG = False
+# Path at which the resulting animated WebP will be saved, if CREATE_WEBP = True
+WEBP_PATH = "output\\outputLEAN1.webp"
+# Path at which the resulting animated PNG will be saved, if CREATE_APNG = True
+APNG_PATH = "output\\outputLEAN1.png"
+# How much effort libwebp spends on making the animated WebP smaller, which never changes the frames themselves
+# WEBP_METHOD is between 0 (fastest) and 6 (smallest), and WEBP_EFFORT is between 0 and 100
+WEBP_METHOD = 0
+WEBP_EFFORT = 50
+# How much each frame of the animated PNG is compressed, between 0 (fastest) and 9 (smallest)
+APNG_COMPRESS_LEVEL = 6
 # Path at which the resulting video will be saved, if CREATE_VIDEO = True
-VIDEO_PATH = "output\\video2.avi"
+# Repeated frames are only collapsed for containers with per-frame timestamps, such as .mp4 or .mkv
+VIDEO_PATH = "output\\video2.mp4"
+# The number of frames of the video shown per second, where every repeat of an image (see
+#     VIDEO_FRAMES_PER_IMAGE_FORWARD) counts as a frame
+VIDEO_FRAMES_PER_SECOND = 5
+# The name of the ffmpeg encoder used for the video, such as "libx264", or None to use the default for VIDEO_PATH
+VIDEO_CODEC = "libx264"
+# The quality of the video, between 0 and 10 (where 10 is the best), or None to leave it to the encoder
+VIDEO_QUALITY = 5
 # The number of seconds for which each frame of the GIF will be displayed
+# Also used by the animated WebP and PNG, along with GIF_FRAMES_PER_IMAGE_FORWARD and GIF_FRAMES_PER_IMAGE_REVERSE
 GIF_SECONDS_PER_FRAME = 0.2
+# How the colors of each GIF frame are reduced to the 256 colors that a GIF can show. Options available are as follows
+# "frame": The area of each frame which changed is given its own palette (see hypnic_gif.py)
+# "global": One palette is built from a sample of the pixels of every frame and shared by all of them, and each frame is
+#     then remapped to it (see hypnic_quantize.py). Colors no longer flicker between the frames of a crossfade
+GIF_PALETTE_MODE = "global"
+# The number of pixels (taken evenly from every frame) that the global palette is built from
+GIF_PALETTE_SAMPLES = 262144
+# The number of passes of k-means used to refine the global palette after median cut. 0 uses median cut alone
+GIF_PALETTE_KMEANS = 0
+# How far (in R/G/B values, in either direction) an ordered dither may nudge each pixel before it's remapped to the
+#     global palette, which trades banding for a fine regular pattern. Set to 0 to never dither
+GIF_DITHER_STRENGTH = 0
+# The number of processes frames are remapped to the global palette on. Set to 0 to use one per CPU core
+# With only one (whether set to 1 or on a single-core machine), frames are remapped without starting any processes
+GIF_REMAP_WORKERS = 0
 # Whether or not to play the animation (GIF/video) frames in reverse when the end is reached, transitioning back to the
 #     original source image instead of abruptly jumping right back to the start
 REVERSE_ANIMATION_AT_END = True
@@ -115,6 +286,26 @@ VIDEO_FRAMES_PER_IMAGE_FORWARD = 1
 VIDEO_FRAMES_PER_IMAGE_REVERSE = 1
 # The total number of frames to use in a input-to-final-output transition GIF (for example, GIF_MODE values 1/2/3)
 ANIMATION_NUM_TRANSITION_FRAMES = 20
+# The most bytes of animation frames which are kept in memory (see hypnic_frames.py). Any frames beyond that are
+#     spilled to raw files within FRAME_STORE_DIRECTORY, so the length of an animation isn't limited by memory
+# Set to None to keep every frame in memory
+FRAME_STORE_MEMORY_BUDGET = 1024 * 1024 * 1024
+# Path to the directory in which animation frames beyond FRAME_STORE_MEMORY_BUDGET are kept
+FRAME_STORE_DIRECTORY = "output\\frames"
+# Whether (and how) the frames of the transition animations (animation modes 1/2/3) should be rendered in parallel
+# Each frame is built on its own from the input and final output images (see hypnic_animation.py), and frames are
+#     always added to the animation in order, no matter which of them finishes first
+# None: Every frame is rendered one after another
+# "thread": Frames are rendered on a pool of threads, which share the same copy of the input and final output images
+# "process": Frames are rendered on a pool of processes, which are each given a copy of the input and final output
+#     images when they start, but have to copy every frame they render back
+ANIMATION_EXECUTOR = "thread"
+# The number of threads or processes used when ANIMATION_EXECUTOR is not None. Set to 0 to use one per CPU core
+# With only one (whether set to 1 or on a single-core machine), frames are rendered one after another
+ANIMATION_WORKERS = 0
+# Whether the frames of the transition animations (animation modes 1/2/3) should also be saved as output images
+# They're always kept as frames for the animation itself, so saving them isn't needed to create a GIF
+SAVE_ANIMATION_FRAMES = False
 
 
 # TODO: This Window class and the entire GUI within hypnic1.py are completely deprecated. I need to eventually
@@ -277,9 +468,9 @@ class Window(Frame):
                 # Checks if the video has already been created
                 if not self.manipulator.videoReady:
                     # Tell the ImageManipulator object to perform the video creation routine
-                    text = Label(self, text="Video generation has not yet been implemented!")
+                    text = Label(self, text="Generating the video... Please wait!")
                     text.pack()
-                    self.manipulator.generateGIF()
+                    self.manipulator.generateVideo()
                 else:
                     text = Label(self, text="Video has already been created!")
                     text.pack()
@@ -292,16 +483,23 @@ class Window(Frame):
 # Container class for holding all variables and functions related to manipulation of images
 class ImageManipulator:
 
-    def __init__(self):
+    # inputImage may be given to manipulate an existing Image instead of the one at INPUT_IMG, in which case no output
+    #     directories are prepared (this is how the workers used by TILE_EXECUTOR = "process" are created)
+    def __init__(self, inputImage=None):
 
         # MEMBER VARIABLES UPON INITIALIZATION
-        # The image to modify
-        self.imageIn = Image.open(INPUT_IMG)
-        # A copy of the input image to which the functions are applied
-        self.imageOut = Image.open(INPUT_IMG)
-        # A copy of the most recently saved output image, used for reference when using information
-        #   from multiple pixels at once
-        self.imageReference = Image.open(INPUT_IMG)
+        if inputImage is None:
+            # The image to modify
+            self.imageIn = Image.open(INPUT_IMG)
+            # A copy of the input image to which the functions are applied
+            self.imageOut = Image.open(INPUT_IMG)
+            # A copy of the most recently saved output image, used for reference when using information
+            #   from multiple pixels at once
+            self.imageReference = Image.open(INPUT_IMG)
+        else:
+            self.imageIn = inputImage
+            self.imageOut = inputImage.copy()
+            self.imageReference = inputImage.copy()
         # The X resolution of self.imageIn
         self.xRes = self.imageIn.size[0]
         # The Y resolution of self.imageIn
@@ -314,13 +512,20 @@ class ImageManipulator:
         self.currentImageIndex = 1
         # List of file paths of all rendered images
         self.outputFileList = []
-        # An array of pixels representing the input image. Used for reference but never modified.
-        self.pixelsIn = self.imageIn.load()
-        # An array of pixels representing the output image. Initialized identical to self.pixelsIn
-        # Modified over time while iterating through rows/columns. Should not be used for reference.
-        self.pixelsOut = self.imageOut.load()
-        # An array of pixels representing the reference image
-        self.pixelsReference = self.imageReference.load()
+        # When OUT_OF_CORE is True, the images are never decoded into memory (only their size is read) and the pixel
+        #     arrays below are left as None. See self.bufferIn and self.bufferOut instead
+        if OUT_OF_CORE and (inputImage is None):
+            self.pixelsIn = None
+            self.pixelsOut = None
+            self.pixelsReference = None
+        else:
+            # An array of pixels representing the input image. Used for reference but never modified.
+            self.pixelsIn = self.imageIn.load()
+            # An array of pixels representing the output image. Initialized identical to self.pixelsIn
+            # Modified over time while iterating through rows/columns. Should not be used for reference.
+            self.pixelsOut = self.imageOut.load()
+            # An array of pixels representing the reference image
+            self.pixelsReference = self.imageReference.load()
         # Tracks when the first pixel of a reference image is going to be used in a new function application
         self.referenceStarting = True
         # Tracks when all image manipulation routines are complete
@@ -330,6 +535,9 @@ class ImageManipulator:
         self.numTotalManipulations = -1
         # Holds a list of all valid values of manip_index
         self.manipulationsList = []
+        # Maps the manip_index of the first manipulation of each run which is applied as a single pass to the operation
+        #     that the run has been fused into (see FUSE_COLOR_MANIPULATIONS)
+        self.fusedOperations = {}
         # Holds a list of colors which can be used as input for various functions, as RGB values
         self.colorList = []
         # Holds the HSV value of each RGB color in colorList
@@ -338,110 +546,82 @@ class ImageManipulator:
         self.outputImagePath = Path("")
         # Tracks whether or not the output image is ready to be displayed
         self.outputImageReady = False
-        # Holds paths of all images to be used in GIF and/or video creation
+        # Holds every distinct frame of the GIF and/or video, see hypnic_frames.py
+        self.frameStore = hypnic_frames.FrameStore(FRAME_STORE_MEMORY_BUDGET, FRAME_STORE_DIRECTORY)
+        # Holds the frame number (within self.frameStore) of each image within self.outputFileList, when any animation
+        #     is being created (see self.createsAnimation())
+        self.outputFrameList = []
+        # Holds the frame numbers (within self.frameStore) of all images to be used in GIF and/or video creation, in
+        #     order
         self.frames = []
+        # The frame number (within self.frameStore) of the input image, once it has been added
+        self.inputFrameNumber = None
+        # Maps each transition animation mode to the frame numbers (within self.frameStore) of its frames, once they've
+        #     been built, so that they're shared between the GIF and the video
+        self.transitionFrameNumbers = {}
         # Tracks the output file number at which a transition-type GIF/video should begin
         self.transitionStartIndex = 0
         # Sets the animation mode for GIF/video creation
         self.animationMode = 3
         # Tracks whether or not the output animated GIF has been created
         self.gifReady = False
-        # Holds imageio variables which reference the contents of self.frames for animated GIF creation
-        self.imageioFrames = []
         # Tracks whether or not the output video has been created
         self.videoReady = False
+        # Tracks whether or not the output animated WebP and animated PNG have been created
+        self.webpReady = False
+        self.apngReady = False
         # Internal variable used to track error incidences during debugging
         self.errorCount = 0
-
-        self.prepareDirectories()
+        # Incremented after each manipulation pass finishes writing to self.imageOut
+        # Used to tell whether data derived from self.imageOut (such as self.summedAreaTable) is out of date
+        self.imageOutVersion = 0
+        # Maps each value of self.imageOutVersion to the rectangle of self.imageOut which was rewritten to reach it (its
+        #     dirty rectangle), so that anything derived from an earlier version only needs that area to be reprocessed
+        # See self.markImageOutChanged() and self.changedRegionSince()
+        self.imageOutChanges = {}
+        # A uint8 array holding the contents of self.imageOut, kept up to date by self.getImageOutArray()
+        self.imageOutArray = None
+        # The value of self.imageOutVersion at which self.imageOutArray was last brought up to date
+        self.imageOutArrayVersion = 0
+        # The value of self.imageOutVersion at which the last output image was rendered
+        self.renderedVersion = 0
+        # Writes output images in the background while self.manipulate() is running, if WRITE_OUTPUT_IN_BACKGROUND is
+        #     True (see hypnic_writer.py). None otherwise, in which case they're written by self.renderOutputImage()
+        self.imageWriter = None
+        # Summed-area table of the reference image, used by self.setToAverageOfNeighbors() and its whole-frame versions
+        # Built by self.getSummedAreaTable() and reused until the reference image changes
+        self.summedAreaTable = None
+        # Describes the reference image (and its version) from which self.summedAreaTable was built
+        self.summedAreaTableKey = None
+        # Remembers the result of each self.limitColorsBy*() function for every input color, see self.getColorMatchCache()
+        self.colorMatchCache = {}
+        # The self.colorList and self.colorListHSV which every result within self.colorMatchCache was found using
+        self.colorMatchCacheLists = (None, None)
+        # The matcher of each self.limitColorsBy*() function for the current color lists, see self.matchColorList()
+        self.colorListMatchers = {}
+        # The self.colorList and self.colorListHSV which every matcher within self.colorListMatchers was built from
+        self.colorListMatcherLists = (None, None)
+        # The (x, y) coordinates of the reference image pixel which self.summedAreaTable begins at
+        # Always (0, 0) unless the table only covers part of the image, as it does within a tile worker
+        self.summedAreaTableOrigin = (0, 0)
+        # Memory-mapped equivalents of self.imageIn and self.imageOut, used instead of them when OUT_OF_CORE is True
+        # Created by self.prepareBuffers()
+        self.bufferIn = None
+        self.bufferOut = None
+
+        if inputImage is None:
+            self.prepareDirectories()
 
     # Converts an RGB color value to an HSV color value
-    # Based on algorithm (with modified domain) from:
-    #     http://coecsl.ece.illinois.edu/ge423/spring05/group8/finalproject/hsv_writeup.pdf
-    # R, G, and B are integers from 0 to 255 inclusive
-    # H, S, and V are each measured on a continuous scale
-    # H, conceptually, is measured in degrees and ranges from 0 <= H < 360
-    # S is measured from 0 to 1 inclusive
-    #   The lower S is, the more gray is present, causing it to appear faded
-    # V is measured from 0 to 1 inclusive
-    #   V represents brightness, where 0 is fully dark and 1 is fully bright
-    #   If V is 0, then the color is always black, regardless of H or S
-    @staticmethod
-    def fromRGBtoHSV(rgb):
-
-        minRGB = float(min(rgb))
-        maxRGB = float(max(rgb))
-        deltaRGB = maxRGB - minRGB
-        h = 0
-        s = 0
-        v = maxRGB / 255
-        # r == g == b == 0
-        if maxRGB == 0:
-            return (h, s, v)
-        else:
-            s = deltaRGB / maxRGB
-
-        # Hue is null
-        if deltaRGB == 0:
-            return (h, s, v)
-        # Hue is non-null
-        else:
-            # Hue is between yellow and magenta
-            if rgb[0] == maxRGB:
-                h = round(60 * ((rgb[1] - rgb[2]) / (deltaRGB)))
-            # Hue is between cyan and yellow
-            elif rgb[1] == maxRGB:
-                h = round(60 * (2 + ((rgb[2] - rgb[0]) / (deltaRGB))))
-            # Hue is between magenta and cyan
-            else:
-                h = round(60 * (4 + ((rgb[0] - rgb[1]) / (deltaRGB))))
-            # Ensure that Hue is in the 0 <= H < 360 range
-            h %= 360
-
-        return (h, s, v)
+    # Refers directly to hypnic_helpers.fromRGBtoHSV() (which describes the ranges of each value) to avoid keeping two
+    #     copies of the algorithm, and without adding a function call of overhead for every pixel
+    # hypnic_helpers.fromRGBtoHSVArray() performs the same conversion on an entire image at once
+    fromRGBtoHSV = staticmethod(hypnic_helpers.fromRGBtoHSV)
 
     # Converts an HSV color value to an RGB color value
-    # Based on algorithm (with modified domain) from:
-    #     https://www.rapidtables.com/convert/color/hsv-to-rgb.html
-    # R, G, and B are integers from 0 to 255 inclusive
-    # H, S, and V are each measured on a continuous scale
-    # H is measured in degrees on the domain of 0 <= H < 360
-    # S and V range from 0 to 1 inclusive
-    @staticmethod
-    def fromHSVtoRGB(hsv):
-
-        c = hsv[1] * hsv[2]
-        x = c * (1 - abs((hsv[0] / 60.0) % 2 - 1))
-        m = hsv[2] - c
-
-        if hsv[0] < 180:
-            if hsv[0] < 120:
-                # 0 <= H < 60
-                if hsv[0] < 60:
-                    rgb = [c, x, 0]
-                # 60 <= H < 120
-                else:
-                    rgb = [x, c, 0]
-            # 120 <= H < 180
-            else:
-                rgb = [0, c, x]
-        else:
-            # 180 <= H < 240
-            if hsv[0] < 240:
-                rgb = [0, x, c]
-            else:
-
-                # 240 <= H < 300
-                if hsv[0] < 300:
-                    rgb = [x, 0, c]
-                # 300 <= H < 360
-                else:
-                    rgb = [c, 0, x]
-
-        rgb[0] = int(round(255 * (rgb[0] + m)))
-        rgb[1] = int(round(255 * (rgb[1] + m)))
-        rgb[2] = int(round(255 * (rgb[2] + m)))
-        return tuple(rgb)
+    # Refers directly to hypnic_helpers.fromHSVtoRGB(), for the same reasons as self.fromRGBtoHSV
+    # hypnic_helpers.fromHSVtoRGBArray() performs the same conversion on an entire image at once
+    fromHSVtoRGB = staticmethod(hypnic_helpers.fromHSVtoRGB)
 
     # Returns the nearest integer to the distance between two X/Y coordinate pairs
     @staticmethod
@@ -673,8 +853,13 @@ class ImageManipulator:
     def generateColorListHSV(self):
 
         newList = []
-        for color in self.colorList:
-            newList.append(self.fromRGBtoHSV(color))
+        if self.colorList:
+            # Converts the entire list at once by treating it as an image which is a single row of pixels
+            # Each distinct color is only converted once, as lists such as those from self.colorListCubeRGB() can
+            #     contain the same color many times over
+            colors, inverse = hypnic_vectorized.uniqueColors(numpy.array(self.colorList).reshape(1, -1, 3))
+            h, s, v = hypnic_helpers.fromRGBtoHSVArray(colors)
+            newList = list(zip(h[0][inverse[0]].tolist(), s[0][inverse[0]].tolist(), v[0][inverse[0]].tolist()))
 
         self.colorListHSV = newList
         return self.colorListHSV
@@ -819,215 +1004,138 @@ class ImageManipulator:
         self.colorList = newList
         return 0
 
+    # Returns the dictionary in which the results of the self.limitColorsBy*() function called functionName are
+    #     remembered for each input color, emptying every such dictionary whenever self.colorList or self.colorListHSV
+    #     has been replaced since the last call
+    # Those functions only depend on the input color and the color lists, so this means that each distinct color of an
+    #     image is only matched once per manipulation. Only used when UNIQUE_COLOR_RATIO_THRESHOLD is above 0
+    def getColorMatchCache(self, functionName):
+
+        if (self.colorMatchCacheLists[0] is not self.colorList) or \
+                (self.colorMatchCacheLists[1] is not self.colorListHSV):
+            self.colorMatchCache = {}
+            self.colorMatchCacheLists = (self.colorList, self.colorListHSV)
+        if functionName not in self.colorMatchCache:
+            self.colorMatchCache[functionName] = {}
+        return self.colorMatchCache[functionName]
+
     # Sets a pixel's color to a member of self.colorList, sequentially based on average value of R, G, and B
+    # The member is looked up from a table of the member for each of the 766 possible sums of R, G, and B, where white
+    #     (an average of exactly 255) is given the last member
     # TODO: Write a new version of that function which uses closest total RGB distance from input list
     # TODO: Write a new version of this function which uses closest value distance from input list
     def limitColorsByAverageRGB(self, rgbIn):
 
         if not self.colorList:
             exit(421)
-
-        average = (rgbIn[0] + rgbIn[1] + rgbIn[2]) / 3
-        numColors = len(self.colorList)
-        colorOutIndex = -1
-        for n in range(numColors):
-            if (average >= 255 * (n / numColors)) and (average < 255 * ((n + 1) / numColors)):
-                colorOutIndex = n
-
-        if colorOutIndex == -1:
-            exit(42)
-        else:
-            return self.colorList[colorOutIndex]
+        return self.matchWithCache("limitColorsByAverageRGB", rgbIn)
+
+    # Returns the member of self.colorList which the self.limitColorsBy*() function called functionName chooses for
+    #     rgbIn
+    # Each distinct input color only has to be matched once when UNIQUE_COLOR_RATIO_THRESHOLD is above 0, as the result
+    #     is then remembered (see self.getColorMatchCache())
+    def matchWithCache(self, functionName, rgbIn):
+
+        if UNIQUE_COLOR_RATIO_THRESHOLD <= 0:
+            return self.colorList[self.matchColorList(functionName, rgbIn)]
+        matches = self.getColorMatchCache(functionName)
+        colorIn = tuple(rgbIn)
+        if colorIn not in matches:
+            matches[colorIn] = self.colorList[self.matchColorList(functionName, rgbIn)]
+        return matches[colorIn]
+
+    # Returns the index (within self.colorList) of the member which the self.limitColorsBy*() function called
+    #     functionName chooses for rgbIn, through that function's matcher (see hypnic_vectorized.colorListMatcher())
+    # Each matcher is only built once for every self.colorList and self.colorListHSV, rather than once per pixel
+    def matchColorList(self, functionName, rgbIn):
+
+        if (self.colorListMatcherLists[0] is not self.colorList) or \
+                (self.colorListMatcherLists[1] is not self.colorListHSV):
+            self.colorListMatchers = {}
+            self.colorListMatcherLists = (self.colorList, self.colorListHSV)
+        if functionName not in self.colorListMatchers:
+            self.colorListMatchers[functionName] = hypnic_vectorized.colorListMatcher(functionName, self.colorList,
+                                                                                       self.colorListHSV)
+        return hypnic_vectorized.matchColor(self.colorListMatchers[functionName], rgbIn[:3])
 
     # Treats colors as points on a 3D coordinate grid (r/g/b ~ x/y/z) and outputs the color
-    #   which is least distant from the input color
-    # TODO: Write a similar function but for distance within HSV space (polar coordinates with Z axis, H is theta)
-    # TODO: Improve efficiency by treating color list sometimes as a cube and narrowing the search space to at most
-    #   somewhere between 8 and 27 values
+    #   which is least distant from the input color (the last of several which are equally close)
+    # See self.limitColorsByMatchHSV() for a similar function based on distance within HSV space instead
+    # Rather than checking every member of self.colorList, the search is narrowed down to a few nearby members by an
+    #   index of the color list (see hypnic_palettes.py), or skipped entirely for color lists from
+    #   self.colorListCubeRGB(), whose closest member is found from the closest R, G, and B values alone
     def limitColorsByMatchRGB(self, rgbIn):
 
         if not self.colorList:
             exit(491)
+        return self.matchWithCache("limitColorsByMatchRGB", rgbIn)
 
-        # Stores the R value of the input color
-        rVal = rgbIn[0]
-        gVal = rgbIn[1]
-        bVal = rgbIn[2]
-        # Stores the distance of the color (within self.colors) with the closest R value to the input color
-        # Initialized as the difference between the maximum and minimum possible values of R
-        # The distance between (0, 0, 0) and (255, 255, 255) is approximately 441.673
-        minDist = 442.0
-        # Stores the index (within self.colors) of the color which most closely matches the input color
-        colorOutIndex = -1
-        numColors = len(self.colorList)
-        for n in range(numColors):
-            dist = math.sqrt(((abs(self.colorList[n][0] - rVal)) ** 2) +
-                             ((abs(self.colorList[n][1] - gVal)) ** 2) +
-                             ((abs(self.colorList[n][2] - bVal)) ** 2))
-            if dist <= minDist:
-                minDist = dist
-                colorOutIndex = n
-
-        if colorOutIndex == -1:
-            exit(49)
-        else:
-            return self.colorList[colorOutIndex]
+    # Treats colors as points within a cylinder (H is the angle around its axis, S the distance from its axis, and V the
+    #   height along it) and outputs the color which is least distant from the input color
+    # Unlike self.limitColorsByMatchH(), hues of 359 and 0 are treated as neighbors, and grays match regardless of hue
+    # The search is narrowed down by an index of the points of self.colorListHSV, as in self.limitColorsByMatchRGB()
+    def limitColorsByMatchHSV(self, rgbIn):
+
+        if not self.colorList:
+            exit(501)
+        if not self.colorListHSV:
+            self.generateColorListHSV()
+        return self.matchWithCache("limitColorsByMatchHSV", rgbIn)
 
     # Sets a pixel's color to the member of self.colorList with the closest R value to the input color
+    # The member is looked up from a table of the closest member for every R value (see self.matchColorList())
     def limitColorsByMatchR(self, rgbIn):
 
         if not self.colorList:
             exit(461)
-
-        # Stores the R value of the input color
-        rVal = rgbIn[0]
-        # Stores the distance of the color (within self.colors) with the closest R value to the input color
-        # Initialized as the difference between the maximum and minimum possible values of R
-        rMinDist = 255
-        # Stores the index (within self.colors) of the color which most closely matches the input color
-        colorOutIndex = -1
-        numColors = len(self.colorList)
-        for n in range(numColors):
-            rDist = abs(self.colorList[n][0] - rVal)
-            if rDist <= rMinDist:
-                rMinDist = rDist
-                colorOutIndex = n
-
-        if colorOutIndex == -1:
-            exit(46)
-        else:
-            return self.colorList[colorOutIndex]
+        return self.matchWithCache("limitColorsByMatchR", rgbIn)
 
     # Sets a pixel's color to the member of self.colorList with the closest G value to the input color
+    # The member is looked up from a table of the closest member for every G value (see self.matchColorList())
     def limitColorsByMatchG(self, rgbIn):
 
         if not self.colorList:
             exit(471)
-
-        # Stores the G value of the input color
-        gVal = rgbIn[1]
-        # Stores the distance of the color (within self.colors) with the closest G value to the input color
-        # Initialized as the difference between the maximum and minimum possible values of G
-        gMinDist = 255
-        # Stores the index (within self.colors) of the color which most closely matches the input color
-        colorOutIndex = -1
-        numColors = len(self.colorList)
-        for n in range(numColors):
-            gDist = abs(self.colorList[n][1] - gVal)
-            if gDist <= gMinDist:
-                gMinDist = gDist
-                colorOutIndex = n
-
-        if colorOutIndex == -1:
-            exit(47)
-        else:
-            return self.colorList[colorOutIndex]
+        return self.matchWithCache("limitColorsByMatchG", rgbIn)
 
     # Sets a pixel's color to the member of self.colorList with the closest B value to the input color
+    # The member is looked up from a table of the closest member for every B value (see self.matchColorList())
     def limitColorsByMatchB(self, rgbIn):
 
         if not self.colorList:
             exit(481)
-
-        # Stores the B value of the input color
-        bVal = rgbIn[2]
-        # Stores the distance of the color (within self.colors) with the closest B value to the input color
-        # Initialized as the difference between the maximum and minimum possible values of B
-        bMinDist = 255
-        # Stores the index (within self.colors) of the color which most closely matches the input color
-        colorOutIndex = -1
-        numColors = len(self.colorList)
-        for n in range(numColors):
-            bDist = abs(self.colorList[n][2] - bVal)
-            if bDist <= bMinDist:
-                bMinDist = bDist
-                colorOutIndex = n
-
-        if colorOutIndex == -1:
-            exit(48)
-        else:
-            return self.colorList[colorOutIndex]
+        return self.matchWithCache("limitColorsByMatchB", rgbIn)
 
     # Sets a pixel's color to the member of self.colorList with the closest H value to the input color
+    # The member is looked up from a table of the closest member for every whole-number H value
     def limitColorsByMatchH(self, rgbIn):
 
         if not self.colorList:
             exit(431)
         if not self.colorListHSV:
             self.generateColorListHSV()
-
-        # Stores the H value of the input color
-        hVal = self.fromRGBtoHSV(rgbIn)[0]
-        # Stores the distance of the color (within self.colors) with the closest H value to the input color
-        # Initialized as the difference between the maximum and minimum possible values of H
-        hMinDist = 360
-        # Stores the index (within self.colors) of the color which most closely matches the input color
-        colorOutIndex = -1
-        numColors = len(self.colorList)
-        for n in range(numColors):
-            hDist = abs(self.colorListHSV[n][0] - hVal)
-            if hDist <= hMinDist:
-                hMinDist = hDist
-                colorOutIndex = n
-
-        if colorOutIndex == -1:
-            exit(43)
-        else:
-            return self.colorList[colorOutIndex]
+        return self.matchWithCache("limitColorsByMatchH", rgbIn)
 
     # Sets a pixel's color to the member of self.colorList with the closest S value to the input color
+    # The member is found by a binary search through the distinct S values of self.colorListHSV, sorted once per list
     def limitColorsByMatchS(self, rgbIn):
 
         if not self.colorList:
             exit(441)
         if not self.colorListHSV:
             self.generateColorListHSV()
-
-        # Stores the S value of the input color
-        sVal = self.fromRGBtoHSV(rgbIn)[1]
-        # Stores the distance of the color (within self.colors) with the closest S value to the input color
-        # Initialized as the difference between the maximum and minimum possible values of S
-        sMinDist = 1.0
-        # Stores the index (within self.colors) of the color which most closely matches the input color
-        colorOutIndex = -1
-        numColors = len(self.colorList)
-        for n in range(numColors):
-            sDist = abs(self.colorListHSV[n][1] - sVal)
-            if sDist <= sMinDist:
-                sMinDist = sDist
-                colorOutIndex = n
-
-        if colorOutIndex == -1:
-            exit(44)
-        else:
-            return self.colorList[colorOutIndex]
+        return self.matchWithCache("limitColorsByMatchS", rgbIn)
 
     # Sets a pixel's color to the member of self.colorList with the closest V value to the input color
+    # V only depends on the largest of R, G, and B, so the member is looked up from a table of the closest member for
+    #   each of the 256 possible values of it
     def limitColorsByMatchV(self, rgbIn):
 
         if not self.colorList:
             exit(451)
         if not self.colorListHSV:
             self.generateColorListHSV()
-
-        # Stores the V value of the input color
-        vVal = self.fromRGBtoHSV(rgbIn)[2]
-        # Stores the distance of the color (within self.colors) with the closest V value to the input color
-        # Initialized as the difference between the maximum and minimum possible values of V
-        vMinDist = 1.0
-        # Stores the index (within self.colors) of the color which most closely matches the input color
-        colorOutIndex = -1
-        numColors = len(self.colorList)
-        for n in range(numColors):
-            vDist = abs(self.colorListHSV[n][2] - vVal)
-            if vDist <= vMinDist:
-                vMinDist = vDist
-                colorOutIndex = n
-
-        if colorOutIndex == -1:
-            exit(45)
-        else:
-            return self.colorList[colorOutIndex]
+        return self.matchWithCache("limitColorsByMatchV", rgbIn)
 
     # Sets a pixel's color to be that of the most frequently occurring color between itself and its nearest neighbors
     # searchDistance describes the distance within which neighboring pixels are included
@@ -1085,6 +1193,132 @@ class ImageManipulator:
 
         return targetList[maxFreqX, maxFreqY]
 
+    # Sets each of a pixel's R, G, and B values to the value found at a given rank among its neighbors' values
+    # rank is a fraction, where 0 is the lowest value, 1 is the highest, and 0.5 is the median
+    # searchDistance and positiveOnly work the same as in self.setToAverageOfNeighbors()
+    def setToRankOfNeighbors(self, rank, searchDistance = 1, positiveOnly = True):
+
+        if self.referenceStarting:
+            if MANIPULATE_PREVIOUS_OUTPUT:
+                self.imageReference = self.imageOut
+            else:
+                self.imageReference = self.imageIn
+            self.pixelsReference = self.imageReference.load()
+
+        targetList = self.pixelsReference
+        # Determines the valid range of neighbors to search
+        if positiveOnly:
+            xValues = range(max(self.currentX, 0), min(self.currentX + searchDistance + 1, self.xRes))
+            yValues = range(max(self.currentY, 0), min(self.currentY + searchDistance + 1, self.yRes))
+        else:
+            xValues = range(max(round(self.currentX - searchDistance / 2), 0),
+                            min(round(self.currentX + searchDistance / 2 + 1), self.xRes))
+            yValues = range(max(round(self.currentY - searchDistance / 2), 0),
+                            min(round(self.currentY + searchDistance / 2 + 1), self.yRes))
+
+        rValues = []
+        gValues = []
+        bValues = []
+        for x in xValues:
+            for y in yValues:
+                r, g, b = targetList[x, y]
+                rValues.append(r)
+                gValues.append(g)
+                bValues.append(b)
+
+        index = round(rank * (len(rValues) - 1))
+        return (sorted(rValues)[index], sorted(gValues)[index], sorted(bValues)[index])
+
+    # Sets each of a pixel's R, G, and B values to the median of its neighbors' values
+    def setToMedianOfNeighbors(self, searchDistance = 1, positiveOnly = True):
+        return self.setToRankOfNeighbors(0.5, searchDistance, positiveOnly)
+
+    # Describes the image which the neighborhood functions currently read from, along with how many times it has been
+    #     changed, so that anything derived from it can tell when it's out of date
+    def getReferenceKey(self):
+
+        if MANIPULATE_PREVIOUS_OUTPUT:
+            return ("imageOut", self.imageOutVersion)
+        return ("imageIn", 0)
+
+    # Records that region of self.imageOut has been rewritten (its dirty rectangle), making anything derived from the
+    #     previous contents of self.imageOut out of date
+    # Entries of self.imageOutChanges are only kept for as long as something still needs them (see
+    #     self.pruneImageOutChanges())
+    def markImageOutChanged(self, region):
+
+        self.imageOutVersion += 1
+        self.imageOutChanges[self.imageOutVersion] = region
+        self.pruneImageOutChanges()
+
+    # Forgets the changes to self.imageOut from before the oldest version which anything derived from it (the last
+    #     output image, self.imageOutArray, and self.summedAreaTable) was brought up to date at, as nothing will ever
+    #     ask for the changes since any earlier version
+    def pruneImageOutChanges(self):
+
+        oldestVersion = self.renderedVersion
+        if self.imageOutArray is not None:
+            oldestVersion = min(oldestVersion, self.imageOutArrayVersion)
+        if (self.summedAreaTable is not None) and (self.summedAreaTableKey[0] == "imageOut"):
+            oldestVersion = min(oldestVersion, self.summedAreaTableKey[1])
+        for changedVersion in [version for version in self.imageOutChanges if version <= oldestVersion]:
+            del self.imageOutChanges[changedVersion]
+
+    # Returns the smallest rectangle containing every area of self.imageOut rewritten since it was at the given version,
+    #     or None if that isn't known (such as when version is from another image, or from before the tracking began)
+    def changedRegionSince(self, version):
+
+        regions = []
+        for changedVersion in range(version + 1, self.imageOutVersion + 1):
+            if changedVersion not in self.imageOutChanges:
+                return None
+            regions.append(self.imageOutChanges[changedVersion])
+        if len(regions) == 0:
+            return (0, 0, 0, 0)
+        return hypnic_tiles.boundingRectangle(regions)
+
+    # Returns a uint8 array holding the current contents of self.imageOut, which must not be modified
+    # Rather than converting the entire image every time, only the area rewritten since the last call is copied over
+    def getImageOutArray(self):
+
+        region = None
+        if self.imageOutArray is not None:
+            region = self.changedRegionSince(self.imageOutArrayVersion)
+        if region is None:
+            self.imageOutArray = numpy.array(self.imageOut)
+        elif (region[2] > region[0]) and (region[3] > region[1]):
+            self.imageOutArray[region[1]:region[3], region[0]:region[2]] = numpy.asarray(self.imageOut.crop(region))
+        self.imageOutArrayVersion = self.imageOutVersion
+        return self.imageOutArray
+
+    # Returns the summed-area table (see hypnic_vectorized.summedAreaTable()) of the image which the neighborhood
+    #     functions currently read from, building it only if the reference image has changed since the last call
+    # When only part of self.imageOut has changed since the table was built, only the affected part of it is rebuilt
+    # referenceArray may optionally be given if the caller already holds the reference image as an array
+    def getSummedAreaTable(self, referenceArray=None):
+
+        key = self.getReferenceKey()
+        if (self.summedAreaTable is None) or (self.summedAreaTableKey != key):
+            if referenceArray is None:
+                if MANIPULATE_PREVIOUS_OUTPUT:
+                    referenceArray = self.getImageOutArray()
+                else:
+                    referenceArray = numpy.asarray(self.imageIn)
+
+            region = None
+            if (self.summedAreaTable is not None) and (self.summedAreaTableKey[0] == key[0] == "imageOut") and \
+                    (self.summedAreaTableOrigin == (0, 0)) and (self.summedAreaTable.shape[:2] ==
+                                                                (referenceArray.shape[0] + 1, referenceArray.shape[1] + 1)):
+                region = self.changedRegionSince(self.summedAreaTableKey[1])
+            if region is None:
+                self.summedAreaTable = hypnic_vectorized.summedAreaTable(referenceArray)
+            elif (region[2] > region[0]) and (region[3] > region[1]):
+                hypnic_vectorized.updateSummedAreaTable(self.summedAreaTable, referenceArray, region)
+            self.summedAreaTableKey = key
+            self.summedAreaTableOrigin = (0, 0)
+
+        return self.summedAreaTable
+
     # Sets a pixel's color to be the average of all of its neighbors, on an RGB basis
     # searchDistance describes the distance within which neighboring pixels are included
     #   so a searchDistance of 1 encompasses a 2x2 area, a searchDistance of 2 encompasses a 3x3 area, etc.
@@ -1099,6 +1333,28 @@ class ImageManipulator:
                 self.imageReference = self.imageIn
             self.pixelsReference = self.imageReference.load()
 
+        # Looks the totals up from the summed-area table instead of adding every neighbor individually, when enabled
+        # This is only done when the result is guaranteed to be identical (see USE_SUMMED_AREA_TABLES)
+        if USE_SUMMED_AREA_TABLES and (not self.usesNeighborhoodFeedback(positiveOnly)) and \
+                (self.imageReference.mode == "RGB"):
+            # The same range of neighbors as the xValues and yValues lists below, without building the lists
+            if positiveOnly:
+                xLo, xHi = self.currentX, self.currentX + searchDistance + 1
+                yLo, yHi = self.currentY, self.currentY + searchDistance + 1
+            else:
+                xLo, xHi = round(self.currentX - searchDistance / 2), round(self.currentX + searchDistance / 2 + 1)
+                yLo, yHi = round(self.currentY - searchDistance / 2), round(self.currentY + searchDistance / 2 + 1)
+            xLo, xHi = max(xLo, 0), min(xHi, self.xRes)
+            yLo, yHi = max(yLo, 0), min(yHi, self.yRes)
+
+            table = self.getSummedAreaTable()
+            originX, originY = self.summedAreaTableOrigin
+            totals = hypnic_vectorized.summedAreaSums(table, xLo - originX, xHi - originX, yLo - originY, yHi - originY)
+            numNeighbors = (xHi - xLo) * (yHi - yLo)
+            return (round(int(totals[0]) / numNeighbors),
+                    round(int(totals[1]) / numNeighbors),
+                    round(int(totals[2]) / numNeighbors))
+
         targetList = self.pixelsReference
         # Determines the valid range of neighbors to search
         xValues = []
@@ -1135,130 +1391,374 @@ class ImageManipulator:
 
         return (round(totalR / numNeighbors), round(totalG / numNeighbors), round(totalB / numNeighbors))
 
-    # Determines the new R/G/B value of a pixel based on X/Y coordinate and existing R/G/B value
-    # Currently the only purpose is to call the desired modification function(s)
+    # Determines the new R/G/B value of the current pixel (self.currentX, self.currentY), by applying the manipulation
+    #     with the given manip_index from MANIPULATIONS
+    # self.manipulate() looks up the per-pixel version of each manipulation once per pass rather than calling this for
+    #     every pixel, so this is only needed to manipulate single pixels from elsewhere
+    # Returns 0 and sets self.manipulationComplete to True when manip_index is beyond the last manipulation to perform
     def rgbFunc(self, manip_index):
 
-        # This first operation is only valid when numTotalManipulations has already been defined, not when it's still
-        #   equal to its default value of -1
-        if self.numTotalManipulations != -1:
-            # If self.numTotalManipulations exceeds manip_index then we set self.manipulationComplete to True,
-            #   and leave without doing anything else (returning 0 so that the return value goes unused)/
-            if manip_index > self.numTotalManipulations:
-                self.manipulationComplete = True
-                return 0
-
-        numManips = 0
+        operation = self.getOperation(manip_index)
+        if operation is None:
+            self.manipulationComplete = True
+            return 0
 
-        # If the manipulation function for the current manip_index should be applied to the input image
+        # If the manipulation should be applied to the input image
         if not MANIPULATE_PREVIOUS_OUTPUT:
-            rgbResult = self.pixelsIn[self.currentX, self.currentY]
-        # If the manipulation function for the current manip_index should be applied to the image that resulted
-        #     from the previous call of self.rgbFunc()
+            rgbIn = self.pixelsIn[self.currentX, self.currentY]
+        # If the manipulation should be applied to the image that resulted from the previous manipulation
         else:
-            rgbResult = self.pixelsOut[self.currentX, self.currentY]
-        # Manipulates a pixel based on the value of manip_index
-        # Also us to determine how many consecutive manipulation indices are present
-
-        """
-        if manip_index == 1:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                if not self.colorList:
-                    print("Generating color cube!")
-                    self.colorList = self.colorListCubeRGB(4, 16, 239)
-                    self.generateColorListHSV()
-                    #self.rgbShiftColorList(80, 200, 0, 40, 40, 120, True)
-                    #self.hsvShiftColorList(240, 340, 0, 0, -0.1, 0.1, False)
-                #print(self.colorList)
-                rgbResult = self.limitColorsByMatchRGB(rgbResult)
-        """
-
-        if manip_index == 1:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.setToAverageOfNeighbors(2)
-        elif manip_index == 2:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.setToMostFrequentNeighbor(3)
-        elif manip_index == 3:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.setToAverageOfNeighbors(2)
-        elif manip_index == 4:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.setToMostFrequentNeighbor(2)
-        elif manip_index == 5:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.modSaturationShift(rgbResult, -0.3)
-        elif manip_index == 6:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.setToAverageOfNeighbors(4)
-        elif manip_index == 7:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.setToMostFrequentNeighbor(4)
-        elif manip_index == 8:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = (self.calcFromCustomDomainRGB(rgbResult[2], 127, 128, 19, 0, 32, 1),
-                             self.calcFromCustomDomainRGB(rgbResult[2], 127, 128, 39, 0, 32, 1),
-                             self.calcFromCustomDomainRGB(rgbResult[2], 127, 128, 29, 0, 32, 1))
-        elif manip_index == 9:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.modHueShift(rgbResult, ((self.currentX + 1) % (self.currentY + 1)) % 360)
-        elif manip_index == 10:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.setToAverageOfNeighbors(4)
-        elif manip_index == 10:
-            if self.numTotalManipulations == -1:
-                numManips += 1
-            else:
-                rgbResult = self.setToMostFrequentNeighbor(4)
+            rgbIn = self.pixelsOut[self.currentX, self.currentY]
+        return operation.pixelKernel(self)(rgbIn)
+
+    # Returns the operation (see hypnic_operations.py) with the given manip_index from MANIPULATIONS, where the first
+    #     has a manip_index of 1, or None if manip_index is beyond the last manipulation to perform
+    # Once self.numTotalManipulations has been set, no manipulation beyond it is performed (see STOP_MANIPULATING_AFTER)
+    # The first manip_index of a fused run (see FUSE_COLOR_MANIPULATIONS) returns the operation of the whole run
+    def getOperation(self, manip_index):
+
+        if manip_index in self.fusedOperations:
+            return self.fusedOperations[manip_index]
+        numManipulations = len(MANIPULATIONS)
+        if self.numTotalManipulations != -1:
+            numManipulations = min(numManipulations, self.numTotalManipulations)
+        if 1 <= manip_index <= numManipulations:
+            return MANIPULATIONS[manip_index - 1]
+        return None
+
+    # Whole-frame equivalent of self.rgbFunc(), used when EXECUTION_BACKEND is "numpy"
+    # sourceArray is the (height, width, 3) array of the image which self.rgbFunc() would read pixels from
+    # region is an (x0, y0, x1, y1) rectangle of pixels to manipulate, where x1 and y1 are exclusive
+    # origin is the (x, y) position of sourceArray[0, 0] within the full image, which is only different from (0, 0)
+    #     when sourceArray holds just part of the image (see OUT_OF_CORE). region is always relative to sourceArray
+    # Returns an array holding the new colors of every pixel in region, or None if manip_index has no whole-frame
+    #     version (in which case self.rgbFunc() must be called for every pixel instead)
+    def rgbFuncArray(self, manip_index, sourceArray, region, origin=(0, 0)):
+
+        operation = self.getOperation(manip_index)
+        if operation is None:
+            return None
+        return operation.arrayResult(self, sourceArray, region, origin)
+
+    # Returns function(rgbArray, *args) for a color function from hypnic_vectorized (one whose result only depends on
+    #     each pixel's own color), looking the results up from a baked table instead whenever USE_COLOR_LUTS allows it
+    #     and bakeable is True (see hypnic_operations.ColorOperation)
+    # Otherwise, images with few distinct colors only have each color manipulated once (see UNIQUE_COLOR_RATIO_THRESHOLD)
+    # Tables only have COLOR_LUT_SIZE entries along each axis when continuous is True, and 256 otherwise
+    def colorFunctionArray(self, function, rgbArray, *args, bakeable=True, continuous=False):
+
+        if USE_COLOR_LUTS and bakeable:
+            size = COLOR_LUT_SIZE if continuous else 256
+            # Only worth baking if there are at least as many pixels as table entries, or if the table is to be saved
+            bake = (rgbArray.shape[0] * rgbArray.shape[1] >= size ** 3) or (COLOR_LUT_DIRECTORY is not None)
+            lut = hypnic_luts.getLUT(function, args, size, COLOR_LUT_DIRECTORY, bake)
+            if lut is not None:
+                return hypnic_luts.applyLUT(rgbArray, lut)
+        if hypnic_vectorized.estimateUniqueColorRatio(rgbArray) <= UNIQUE_COLOR_RATIO_THRESHOLD:
+            return hypnic_vectorized.applyToUniqueColors(function, rgbArray, *args)
+        return function(rgbArray, *args)
+
+    # Same as self.colorFunctionArray(), but for a run of color functions applied one after another, given as a list of
+    #     (function, args) pairs (see hypnic_operations.FusedColorOperation)
+    # When tables are used, the table of every function is composed into one, so the run is a single lookup per pixel
+    def colorFunctionsArray(self, functions, rgbArray, bakeable=True, continuous=False):
+
+        if USE_COLOR_LUTS and bakeable:
+            size = COLOR_LUT_SIZE if continuous else 256
+            bake = (rgbArray.shape[0] * rgbArray.shape[1] >= size ** 3) or (COLOR_LUT_DIRECTORY is not None)
+            luts = [hypnic_luts.getLUT(function, args, size, COLOR_LUT_DIRECTORY, bake)
+                    for function, args in functions]
+            if all(lut is not None for lut in luts):
+                return hypnic_luts.applyLUT(rgbArray, hypnic_luts.getComposedLUT(functions, luts))
+        if hypnic_vectorized.estimateUniqueColorRatio(rgbArray) <= UNIQUE_COLOR_RATIO_THRESHOLD:
+            return hypnic_vectorized.applyToUniqueColors(hypnic_vectorized.applyInTurn, rgbArray, functions)
+        return hypnic_vectorized.applyInTurn(rgbArray, functions)
+
+    # Same as self.rgbFuncArray(), but splits region into tiles which are manipulated in parallel by the threads of
+    #     executor (see TILE_EXECUTOR). Returns None if manip_index has no whole-frame version
+    def rgbFuncArrayTiled(self, manip_index, sourceArray, region, executor):
+
+        tiles = hypnic_tiles.splitIntoTiles(region, TILE_SIZE)
+        # Builds the summed-area table up front, so that the threads never try to build it at the same time
+        if USE_SUMMED_AREA_TABLES and (self.manipulationFootprint(manip_index) > 0):
+            self.getSummedAreaTable(sourceArray)
+        tileArrays = hypnic_tiles.mapTiles(executor, self.rgbFuncArray,
+                                           [(manip_index, sourceArray, tile) for tile in tiles])
+        if any(tileArray is None for tileArray in tileArrays):
+            return None
+
+        x0, y0, x1, y1 = region
+        resultArray = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+        for (tileX0, tileY0, tileX1, tileY1), tileArray in zip(tiles, tileArrays):
+            resultArray[tileY0 - y0:tileY1 - y0, tileX0 - x0:tileX1 - x0] = tileArray
+        return resultArray
+
+    # Compiled equivalent of self.rgbFunc(), used when EXECUTION_BACKEND is "numba"
+    # Takes the same parameters and returns the same kind of result as self.rgbFuncArray()
+    def rgbFuncNumba(self, manip_index, sourceArray, region, origin=(0, 0)):
+
+        operation = self.getOperation(manip_index)
+        if operation is None:
+            return None
+        return operation.numbaResult(self, sourceArray, region, origin)
+
+    # Returns (croppedArray, croppedRegion), where croppedArray is the part of sourceArray which the neighborhood
+    #     functions can read from while manipulating region with the given searchDistance, and croppedRegion is region
+    #     relative to it. Whole-frame work (such as labeling colors or copying) is then limited to the area that changes
+    def cropToNeighborhood(self, sourceArray, region, searchDistance):
+
+        readX0, readY0, readX1, readY1 = hypnic_tiles.addEvenHalo(region, searchDistance, sourceArray.shape[1],
+                                                                  sourceArray.shape[0])
+        x0, y0, x1, y1 = region
+        return (sourceArray[readY0:readY1, readX0:readX1], (x0 - readX0, y0 - readY0, x1 - readX0, y1 - readY0))
+
+    # Returns whether a neighborhood function called with positiveOnly reads pixels which were already rewritten earlier
+    #     in the same pass (see NEIGHBORHOOD_FEEDBACK), in which case it can't read from a snapshot of the image
+    def usesNeighborhoodFeedback(self, positiveOnly):
+        return NEIGHBORHOOD_FEEDBACK and MANIPULATE_PREVIOUS_OUTPUT and (not positiveOnly)
+
+    # Whole-frame version of self.setToAverageOfNeighbors(), only available through a summed-area table
+    # Returns None when USE_SUMMED_AREA_TABLES is False, leaving the averages to the per-pixel version
+    # Reads from sourceArray (a snapshot taken before the manipulation started), so also returns None whenever the
+    #     per-pixel version would read pixels rewritten during the same pass (see NEIGHBORHOOD_FEEDBACK)
+    def averageOfNeighborsArray(self, sourceArray, region, searchDistance, positiveOnly):
+
+        if (not USE_SUMMED_AREA_TABLES) or self.usesNeighborhoodFeedback(positiveOnly):
+            return None
+        return hypnic_vectorized.setToAverageOfNeighbors(self.getSummedAreaTable(sourceArray), region, searchDistance,
+                                                         positiveOnly)
+
+    # Compiled whole-frame version of self.setToMostFrequentNeighbor()
+    # Unless no pixel ever reads one which was already rewritten during the same manipulation (see
+    #     NEIGHBORHOOD_FEEDBACK), the pixels are swept through one at a time in the same order as the per-pixel version
+    def mostFrequentNeighborNumba(self, sourceArray, region, searchDistance, positiveOnly):
+
+        # Colors are only labeled within the area that the manipulation can read from, not the entire image
+        sourceArray, region = self.cropToNeighborhood(sourceArray, region, searchDistance)
+        x0, y0, x1, y1 = region
+        if self.usesNeighborhoodFeedback(positiveOnly):
+            return hypnic_numba.setToMostFrequentNeighborFeedback(sourceArray, x0, y0, x1, y1, searchDistance,
+                                                                  positiveOnly)
+        return hypnic_numba.setToMostFrequentNeighbor(sourceArray, x0, y0, x1, y1, searchDistance, positiveOnly)
+
+    # Whole-frame version of self.setToRankOfNeighbors()
+    # Reads from sourceArray (a snapshot taken before the manipulation started), so returns None whenever the per-pixel
+    #     version would read pixels rewritten during the same pass (see NEIGHBORHOOD_FEEDBACK)
+    def rankOfNeighborsArray(self, sourceArray, region, rank, searchDistance, positiveOnly):
+
+        if self.usesNeighborhoodFeedback(positiveOnly):
+            return None
+        return hypnic_vectorized.setToRankOfNeighbors(sourceArray, region, rank, searchDistance, positiveOnly)
+
+    # Compiled whole-frame version of self.setToRankOfNeighbors(), which keeps a sliding histogram of each channel
+    # Returns None whenever the per-pixel version would read pixels rewritten during the same pass, as there's no
+    #     compiled version which sweeps through them one at a time
+    def rankOfNeighborsNumba(self, sourceArray, region, rank, searchDistance, positiveOnly):
+
+        if self.usesNeighborhoodFeedback(positiveOnly):
+            return None
+        sourceArray, region = self.cropToNeighborhood(sourceArray, region, searchDistance)
+        x0, y0, x1, y1 = region
+        return hypnic_numba.setToRankOfNeighbors(sourceArray, x0, y0, x1, y1, rank, searchDistance, positiveOnly)
+
+    # Compiled whole-frame version of self.setToAverageOfNeighbors(), used by self.rgbFuncNumba()
+    # Reads from the summed-area table of the reference image when USE_SUMMED_AREA_TABLES is True, unless pixels
+    #     rewritten during the same manipulation must be read (see self.mostFrequentNeighborNumba())
+    def averageOfNeighborsNumba(self, sourceArray, region, searchDistance, positiveOnly):
+
+        if self.usesNeighborhoodFeedback(positiveOnly):
+            # Only the area that the manipulation can read from is copied for the sweep, not the entire image
+            sourceArray, region = self.cropToNeighborhood(sourceArray, region, searchDistance)
+            x0, y0, x1, y1 = region
+            return hypnic_numba.setToAverageOfNeighborsFeedback(sourceArray, x0, y0, x1, y1, searchDistance,
+                                                                positiveOnly)
+        x0, y0, x1, y1 = region
+        if USE_SUMMED_AREA_TABLES:
+            return hypnic_numba.setToAverageOfNeighborsFromTable(self.getSummedAreaTable(sourceArray),
+                                                                 x0, y0, x1, y1, searchDistance, positiveOnly)
+        return hypnic_numba.setToAverageOfNeighbors(sourceArray, x0, y0, x1, y1, searchDistance, positiveOnly)
+
+    # Applies manip_index within MANIPULATIONS to every pixel of region, writing the results to self.imageOut
+    # The region is split into tiles which are manipulated in parallel by the worker processes of executor (see
+    #     manipulateTile()), each of which is sent its tile plus a halo as wide as the manipulation's footprint
+    def rgbFuncTiled(self, manip_index, region, executor):
 
-        # Ends the current round of manipulation when the highest valid manip_index value have been exceeded
+        if MANIPULATE_PREVIOUS_OUTPUT:
+            sourceImage = self.imageOut
         else:
-            if self.numTotalManipulations == -1:
-                self.numTotalManipulations = manip_index - 1
-                return self.numTotalManipulations
-            print(str(manip_index - 1) +
-                  " inidividual image manipulation(s) performed. Current round of manipulation has been completed.\n")
-            self.manipulationComplete = True
-            return 0
-
-        # Handles the return elsewhere
-        if self.numTotalManipulations == -1:
-            return self.numTotalManipulations
+            sourceImage = self.imageIn
+
+        footprint = self.manipulationFootprint(manip_index)
+        tiles = hypnic_tiles.splitIntoTiles(region, TILE_SIZE)
+        argsList = []
+        for tile in tiles:
+            halo = hypnic_tiles.addHalo(tile, footprint, self.xRes, self.yRes)
+            argsList.append((tile, self.getOperation(manip_index), halo, sourceImage.crop(halo)))
+
+        # Every tile is read from sourceImage before any of the results are written
+        for tile, tileImage in zip(tiles, hypnic_tiles.mapTiles(executor, manipulateTile, argsList)):
+            self.imageOut.paste(tileImage, (tile[0], tile[1]))
+
+    # Returns the footprint of manip_index within MANIPULATIONS, meaning how far (in pixels) beyond its own position the
+    #     manipulation of a pixel may read from. This is how much each tile must overlap its neighbors when a pass is
+    #     split up by TILE_EXECUTOR (see hypnic_tiles)
+    # Returns None for any manipulation which has to be applied to the whole frame in order, such as one which reads
+    #     pixels that were already rewritten earlier in the same pass
+    def manipulationFootprint(self, manip_index):
+
+        operation = self.getOperation(manip_index)
+        if operation is None:
+            return None
+        if (operation.footprint == hypnic_operations.NEIGHBORHOOD) and \
+                self.usesNeighborhoodFeedback(operation.positiveOnly):
+            return None
+        return operation.halo
+
+    # Creates self.bufferIn and self.bufferOut (see OUT_OF_CORE), both holding the contents of the input image
+    def prepareBuffers(self):
+
+        bufferDirectory = Path.cwd() / OUT_OF_CORE_DIRECTORY
+        self.bufferIn = hypnic_bands.createBufferFromImage(bufferDirectory / "imageIn.raw", INPUT_IMG,
+                                                           OUT_OF_CORE_BAND_ROWS)
+        self.bufferOut = hypnic_bands.createBuffer(bufferDirectory / "imageOut.raw", self.xRes, self.yRes)
+        hypnic_bands.copyBuffer(self.bufferIn, self.bufferOut, OUT_OF_CORE_BAND_ROWS)
+
+    # Raises a ValueError if manip_index within MANIPULATIONS can't be applied while OUT_OF_CORE is True, which is when
+    #     it has no footprint (so can't be split into bands), or when it depends on the coordinates of each pixel but
+    #     only has a per-pixel version (as the pixels of a band only know their position within the band)
+    def checkOutOfCore(self, manip_index):
+
+        operation = self.getOperation(manip_index)
+        if self.manipulationFootprint(manip_index) is None:
+            raise ValueError("Manipulation " + str(manip_index) + " (" + operation.name + ") has no footprint, so " +
+                             "can't be applied while OUT_OF_CORE is True")
+        if (operation.footprint == hypnic_operations.COORDINATE) and (operation.backends() == ["python"]):
+            raise ValueError("Manipulation " + str(manip_index) + " (" + operation.name + ") depends on the " +
+                             "coordinates of each pixel, so can't be applied to a band without a whole-frame version")
+
+    # Applies manip_index within MANIPULATIONS to region of self.bufferOut, one band of OUT_OF_CORE_BAND_ROWS rows at a
+    #     time (see hypnic_bands and self.rgbFuncBand())
+    # Raises a ValueError, without changing anything, if the manipulation can't be split into bands (see
+    #     self.checkOutOfCore())
+    def manipulateOutOfCore(self, manip_index, region, backend):
+
+        self.checkOutOfCore(manip_index)
+        footprint = self.manipulationFootprint(manip_index)
+        if MANIPULATE_PREVIOUS_OUTPUT:
+            sourceBuffer = self.bufferOut
         else:
-            return rgbResult
+            sourceBuffer = self.bufferIn
+
+        hypnic_bands.manipulateInBands(sourceBuffer, self.bufferOut, region, footprint, OUT_OF_CORE_BAND_ROWS,
+                                       self.rgbFuncBand, manip_index, backend)
+        # The summed-area table was last built from a single band, so must not be reused
+        self.summedAreaTable = None
+
+    # Applies manip_index within MANIPULATIONS to a single band of an image being manipulated out of core
+    # Takes the same first three parameters as self.rgbFuncArray()
+    # Uses the whole-frame version of the manipulation for backend if there is one, or else its "numba" version (when
+    #     numba is installed), or else its per-pixel version (see self.rgbFuncBandPixels())
+    def rgbFuncBand(self, bandArray, bandRegion, origin, manip_index, backend):
+
+        # Every band is a different image as far as the summed-area table is concerned
+        self.summedAreaTable = None
+        resultArray = None
+        if backend == "numba":
+            resultArray = self.rgbFuncNumba(manip_index, bandArray, bandRegion, origin)
+        if resultArray is None:
+            resultArray = self.rgbFuncArray(manip_index, bandArray, bandRegion, origin)
+        if (resultArray is None) and (backend != "numba"):
+            resultArray = self.rgbFuncNumba(manip_index, bandArray, bandRegion, origin)
+        if resultArray is None:
+            resultArray = self.rgbFuncBandPixels(bandArray, bandRegion, manip_index)
+        return resultArray
+
+    # Applies the per-pixel version of manip_index within MANIPULATIONS to bandRegion of bandArray, for manipulations
+    #     with no whole-frame version
+    # The band already holds every pixel that its own pixels read from (its halo rows and columns), so it's manipulated
+    #     by an ImageManipulator of its own as if it were the entire image, which needs no more memory than the band
+    # Pixels only know their position within the band, so manipulations which depend on a pixel's coordinates are never
+    #     applied this way (see self.checkOutOfCore())
+    def rgbFuncBandPixels(self, bandArray, bandRegion, manip_index):
+
+        operation = self.getOperation(manip_index)
+        bandManipulator = ImageManipulator(Image.fromarray(numpy.ascontiguousarray(bandArray, dtype=numpy.uint8)))
+        bandManipulator.manipulatePixels(operation, bandRegion, False)
+        x0, y0, x1, y1 = bandRegion
+        return numpy.asarray(bandManipulator.imageOut)[y0:y1, x0:x1].astype(numpy.int64)
+
+    # Applies the per-pixel version of operation to every pixel of region, row by row from top left to bottom right,
+    #     printing a bar of progress as it goes when showProgress is True
+    # The per-pixel version and the image it reads from are both looked up once, rather than once per pixel
+    # Neighborhood manipulations read from the image being written to, unless NEIGHBORHOOD_FEEDBACK is False, in which
+    #     case they read from a copy of it taken before the pass
+    def manipulatePixels(self, operation, region, showProgress=True):
+
+        kernel = operation.pixelKernel(self)
+        if MANIPULATE_PREVIOUS_OUTPUT:
+            pixelsSource = self.pixelsOut
+        else:
+            pixelsSource = self.pixelsIn
+        pixelsOut = self.pixelsOut
+        rowsPerPercent = self.yRes / 100.0
+
+        if operation.footprint == hypnic_operations.NEIGHBORHOOD:
+            if not MANIPULATE_PREVIOUS_OUTPUT:
+                self.imageReference = self.imageIn
+            elif NEIGHBORHOOD_FEEDBACK:
+                self.imageReference = self.imageOut
+            else:
+                self.imageReference = self.imageOut.copy()
+            self.pixelsReference = self.imageReference.load()
+            self.referenceStarting = False
+
+        x0, y0, x1, y1 = region
+        for y in range(y0, y1):
+            self.currentY = y
+            for x in range(x0, x1):
+                self.currentX = x
+                pixelsOut[x, y] = kernel(pixelsSource[x, y])
+            if showProgress and (y % rowsPerPercent < 1):
+                print("|", end="")
+        self.referenceStarting = True
 
-    # Calls self.rgbFunc() for each pixel.
-    # Also supports defining a random rectangle of pixels, redefined for each call of self.rgbFunc(), as opposed to
-    #     applying self.rgbFunc to every pixel in the entire image.
+    # Applies each manipulation within MANIPULATIONS in turn, rendering an output image after each of them
+    # Also supports defining a random rectangle of pixels, redefined for each manipulation, as opposed to applying each
+    #     manipulation to every pixel in the entire image.
     # TODO: Display a percent completion bar during the manipulation loop
     def manipulate(self):
 
-        num = 1
-        while self.numTotalManipulations == -1:
-            self.numTotalManipulations = self.rgbFunc(num)
-            num += 1
+        # Falls back to the "numpy" backend if "numba" was requested but the numba package isn't installed
+        backend = EXECUTION_BACKEND
+        if (backend == "numba") and (hypnic_numba is None):
+            print("================================================================")
+            print("WARNING: EXECUTION_BACKEND is \"numba\" but the numba package could not be imported.")
+            print("The \"numpy\" backend will be used instead.")
+            print("Relevant Python file:                           hypnic1.py")
+            print("Relevant function:                              ImageManipulator.manipulate()")
+            print()
+            backend = "numpy"
+
+        # Starts the pool of threads or processes which manipulation passes are split between, if enabled
+        # Never used when OUT_OF_CORE is True, as bands are manipulated one at a time
+        tileExecutor = None
+        if (TILE_EXECUTOR in ("thread", "process")) and (not OUT_OF_CORE):
+            # Every global constant (not including modules such as PIL), to be copied into each worker process
+            config = {name: value for name, value in globals().items()
+                      if name.isupper() and isinstance(value, (bool, int, float, str, type(None)))}
+            config["MANIPULATIONS"] = MANIPULATIONS
+            tileExecutor = hypnic_tiles.createExecutor(TILE_EXECUTOR, TILE_WORKERS or None, initializeTileWorker,
+                                                       (config, self.imageOut.mode, self.imageOut.size))
+        elif TILE_EXECUTOR not in (None, "thread", "process"):
+            print("================================================================")
+            print("WARNING: TILE_EXECUTOR is \"" + str(TILE_EXECUTOR) + "\", which is not a valid option.")
+            print("Manipulation passes will not be split into tiles.")
+            print("Relevant Python file:                           hypnic1.py")
+            print("Relevant function:                              ImageManipulator.manipulate()")
+            print()
+
+        self.numTotalManipulations = len(MANIPULATIONS)
+        num = self.numTotalManipulations + 1
 
         # If STOP_MANIPULATING_AFTER is being used and it is equal to or larger than self.numTotalManipulations,
         #   then we can shrink self.numTotalManipulations accordingly
@@ -1268,6 +1768,25 @@ class ImageManipulator:
             self.numTotalManipulations = math.ceil(STOP_MANIPULATING_AFTER)
         self.manipulationsList = list(range(1, self.numTotalManipulations))
 
+        # Finds the runs of manipulations which can be applied as a single pass, if enabled
+        self.fusedOperations = {}
+        if FUSE_COLOR_MANIPULATIONS and MANIPULATE_PREVIOUS_OUTPUT and (not RANDOMIZE_MANIPULATION_POSITIONS) and \
+                (not self.createsAnimation()) and (self.imageOut.mode == "RGB"):
+            runs = hypnic_operations.findFusibleRuns(MANIPULATIONS[:self.numTotalManipulations])
+            self.fusedOperations = {start + 1: operation for start, operation in runs.items()}
+
+        # Checks that every manipulation can be split into bands before any of them is applied, rather than failing
+        #     partway through the first round
+        if OUT_OF_CORE:
+            for manip_index in range(1, self.numTotalManipulations + 1):
+                self.checkOutOfCore(manip_index)
+            self.prepareBuffers()
+
+        # Starts the threads which output images are written on, if enabled
+        if WRITE_OUTPUT_IN_BACKGROUND:
+            self.imageWriter = hypnic_writer.ImageWriter(OUTPUT_WRITER_WORKERS, OUTPUT_WRITER_MAX_PENDING,
+                                                         OUTPUT_IMG_SAVE_PARAMETERS)
+
         if RANDOM_MANIPULATION_ORDER:
             sourceManipulationsList = self.manipulationsList
             self.manipulationsList = []
@@ -1277,8 +1796,6 @@ class ImageManipulator:
                 sourceManipulationsList.remove(elt)
                 num -= 1
 
-        numRows = self.yRes
-        rowsPerPercent = numRows / 100.0
         for n in range(NUM_ROUNDS_OF_MANIPULATION):
 
             if (n > 0) and (not MANIPULATE_PREVIOUS_OUTPUT):
@@ -1324,55 +1841,125 @@ class ImageManipulator:
                     x_bound_1 = 0
                     x_bound_2 = self.xRes - 1
 
+                # Ends the current round once every manipulation has been performed
+                operation = self.getOperation(m)
+                if operation is None:
+                    print(str(m - 1) + " inidividual image manipulation(s) performed. " +
+                          "Current round of manipulation has been completed.\n")
+                    self.manipulationComplete = True
+                    break
+
+                # Lets the operation build anything it needs for this pass, such as its color list
+                operation.prepare(self)
+
                 # Before beginning manipulation, prints the beginning of a "percentage completion console output" line
-                # This is ignored if m is greater than self.numTotalManipulations
-                if m <= self.numTotalManipulations:
-                    print("M" + str(m) + " PROGRESS: ", end="")
-                # Loops through every pixel in the image (row by row from top left to bottom right) and manipulates
-                for y in range(min(y_bound_1, y_bound_2), max(y_bound_1, y_bound_2)):
-
-                    if self.manipulationComplete:
-                        break
-
-                    for x in range(min(x_bound_1, x_bound_2), max(x_bound_1, x_bound_2)):
-                        if self.manipulationComplete:
-                            break
-                        self.currentX = x
-                        self.currentY = y
-                        result = self.rgbFunc(m)
-
-                        if result == 0:
-                            render = False
+                print("M" + str(m) + " (" + operation.name + ") PROGRESS: ", end="")
+
+                # Attempts to apply the whole manipulation at once, if enabled and supported for the current image
+                # The per-pixel loop below is skipped entirely when this succeeds
+                resultArray = None
+                tiled = False
+                outOfCore = False
+                region = (min(x_bound_1, x_bound_2), min(y_bound_1, y_bound_2),
+                          max(x_bound_1, x_bound_2), max(y_bound_1, y_bound_2))
+                regionValid = (region[2] > region[0]) and (region[3] > region[1])
+                # Tiles can only be used when the manipulation has declared how far each pixel reads from
+                tileable = (tileExecutor is not None) and (self.manipulationFootprint(m) is not None)
+                if OUT_OF_CORE and regionValid:
+                    self.manipulateOutOfCore(m, region, backend)
+                    print("|" * 100, end="")
+                    outOfCore = True
+                elif (backend != "python") and regionValid and (self.imageOut.mode == "RGB"):
+                    if MANIPULATE_PREVIOUS_OUTPUT:
+                        sourceArray = self.getImageOutArray()
+                    else:
+                        sourceArray = numpy.asarray(self.imageIn)
+                    if backend == "numba":
+                        resultArray = self.rgbFuncNumba(m, sourceArray, region)
+                    if resultArray is None:
+                        if tileable and (TILE_EXECUTOR == "thread"):
+                            resultArray = self.rgbFuncArrayTiled(m, sourceArray, region, tileExecutor)
                         else:
-                            self.pixelsOut[self.currentX, self.currentY] = result
-                            render = True
-
-                    # print(y)
-                    # Only print manipulation progress before self.manipulationComplete is true
-                    if not self.manipulationComplete:
-                        if y % rowsPerPercent < 1:
-                            #print("Manipulation " + str(m) + " progress:  " + str(round(y / rowsPerPercent)) + " PERCENT")
-                            print("|", end="")
-
-                # Increments the manipulation index, and clears the value of self.colorList for future use
-                m += 1
+                            resultArray = self.rgbFuncArray(m, sourceArray, region)
+
+                if resultArray is not None:
+                    self.imageOut.paste(Image.fromarray(hypnic_vectorized.toImageArray(resultArray)),
+                                        (region[0], region[1]))
+                    print("|" * 100, end="")
+                    render = True
+                elif regionValid and tileable and (TILE_EXECUTOR == "process"):
+                    self.rgbFuncTiled(m, region, tileExecutor)
+                    tiled = True
+                    print("|" * 100, end="")
+                    render = True
+
+                # Otherwise loops through every pixel in the area (row by row from top left to bottom right) and
+                #     manipulates each of them with the per-pixel version of the manipulation
+                if (resultArray is None) and (not tiled) and (not outOfCore):
+                    self.manipulatePixels(operation, region)
+
+                # Moves on to the manipulation after this one (or after the end of its run, if it was fused), and clears
+                #     the value of self.colorList for future use
+                m += operation.numManipulations
                 self.colorList = []
+                # Anything derived from the previous contents of self.imageOut is now out of date, but only within region
+                if regionValid:
+                    self.markImageOutChanged(region)
                 if render:
                     # When this statement is reached, a newline is printed as the percentage progress bar is done.
                     print()
                     # Then, the output image is rendered
                     self.renderOutputImage()
 
+        if tileExecutor is not None:
+            tileExecutor.shutdown()
+        # Waits for every output image to be written, as they may be read as soon as this function returns
+        if self.imageWriter is not None:
+            self.imageWriter.close()
+            self.imageWriter = None
+
         print("All rounds of image manipulation have been completed!\n")
         return 0
 
     # Saves an output image with filename based on the current frame number
+    # If nothing has been rewritten since the last output image, that image is reused instead of encoding an identical
+    #     one, and no new frame number is used up
+    # When self.imageWriter is in use, a copy of the image is handed to it to be saved in the background
     def renderOutputImage(self):
 
-        self.outputImagePath = Path(OUTPUT_IMG + "_" + str(self.currentImageIndex) + OUTPUT_IMG_EXTENSION)
+        dirtyRegion = self.changedRegionSince(self.renderedVersion)
+        if (dirtyRegion is not None) and (len(self.outputFileList) != 0) and \
+                ((dirtyRegion[2] <= dirtyRegion[0]) or (dirtyRegion[3] <= dirtyRegion[1])):
+            print("IMAGE " + str(self.currentImageIndex - 1) + " is unchanged, so has been reused.")
+            if self.createsAnimation():
+                self.outputFrameList.append(self.outputFrameList[-1])
+        else:
+            self.outputImagePath = Path(OUTPUT_IMG + "_" + str(self.currentImageIndex) + OUTPUT_IMG_EXTENSION)
+            if self.imageWriter is not None:
+                if OUT_OF_CORE:
+                    snapshot = hypnic_bands.bufferImage(self.bufferOut)
+                else:
+                    snapshot = self.imageOut.copy()
+                self.imageWriter.write(snapshot, self.outputImagePath)
+                print("IMAGE " + str(self.currentImageIndex) + " rendered and queued to be saved.")
+            else:
+                if OUT_OF_CORE:
+                    hypnic_bands.saveBuffer(self.bufferOut, self.outputImagePath, **OUTPUT_IMG_SAVE_PARAMETERS)
+                else:
+                    self.imageOut.save(self.outputImagePath, **OUTPUT_IMG_SAVE_PARAMETERS)
+                print("IMAGE " + str(self.currentImageIndex) + " rendered and saved.")
+            self.currentImageIndex += 1
+            # Keeps a copy of the image as a frame of the animations, along with its dirty rectangle relative to the
+            #     output image before it, so that only that area has to be compared when the animations are written
+            if self.createsAnimation():
+                baseNumber = self.outputFrameList[-1] if len(self.outputFrameList) != 0 else None
+                if OUT_OF_CORE:
+                    frameNumber = self.frameStore.add(self.bufferOut, baseNumber, dirtyRegion)
+                else:
+                    frameNumber = self.frameStore.add(self.imageOut, baseNumber, dirtyRegion)
+                self.outputFrameList.append(frameNumber)
         self.outputFileList.append(self.outputImagePath)
-        self.imageOut.save(self.outputImagePath)
-        print("IMAGE " + str(self.currentImageIndex) + " rendered and saved.")
+        self.renderedVersion = self.imageOutVersion
 
         if MANIPULATE_PREVIOUS_OUTPUT:
             self.imageReference = self.imageOut
@@ -1382,183 +1969,206 @@ class ImageManipulator:
         # Resets the value of self.referenceStarting for future use
         self.referenceStarting = True
         self.outputImageReady = True
-        self.currentImageIndex += 1
         return 0
 
     # Builds the self.frames list for Animation Mode 0
     # Transitions from input image to final output image, showing each intermediate output image sequentially
+    # Each image is repeated forwardRepeats times going forwards and reverseRepeats times going in reverse, and
+    #     destination is the path of the GIF or video being built (for console output)
+    def animationMode0(self, forwardRepeats, reverseRepeats, destination):
+        for filename, frameNumber in zip(self.outputFileList, self.outputFrameList):
+            for i in range(forwardRepeats):
+                self.frames.append(frameNumber)
+            print(str(forwardRepeats) + " frame(s) of output image " + str(filename) +
+                  " have been added to " + destination + ".")
 
-    def animationMode0(self):
-        for filename in self.outputFileList:
-            for i in range(GIF_FRAMES_PER_IMAGE_FORWARD):
-                self.frames.append(filename)
-            print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of output image " + str(filename) +
-                  " have been added to " + GIF_PATH + ".")
+        if REVERSE_ANIMATION_AT_END:
+            for filename, frameNumber in zip(reversed(self.outputFileList), reversed(self.outputFrameList)):
+                for i in range(reverseRepeats):
+                    self.frames.append(frameNumber)
+                print(str(reverseRepeats) + " frame(s) of output image " + str(filename) +
+                      " have been added to " + destination + ".")
+
+    # Returns the start and goal images of a transition animation (the input image and the final output image), as uint8
+    #     arrays of shape (height, width, 3) which must not be changed. See hypnic_animation.py
+    def transitionArrays(self):
+
+        if self.bufferOut is not None:
+            return numpy.asarray(self.bufferIn), numpy.asarray(self.bufferOut)
+        return numpy.asarray(self.imageIn.convert("RGB")), numpy.asarray(self.imageOut.convert("RGB"))
+
+    # Returns the frame numbers (within self.frameStore) of the frames of the current transition Animation Mode, adding
+    #     each frame returned by frameFunction(startArray, goalArray, *args) for every tuple of args within argsList to
+    #     self.frameStore (and saving it as an output image, if SAVE_ANIMATION_FRAMES is True) only if that hasn't
+    #     already been done for another animation
+    # Each frame is built on its own from the start and goal images (see self.transitionArrays()), which are never
+    #     changed, so frames are rendered in parallel as described by ANIMATION_EXECUTOR and added in order as they
+    #     arrive. When WRITE_OUTPUT_IN_BACKGROUND is True, saved frames are written while the next ones are rendered
+    def transitionFrames(self, frameFunction, argsList):
+
+        if self.animationMode not in self.transitionFrameNumbers:
+            kind = ANIMATION_EXECUTOR
+            if kind not in (None, "thread", "process"):
+                print("================================================================")
+                print("WARNING: ANIMATION_EXECUTOR is \"" + str(kind) + "\", which is not a valid option.")
+                print("Animation frames will be rendered one after another.")
+                print("Relevant Python file:                           hypnic1.py")
+                print("Relevant function:                              ImageManipulator.transitionFrames()")
+                print()
+                kind = None
+            numWorkers = ANIMATION_WORKERS or hypnic_tiles.defaultNumWorkers()
+            if numWorkers <= 1:
+                kind = None
+            frameWriter = None
+            if SAVE_ANIMATION_FRAMES and WRITE_OUTPUT_IN_BACKGROUND:
+                frameWriter = hypnic_writer.ImageWriter(OUTPUT_WRITER_WORKERS, OUTPUT_WRITER_MAX_PENDING,
+                                                        OUTPUT_IMG_SAVE_PARAMETERS)
+
+            startArray, goalArray = self.transitionArrays()
+            self.transitionStartIndex = self.currentImageIndex
+            frameNumbers = []
+            try:
+                for frame in hypnic_animation.renderFrames(startArray, goalArray, frameFunction, argsList, kind,
+                                                           numWorkers):
+                    frameNumbers.append(self.frameStore.add(frame))
+                    if SAVE_ANIMATION_FRAMES:
+                        framePath = Path(OUTPUT_IMG + "_" + str(self.transitionStartIndex) + OUTPUT_IMG_EXTENSION)
+                        if frameWriter is not None:
+                            frameWriter.write(Image.fromarray(frame), framePath)
+                            print("Output image " + str(framePath) + " rendered and queued to be saved.")
+                        else:
+                            Image.fromarray(frame).save(framePath, **OUTPUT_IMG_SAVE_PARAMETERS)
+                            print("Output image " + str(framePath) + " rendered and saved.")
+                    self.transitionStartIndex += 1
+            finally:
+                if frameWriter is not None:
+                    frameWriter.close()
+            self.transitionFrameNumbers[self.animationMode] = frameNumbers
+        return self.transitionFrameNumbers[self.animationMode]
+
+    # Replaces self.frames with each of frameNumbers repeated forwardRepeats times, for the transition Animation Modes
+    # Each image is repeated forwardRepeats times going forwards and reverseRepeats times going in reverse, and
+    #     destination is the path of the GIF or video being built (for console output)
+    def addTransitionFrames(self, frameNumbers, forwardRepeats, reverseRepeats, destination):
+
+        # Re-initializes self.frames in case a conflicting animation mode function has already been run
+        self.frames = []
+        for frameNumber in frameNumbers:
+            for i in range(forwardRepeats):
+                self.frames.append(frameNumber)
+            print(str(forwardRepeats) + " frame(s) of transition frame " + str(frameNumber) +
+                  " have been added to " + destination + ".")
 
+        # If animation reversal is enabled, appends all existing frame numbers to self.frames in reverse order
         if REVERSE_ANIMATION_AT_END:
-            for filename in reversed(self.outputFileList):
-                for i in range(GIF_FRAMES_PER_IMAGE_REVERSE):
-                    self.frames.append(filename)
-                print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of output image " + str(filename) +
-                      " have been added to " + GIF_PATH + ".")
+            for reversedFrame in reversed(self.frames):
+                self.frames.append(reversedFrame)
+            print(str(forwardRepeats) + " frame(s) of each transition frame have been added to " +
+                  destination + " in reverse.")
 
     # Builds the self.frames list for Animation Mode 1
     # Transitions from input image to final output image, wiping along in the X direction
-    def animationMode1(self):
+    def animationMode1(self, forwardRepeats, reverseRepeats, destination):
 
-        # Re-initializes key variables in case a conflicting animation mode function has already been run
-        self.transitionStartIndex = self.currentImageIndex
-        self.frames = []
         # Determines the number of pixels that will be wiped along the Y direction in each new frame
-        pixelsPerFrame = math.floor(self.yRes / ANIMATION_NUM_TRANSITION_FRAMES)
-        # Creates an entirely new set of output images to be used for frames in the animation
-        imageAnimation = self.imageIn
-        pixelsAnimation = imageAnimation.load()
-
-        for x in range(0, self.xRes):
-            # When this if statement triggers, the current pixelsAnimation image state should be exported as an image
-            #     file and the path should be appended to the frames list
-            if (x % pixelsPerFrame == 0) and (x != 0):
-                framePath = Path(OUTPUT_IMG + "_" + str(self.transitionStartIndex) + OUTPUT_IMG_EXTENSION)
-                imageAnimation.save(framePath)
-
-                for i in range(GIF_FRAMES_PER_IMAGE_FORWARD):
-                    self.frames.append(framePath)
-                    print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of output image " + str(framePath) +
-                          " have been added to " + GIF_PATH + ".")
-                print("Output image " + str(framePath) + " rendered and saved.")
-                self.transitionStartIndex += 1
-
-            for y in range(0, self.yRes):
-                pixelsAnimation[x, y] = self.pixelsOut[x, y]
-
-        # If animation reversal is enabled, appends all existing frame paths to self.frames in reverse order
-        if REVERSE_ANIMATION_AT_END:
-            for reversedFrame in reversed(self.frames):
-                self.frames.append(reversedFrame)
-            print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of output image " + str(reversedFrame) +
-                  " have been added to " + GIF_PATH + ".")
-
+        pixelsPerFrame = max(math.floor(self.yRes / ANIMATION_NUM_TRANSITION_FRAMES), 1)
+        positions = hypnic_animation.wipePositions(self.xRes, pixelsPerFrame)
+        frameNumbers = self.transitionFrames(hypnic_animation.wipeFrame, [(1, position) for position in positions])
+        self.addTransitionFrames(frameNumbers, forwardRepeats, reverseRepeats, destination)
         return 0
 
     # Builds the self.frames list for Animation Mode 2
     # Transitions from input image to output image, wiping along in the Y direction
-    def animationMode2(self):
+    def animationMode2(self, forwardRepeats, reverseRepeats, destination):
 
-        # Re-initializes key variables in case a conflicting animation mode function has already been run
-        self.transitionStartIndex = self.currentImageIndex
-        self.frames = []
         # Determines the number of pixels that will be wiped along the Y direction in each new frame
-        pixelsPerFrame = math.floor(self.yRes / ANIMATION_NUM_TRANSITION_FRAMES)
-        # Creates an entirely new set of output images to be used for frames in the animation
-        imageAnimation = self.imageIn
-        pixelsAnimation = imageAnimation.load()
-
-        for y in range(0, self.yRes):
-            # When this if statement triggers, the current pixelsAnimation image state should be exported as an image
-            #     file and the path should be appended to the frames list
-
-            if (y % pixelsPerFrame == 0) and (y != 0):
-                framePath = Path(OUTPUT_IMG + "_" + str(self.transitionStartIndex) + OUTPUT_IMG_EXTENSION)
-                imageAnimation.save(framePath)
-
-                for i in range(GIF_FRAMES_PER_IMAGE_FORWARD):
-                    self.frames.append(framePath)
-                    print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of output image " + str(framePath) +
-                          " have been added to " + GIF_PATH + ".")
-                print("Output image " + str(framePath) + " rendered and saved.")
-                self.transitionStartIndex += 1
-
-            for x in range(0, self.xRes):
-                pixelsAnimation[x, y] = self.pixelsOut[x, y]
-        # If animation reversal is enabled, appends all existing frame paths to self.frames in reverse order
-
-        if REVERSE_ANIMATION_AT_END:
-            for reversedFrame in reversed(self.frames):
-                self.frames.append(reversedFrame)
-            print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of output image " + str(reversedFrame) +
-                  " have been added to " + GIF_PATH + ".")
-
+        pixelsPerFrame = max(math.floor(self.yRes / ANIMATION_NUM_TRANSITION_FRAMES), 1)
+        positions = hypnic_animation.wipePositions(self.yRes, pixelsPerFrame)
+        frameNumbers = self.transitionFrames(hypnic_animation.wipeFrame, [(0, position) for position in positions])
+        self.addTransitionFrames(frameNumbers, forwardRepeats, reverseRepeats, destination)
         return 0
 
     # Builds the self.frames list for Animation Mode 3
     # Transitions each pixel's R, G, and B value from input color to final output color in a linear fashion
-    def animationMode3(self):
-
-        # Re-initializes key variables in case a conflicting animation mode function has already been run
-        self.transitionStartIndex = self.currentImageIndex
-        self.frames = []
-        # Determines the number of pixels that will be wiped along the Y direction in each new frame
-        pixelsPerFrame = math.floor(self.yRes / ANIMATION_NUM_TRANSITION_FRAMES)
-        # Creates an entirely new set of output images to be used for frames in the animation
-        imageAnimation = self.imageIn
-        pixelsAnimation = imageAnimation.load()
-        # Applies self.transitionRGB() to recalculate color values for each pixel for ANIMATION_NUM_TRANSITION_FRAMES
-        #     iterations until the self.pixelsOut[x, y] color value is reached for every pixel
-
-        for n in range(ANIMATION_NUM_TRANSITION_FRAMES):
-            for y in range(0, self.yRes):
-                for x in range(0, self.xRes):
-                    pixelsAnimation[x, y] = self.transitionRGB(pixelsAnimation[x, y],
-                                                               self.pixelsOut[x, y],
-                                                               ANIMATION_NUM_TRANSITION_FRAMES - n)
-
-            framePath = Path(OUTPUT_IMG + "_" + str(self.transitionStartIndex) + OUTPUT_IMG_EXTENSION)
-            imageAnimation.save(framePath)
-            for i in range(GIF_FRAMES_PER_IMAGE_FORWARD):
-                self.frames.append(framePath)
-
-            print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of output image " + str(framePath) +
-                  " have been added to " + GIF_PATH + ".")
-            print("Output image " + str(framePath) + " rendered and saved.")
-            self.transitionStartIndex += 1
-
-        # If animation reversal is enabled, appends all existing frame paths to self.frames in reverse order
-        if REVERSE_ANIMATION_AT_END:
-            for reversedFrame in reversed(self.frames):
-                self.frames.append(reversedFrame)
-            print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of output image " + str(reversedFrame) +
-                  " have been added to " + GIF_PATH + ".")
+    # Frame n is found directly, as the color reached after n + 1 steps of self.transitionRGB() towards the final output
+    #     color, which only depends on the difference between the two colors (see hypnic_animation.crossfadeOffsetTable())
+    def animationMode3(self, forwardRepeats, reverseRepeats, destination):
+
+        offsets = hypnic_animation.crossfadeOffsetTable(ANIMATION_NUM_TRANSITION_FRAMES)
+        frameNumbers = self.transitionFrames(hypnic_animation.crossfadeFrame,
+                                             [(stepOffsets,) for stepOffsets in offsets])
+        self.addTransitionFrames(frameNumbers, forwardRepeats, reverseRepeats, destination)
         return 0
 
-    # Creates an animated GIF with a separate frame for each rendered image
+    # Builds the self.frames list for the GIF or video at destination, based on self.animationMode, where each image is
+    #     repeated forwardRepeats times going forwards and reverseRepeats times going in reverse
     # Determines the type of animation (GIF and/or Video) which will be created. Options available are as follows
     # 0: Each frame represents an image created from a given manipulation index, in order of creation
     # 1: Animation transitions from input image to final output image, wiping along the X direction
     # 2: Animation transitions from input image to final output image, wiping along the Y direction
     # 3: Each pixel slowly transitions from the input RGB color to the output RGB color
     #      This is done in a linear manner for each respective color
-    def generateGIF(self):
+    def buildFrames(self, forwardRepeats, reverseRepeats, destination):
 
+        self.frames = []
         # No matter what, the first frame(s) will always be the input image
-        for i in range(GIF_FRAMES_PER_IMAGE_FORWARD):
-            self.frames.append(Path(INPUT_IMG))
-        print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of " + INPUT_IMG + " have been added to " + GIF_PATH + ".")
+        if self.inputFrameNumber is None:
+            with Image.open(INPUT_IMG) as inputImage:
+                self.inputFrameNumber = self.frameStore.add(inputImage)
+        for i in range(forwardRepeats):
+            self.frames.append(self.inputFrameNumber)
+        print(str(forwardRepeats) + " frame(s) of " + INPUT_IMG + " have been added to " + destination + ".")
 
         # Calls the proper function, based on self.animationMode, to build self.frames
         if self.animationMode == 0:
-            self.animationMode0()
+            self.animationMode0(forwardRepeats, reverseRepeats, destination)
         elif self.animationMode == 1:
-            self.animationMode1()
+            self.animationMode1(forwardRepeats, reverseRepeats, destination)
         elif self.animationMode == 2:
-            self.animationMode2()
+            self.animationMode2(forwardRepeats, reverseRepeats, destination)
         elif self.animationMode == 3:
-            self.animationMode3()
+            self.animationMode3(forwardRepeats, reverseRepeats, destination)
         else:
             print("ERROR: Animation mode " + str(self.animationMode) + " is not a valid mode!")
 
         # If animation reversal mode is enabled, then the input image frame(s) is/are included at the end as well
         if REVERSE_ANIMATION_AT_END:
-            for i in range(GIF_FRAMES_PER_IMAGE_REVERSE):
-                self.frames.append(Path(INPUT_IMG))
-            print(str(GIF_FRAMES_PER_IMAGE_FORWARD) + " frame(s) of " + INPUT_IMG + " have been added to " + GIF_PATH + ".")
+            for i in range(reverseRepeats):
+                self.frames.append(self.inputFrameNumber)
+            print(str(reverseRepeats) + " frame(s) of " + INPUT_IMG + " have been added to " + destination + ".")
+
+        return self.frames
+
+    # Creates an animated GIF with a separate frame for each rendered image (see self.buildFrames())
+    # Frames are read from self.frameStore one at a time and handed straight to the GIF encoder, which writes repeated
+    #     frames once (shown for longer) and only the changed area of every other frame (see hypnic_gif.py)
+    def generateGIF(self):
+
+        self.buildFrames(GIF_FRAMES_PER_IMAGE_FORWARD, GIF_FRAMES_PER_IMAGE_REVERSE, GIF_PATH)
 
         if len(self.frames) != 0:
             print("\nRendering animated GIF...")
-            for frame in self.frames:
-                self.imageioFrames.append(imageio.imread(frame))
-            kargs = {'duration': GIF_SECONDS_PER_FRAME}
-            imageio.mimsave(GIF_PATH, self.imageioFrames, format="GIF", **kargs)
+            palette = None
+            executor = None
+            if GIF_PALETTE_MODE == "global":
+                samples = hypnic_quantize.samplePixels(self.frameStore, self.frames, GIF_PALETTE_SAMPLES)
+                palette = hypnic_quantize.buildPalette(samples, 256, GIF_PALETTE_KMEANS)
+                numWorkers = GIF_REMAP_WORKERS or hypnic_tiles.defaultNumWorkers()
+                if numWorkers > 1:
+                    executor = hypnic_tiles.createExecutor("process", numWorkers)
+            elif GIF_PALETTE_MODE != "frame":
+                print("================================================================")
+                print("WARNING: GIF_PALETTE_MODE is \"" + str(GIF_PALETTE_MODE) + "\", which is not a valid option.")
+                print("Each frame will be given its own palette instead.")
+                print("Relevant Python file:                           hypnic1.py")
+                print("Relevant function:                              ImageManipulator.generateGIF()")
+                print()
+            try:
+                hypnic_gif.writeGIF(GIF_PATH, self.frameStore, self.frames, GIF_SECONDS_PER_FRAME, 0, palette,
+                                    GIF_DITHER_STRENGTH, executor)
+            finally:
+                if executor is not None:
+                    executor.shutdown()
             print("Animated GIF rendered and saved!")
             self.gifReady = True
         else:
@@ -1566,12 +2176,86 @@ class ImageManipulator:
 
         return 0
 
-    # Creates a video animation with a separate frame for each rendered image
+    # Creates an animated WebP with a separate frame for each rendered image (see self.buildFrames()), using the same
+    #     frames and timing as the GIF
+    # Frames are read from self.frameStore and encoded losslessly in full color, so no palette is built or applied.
+    #     Only the changed area of each frame is encoded (see hypnic_webp.py)
+    def generateWebP(self):
+
+        if not hypnic_webp.isAvailable():
+            print("================================================================")
+            print("WARNING: CREATE_WEBP is True but PIL was built without support for animated WebPs.")
+            print("No animated WebP will be created.")
+            print("Relevant Python file:                           hypnic1.py")
+            print("Relevant function:                              ImageManipulator.generateWebP()")
+            print()
+            return 0
+
+        self.buildFrames(GIF_FRAMES_PER_IMAGE_FORWARD, GIF_FRAMES_PER_IMAGE_REVERSE, WEBP_PATH)
+
+        if len(self.frames) != 0:
+            print("\nRendering animated WebP...")
+            hypnic_webp.writeWebP(WEBP_PATH, self.frameStore, self.frames, GIF_SECONDS_PER_FRAME, 0, WEBP_METHOD,
+                                  WEBP_EFFORT)
+            print("Animated WebP rendered and saved!")
+            self.webpReady = True
+        else:
+            print("ERROR: self.frames() is empty, so an animated WebP cannot be created!")
+
+        return 0
+
+    # Creates an animated PNG with a separate frame for each rendered image (see self.buildFrames()), using the same
+    #     frames and timing as the GIF
+    # Frames are read from self.frameStore one at a time and written in full color, with repeated frames written once
+    #     (shown for longer) and only the changed area of every other frame (see hypnic_apng.py)
+    def generateAPNG(self):
+
+        self.buildFrames(GIF_FRAMES_PER_IMAGE_FORWARD, GIF_FRAMES_PER_IMAGE_REVERSE, APNG_PATH)
+
+        if len(self.frames) != 0:
+            print("\nRendering animated PNG...")
+            hypnic_apng.writeAPNG(APNG_PATH, self.frameStore, self.frames, GIF_SECONDS_PER_FRAME, 0,
+                                  APNG_COMPRESS_LEVEL)
+            print("Animated PNG rendered and saved!")
+            self.apngReady = True
+        else:
+            print("ERROR: self.frames() is empty, so an animated PNG cannot be created!")
+
+        return 0
+
+    # Creates a video with a separate frame for each rendered image (see self.buildFrames())
+    # Frames are piped straight from self.frameStore into an ffmpeg process as they're read, and repeated frames are
+    #     encoded once and shown for longer (see hypnic_video.py)
     def generateVideo(self):
 
-        print("Video generation has not yet been implemented!")
+        if not hypnic_video.isAvailable():
+            print("================================================================")
+            print("WARNING: CREATE_VIDEO is True but the imageio-ffmpeg package could not be imported.")
+            print("No video will be created.")
+            print("Relevant Python file:                           hypnic1.py")
+            print("Relevant function:                              ImageManipulator.generateVideo()")
+            print()
+            return 0
+
+        self.buildFrames(VIDEO_FRAMES_PER_IMAGE_FORWARD, VIDEO_FRAMES_PER_IMAGE_REVERSE, VIDEO_PATH)
+
+        if len(self.frames) != 0:
+            print("\nRendering video...")
+            hypnic_video.writeVideo(VIDEO_PATH, self.frameStore, self.frames, VIDEO_FRAMES_PER_SECOND, VIDEO_CODEC,
+                                    VIDEO_QUALITY)
+            print("Video rendered and saved!")
+            self.videoReady = True
+        else:
+            print("ERROR: self.frames() is empty, so a video cannot be created!")
+
         return 0
 
+    # Returns whether any animation (GIF, video, animated WebP or animated PNG) is being created, in which case every
+    #     output image is also kept as a frame within self.frameStore
+    @staticmethod
+    def createsAnimation():
+        return CREATE_GIF or CREATE_VIDEO or CREATE_WEBP or CREATE_APNG
+
     # Ensures that the directory specified for the output image(s) exists to avoid errors
     @staticmethod
     def prepareDirectories():
@@ -1582,13 +2266,25 @@ class ImageManipulator:
             os.makedirs(output_image_directory, exist_ok=True)
 
         if CREATE_GIF:
-            gif_directory = Path.cwd() / GIF_PATH
+            gif_directory = (Path.cwd() / GIF_PATH).parent
             os.makedirs(gif_directory, exist_ok=True)
 
         if CREATE_VIDEO:
-            video_directory = Path.cwd() / GIF_PATH
+            video_directory = (Path.cwd() / VIDEO_PATH).parent
             os.makedirs(video_directory, exist_ok=True)
 
+        if CREATE_WEBP:
+            webp_directory = (Path.cwd() / WEBP_PATH).parent
+            os.makedirs(webp_directory, exist_ok=True)
+
+        if CREATE_APNG:
+            apng_directory = (Path.cwd() / APNG_PATH).parent
+            os.makedirs(apng_directory, exist_ok=True)
+
+        if OUT_OF_CORE:
+            buffer_directory = Path.cwd() / OUT_OF_CORE_DIRECTORY
+            os.makedirs(buffer_directory, exist_ok=True)
+
         print("ALL DIRECTORIES PREPARED SUCCESSFULLY.\n")
 
 
@@ -1616,8 +2312,54 @@ def main():
             manip.generateGIF()
         if CREATE_VIDEO:
             manip.generateVideo()
+        if CREATE_WEBP:
+            manip.generateWebP()
+        if CREATE_APNG:
+            manip.generateAPNG()
 
     return 0
 
 
-main()
\ No newline at end of file
+# TILE WORKERS
+# Used by the worker processes that manipulation passes are split between when TILE_EXECUTOR is "process"
+# Each worker process holds a single ImageManipulator with full-size images, into which every tile it receives is
+#     pasted, so that all coordinates (and clipping at the edges of the image) are the same as in the main process
+# Only the pixels of the tile and its halo are ever up to date, which is all that the manipulation may read from
+
+# The ImageManipulator of the current worker process
+tileManipulator = None
+
+
+# Called once within every new worker process
+# config holds the value of every global constant within the main process, which may differ from the ones in this file
+#   if they were changed while the program was running
+def initializeTileWorker(config, mode, size):
+    global tileManipulator
+    globals().update(config)
+    tileManipulator = ImageManipulator(Image.new(mode, size))
+
+
+# Applies operation (see hypnic_operations.py) to every pixel of tile, returning the resulting area as an Image
+# The operation itself is sent rather than its manip_index, as it may be one that was fused within the main process
+# haloImage holds the pixels of the halo region (which contains tile) from the image being manipulated
+def manipulateTile(tile, operation, halo, haloImage):
+    manipulator = tileManipulator
+    manipulator.manipulationComplete = False
+    manipulator.colorList = []
+    manipulator.colorListHSV = []
+    manipulator.imageIn.paste(haloImage, (halo[0], halo[1]))
+    manipulator.imageOut.paste(haloImage, (halo[0], halo[1]))
+    manipulator.imageOutVersion += 1
+    # Gives the neighborhood functions a summed-area table of the halo alone, rather than of the full-size images
+    if USE_SUMMED_AREA_TABLES and (haloImage.mode == "RGB"):
+        manipulator.summedAreaTable = hypnic_vectorized.summedAreaTable(numpy.asarray(haloImage))
+        manipulator.summedAreaTableKey = manipulator.getReferenceKey()
+        manipulator.summedAreaTableOrigin = (halo[0], halo[1])
+
+    manipulator.manipulatePixels(operation, tile, False)
+    return manipulator.imageOut.crop(tile)
+
+
+# Worker processes import this file without running main()
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,123 @@
+# TODO:
+#  ==============================================================================
+#  S. Every frame of a transition animation must be identical to the one built by stepping through the transition
+#     a frame at a time (including ImageManipulator.transitionRGB()'s rounding at every step), while depending on
+#     nothing but the start image, the goal image, and its own position within the animation
+#  ==============================================================================
+#  A. Frames are only ever RGB, so the alpha channel of an RGBA input image is dropped from transition animations
+#  B. Worker processes copy every frame they render back to the main process, so rendering on processes only pays off
+#     when building a frame takes longer than copying it
+
+__name__ = "hypnic_animation"
+
+# Library Imports
+import numpy
+
+# Local Imports
+import hypnic_tiles
+
+
+# T R A N S I T I O N   C O N V E N T I O N S
+# A transition animation goes from a start image (the input image) to a goal image (the final output image), both given
+#   as uint8 arrays of shape (height, width, 3). Each of its frames is built directly from those two arrays, so frames
+#   can be built in any order, lazily, or in parallel, and neither array is ever changed
+# The frames of each animation mode are numbered from 0, and are:
+#   1: wipes along the X direction, where frame n shows the goal image to the left of wipePositions()[n], and the start
+#       image everywhere else
+#   2: wipes along the Y direction, where frame n shows the goal image above wipePositions()[n] instead
+#   3: a crossfade, where frame n is the start image after n + 1 steps of ImageManipulator.transitionRGB() towards the
+#       goal image, out of numSteps in total
+# Every frame function takes the start and goal arrays followed by the arguments of its own frame, so renderFrames()
+#   can build any number of them at once on a pool of threads or processes, and hand them back in order
+
+
+# Returns the position reached by each frame of a wipe along an axis of length pixels, moving pixelsPerFrame at a time
+# No frame is made for the start (position 0) or for anything at or beyond the far edge
+def wipePositions(length, pixelsPerFrame):
+    return list(range(pixelsPerFrame, length, pixelsPerFrame))
+
+
+# Returns a frame of a wipe, showing goalArray before position along axis (1 for X, 0 for Y), and startArray after it
+def wipeFrame(startArray, goalArray, axis, position):
+    frame = numpy.array(startArray)
+    if axis == 1:
+        frame[:, :position] = goalArray[:, :position]
+    else:
+        frame[:position] = goalArray[:position]
+    return frame
+
+
+# Returns an int64 array of shape (numSteps, 511), holding how far a channel has moved after n + 1 steps of
+#   ImageManipulator.transitionRGB() (at [n, difference + 255]), where difference is the goal value minus the start value
+# A channel's path depends on nothing but that difference, so each path is stepped through once here, for every possible
+#   difference at once, and any frame is then a single lookup per channel
+def crossfadeOffsetTable(numSteps):
+    differences = numpy.arange(-255, 256, dtype=numpy.int64)
+    offsets = numpy.empty((numSteps, len(differences)), dtype=numpy.int64)
+    moved = numpy.zeros(len(differences), dtype=numpy.int64)
+    for n in range(numSteps):
+        # round() rounds half-way values to even, exactly as numpy.rint() does
+        moved += numpy.rint((differences - moved).astype(numpy.float64) / float(numSteps - n)).astype(numpy.int64)
+        offsets[n] = moved
+    return offsets
+
+
+# Returns frame n of a crossfade from startArray to goalArray, where stepOffsets is row n of the table returned by
+#   crossfadeOffsetTable() (so that only that row has to be sent to a worker process)
+def crossfadeFrame(startArray, goalArray, stepOffsets):
+    start = numpy.asarray(startArray, dtype=numpy.int64)
+    differences = numpy.asarray(goalArray, dtype=numpy.int64) - start
+    return (start + stepOffsets[differences + 255]).astype(numpy.uint8)
+
+
+# P A R A L L E L   R E N D E R I N G
+# Used by the worker processes that frames are rendered on when renderFrames() is given kind "process"
+# The start and goal arrays are copied into each worker process just once, when it starts, rather than with every frame
+
+# The start and goal arrays of the current worker process
+workerStartArray = None
+workerGoalArray = None
+
+
+# Called once within every new worker process
+def initializeWorker(startArray, goalArray):
+    global workerStartArray, workerGoalArray
+    workerStartArray = startArray
+    workerGoalArray = goalArray
+
+
+# Returns frameFunction(startArray, goalArray, *args) using the start and goal arrays of the current worker process
+def renderWorkerFrame(frameFunction, args):
+    return frameFunction(workerStartArray, workerGoalArray, *args)
+
+
+# Yields frameFunction(startArray, goalArray, *args) for every tuple of args within argsList, in order
+# kind is None to render every frame one after another, or "thread" or "process" to render them on a pool of numWorkers
+#   threads or processes (see hypnic_tiles.createExecutor()), where frameFunction must be a function of this or another
+#   module so that it can be sent to them. Frames are still yielded in order, no matter which finishes first
+# At most maxPending frames (twice the number of workers, if None) are handed over at once, so that frames which finish
+#   early never all have to be held in memory while waiting for the ones before them
+def renderFrames(startArray, goalArray, frameFunction, argsList, kind=None, numWorkers=None, maxPending=None):
+    if kind is None:
+        for args in argsList:
+            yield frameFunction(startArray, goalArray, *args)
+        return
+
+    if numWorkers is None:
+        numWorkers = hypnic_tiles.defaultNumWorkers()
+    if maxPending is None:
+        maxPending = 2 * numWorkers
+    executor = hypnic_tiles.createExecutor(kind, numWorkers, initializeWorker, (startArray, goalArray))
+    try:
+        pending = []
+        for args in argsList:
+            if len(pending) >= maxPending:
+                yield pending.pop(0).result()
+            if kind == "process":
+                pending.append(executor.submit(renderWorkerFrame, frameFunction, args))
+            else:
+                pending.append(executor.submit(frameFunction, startArray, goalArray, *args))
+        for future in pending:
+            yield future.result()
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,169 @@
+# TODO:
+#  ==============================================================================
+#  S. Every frame must look exactly as it would if it were encoded whole, in full color. Only pixels that differ from
+#     the frame before it may be left out, and the frames before it must never be cleared (APNG_DISPOSE_OP_NONE)
+#  ==============================================================================
+#  A. Each frame's changed rectangle is compressed on its own, so the compressor can't make use of anything that was
+#     already written for an earlier frame
+#  B. Frames that repeat later on (such as when REVERSE_ANIMATION_AT_END is True) are encoded again, since the
+#     rectangle that changed is different each time
+
+__name__ = "hypnic_apng"
+
+# Library Imports
+from fractions import Fraction
+from io import BytesIO
+import struct
+import zlib
+import numpy
+from PIL import Image
+
+# Local Imports
+import hypnic_frames
+import hypnic_gif
+
+
+# A P N G   W R I T E R   C O N V E N T I O N S
+# An APNGWriter writes an animated PNG one frame at a time in the same way as a GIFWriter (see hypnic_gif.py), so only
+#   the frame being written and the one before it are ever held in memory, and frames are uint8 arrays of shape
+#   (height, width, 3). Unlike a GIF, every frame keeps all of its colors, so no palette is ever needed
+# Consecutive frames with identical contents are written once, with the durations of all of them added together
+# Every frame after the first only holds its delta rectangle (see hypnic_gif.changedRectangle()), which replaces the
+#   pixels within that rectangle (APNG_BLEND_OP_SOURCE) and leaves every other pixel as it was
+# The number of frames is only known once the last one has been written, so it's filled into the animation control
+#   chunk (which comes before every frame) when the APNG is closed
+
+# The signature found at the start of every PNG file
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+# Returns a PNG chunk of the given type (such as b"IDAT") holding data, along with its length and checksum
+def pngChunk(chunkType, data):
+    return struct.pack(">I", len(data)) + chunkType + data + struct.pack(">I", zlib.crc32(chunkType + data))
+
+
+# Returns the compressed image data (the contents of every IDAT chunk, joined together) of image encoded as a PNG
+# The encoding itself is left to PIL, which also chooses the filter used for each row
+def compressedImageData(image, compressLevel):
+    encoded = BytesIO()
+    image.save(encoded, "PNG", compress_level=compressLevel)
+    encoded = encoded.getvalue()
+    data = []
+    position = len(PNG_SIGNATURE)
+    while position < len(encoded):
+        length = struct.unpack(">I", encoded[position:position + 4])[0]
+        if encoded[position + 4:position + 8] == b"IDAT":
+            data.append(encoded[position + 8:position + 8 + length])
+        position += length + 12
+    return b"".join(data)
+
+
+class APNGWriter():
+
+    # path is where the APNG is written, and loop is how many times it repeats (0 for forever)
+    # compressLevel is between 0 (fastest) and 9 (smallest), as used by PIL's PNG encoder
+    def __init__(self, path, loop=0, compressLevel=6):
+
+        self.file = open(path, "wb")
+        self.loop = loop
+        self.compressLevel = compressLevel
+        # The last frame added, which is only written once a different frame arrives (or the APNG is closed), so that
+        #     the durations of any identical frames after it can be added to its own
+        self.pendingArray = None
+        self.pendingDuration = 0
+        # The rectangle outside of which the pending frame is known to be identical to the frame shown before it, or
+        #     None if that isn't known
+        self.pendingRegion = None
+        # The frame shown before the pending one, which its delta rectangle is found against
+        self.previousArray = None
+        # The position within the file of the animation control chunk, once the header has been written
+        self.controlPosition = None
+        # The number of frames written so far, and the sequence number of the next frame control or frame data chunk
+        self.numFrames = 0
+        self.sequenceNumber = 0
+
+    # Adds a frame to the APNG, to be shown for duration milliseconds
+    # If given, region is a rectangle outside of which the frame is known to be identical to the frame added before it
+    #     (see hypnic_frames.FrameStore.changedRegion()), so that only the pixels within it have to be compared
+    def addFrame(self, frameArray, duration, region=None):
+
+        frameArray = numpy.asarray(frameArray)[..., :3]
+        if (self.pendingArray is not None) and \
+                (hypnic_gif.changedRectangle(self.pendingArray, frameArray, region) is None):
+            self.pendingDuration += duration
+            return
+        self.writePending()
+        self.pendingArray = numpy.array(frameArray)
+        self.pendingDuration = duration
+        self.pendingRegion = region
+
+    # Returns the animation control chunk, which holds the number of frames and how many times they're played
+    def animationControl(self):
+        return pngChunk(b"acTL", struct.pack(">II", self.numFrames, self.loop))
+
+    # Writes the header, which describes the whole canvas, and a placeholder for the animation control chunk
+    def writeHeader(self, width, height):
+
+        self.file.write(PNG_SIGNATURE)
+        # 8 bits per channel, RGB, with the default compression, filtering and (no) interlacing
+        self.file.write(pngChunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        self.controlPosition = self.file.tell()
+        self.file.write(self.animationControl())
+
+    # Writes the pending frame (if there is one), holding only its delta rectangle
+    def writePending(self):
+
+        if self.pendingArray is None:
+            return
+        if self.previousArray is None:
+            rectangle = (0, 0, self.pendingArray.shape[1], self.pendingArray.shape[0])
+            self.writeHeader(rectangle[2], rectangle[3])
+        else:
+            rectangle = hypnic_gif.changedRectangle(self.previousArray, self.pendingArray, self.pendingRegion)
+        x0, y0, x1, y1 = rectangle
+        area = Image.fromarray(numpy.ascontiguousarray(self.pendingArray[y0:y1, x0:x1]))
+
+        # Each delay is a fraction of a second, with a numerator and denominator of at most 65535
+        delay = Fraction(self.pendingDuration / 1000).limit_denominator(65535)
+        # Neither disposed of (APNG_DISPOSE_OP_NONE) nor blended with (APNG_BLEND_OP_SOURCE) what was shown before it
+        self.file.write(pngChunk(b"fcTL", struct.pack(">IIIIIHHBB", self.sequenceNumber, x1 - x0, y1 - y0, x0, y0,
+                                                      delay.numerator, delay.denominator, 0, 0)))
+        self.sequenceNumber += 1
+        data = compressedImageData(area, self.compressLevel)
+        # The first frame is also the image shown by anything which can't play APNGs
+        if self.numFrames == 0:
+            self.file.write(pngChunk(b"IDAT", data))
+        else:
+            self.file.write(pngChunk(b"fdAT", struct.pack(">I", self.sequenceNumber) + data))
+            self.sequenceNumber += 1
+        self.numFrames += 1
+
+        self.previousArray = self.pendingArray
+        self.pendingArray = None
+
+    # Writes the last frame and the end of the APNG, fills in the number of frames, then closes its file
+    def close(self):
+
+        try:
+            self.writePending()
+            self.file.write(pngChunk(b"IEND", b""))
+            if self.controlPosition is not None:
+                self.file.seek(self.controlPosition)
+                self.file.write(self.animationControl())
+        finally:
+            self.file.close()
+
+
+# Writes an animated PNG at path showing the frames of frameStore (see hypnic_frames.py) given by frameNumbers in order,
+#   each for secondsPerFrame seconds. Runs of the same frame number become a single frame shown for longer, and each
+#   distinct frame is read from frameStore just once per run
+# As with hypnic_gif.writeGIF(), only the rectangle (if known) within which a frame differs from the one before it is
+#   compared to find its delta rectangle
+def writeAPNG(path, frameStore, frameNumbers, secondsPerFrame, loop=0, compressLevel=6):
+    runs = hypnic_frames.collapseRepeats(frameNumbers)
+    writer = APNGWriter(path, loop, compressLevel)
+    try:
+        for (frameNumber, count), region in zip(runs, hypnic_gif.changedRegions(frameStore, runs)):
+            writer.addFrame(frameStore.get(frameNumber), secondsPerFrame * 1000 * count, region)
+    finally:
+        writer.close()
@@ -0,0 +1,102 @@
+# TODO:
+#  ==============================================================================
+#  S. Manipulating an image in bands must never change its output, in the same way as splitting it into tiles (see
+#     hypnic_tiles.py). Each band is given every row that its manipulation could read from
+#  ==============================================================================
+#  A. Decoding the input image and encoding each output image still require a full in-memory copy of the image for the
+#     duration of that step, as PIL can't decode or encode common formats piece by piece
+
+__name__ = "hypnic_bands"
+
+# Library Imports
+import numpy
+from PIL import Image
+
+# Local Imports
+import hypnic_vectorized
+
+
+# B U F F E R   C O N V E N T I O N S
+# A buffer is a uint8 numpy.memmap of shape (height, width, 3), indexed as buffer[y, x] like every other image array,
+#   whose contents live in a raw file on disk rather than in memory
+# The operating system only keeps the parts of a buffer which are in use in memory, so the working memory required
+#   to manipulate an image this way depends on the size of each band rather than the size of the image
+# A band is a group of consecutive rows, described (like tiles) as an (x0, y0, x1, y1) rectangle
+
+
+# Creates a new buffer at path, overwriting any existing file
+def createBuffer(path, width, height):
+    return numpy.memmap(path, dtype=numpy.uint8, mode="w+", shape=(height, width, 3))
+
+
+# Creates a new buffer at path holding the RGB contents of the image file at imagePath
+def createBufferFromImage(path, imagePath, bandRows):
+    with Image.open(imagePath) as image:
+        image = image.convert("RGB")
+        buffer = createBuffer(path, image.size[0], image.size[1])
+        for bandY0 in range(0, image.size[1], bandRows):
+            bandY1 = min(bandY0 + bandRows, image.size[1])
+            buffer[bandY0:bandY1] = numpy.asarray(image.crop((0, bandY0, image.size[0], bandY1)))
+    buffer.flush()
+    return buffer
+
+
+# Copies the contents of one buffer into another of the same size, a band at a time
+def copyBuffer(sourceBuffer, destinationBuffer, bandRows):
+    for bandY0 in range(0, sourceBuffer.shape[0], bandRows):
+        destinationBuffer[bandY0:bandY0 + bandRows] = sourceBuffer[bandY0:bandY0 + bandRows]
+    destinationBuffer.flush()
+
+
+# Returns an Image holding a copy of the contents of buffer, which later changes to buffer won't affect
+def bufferImage(buffer):
+    return Image.fromarray(numpy.array(buffer))
+
+
+# Saves the contents of buffer as an image file at imagePath, passing any saveParameters on to PIL.Image.save()
+def saveBuffer(buffer, imagePath, **saveParameters):
+    Image.fromarray(numpy.asarray(buffer)).save(imagePath, **saveParameters)
+
+
+# Applies a manipulation to region of sourceBuffer one band of bandRows rows at a time, writing the results into the
+#   same region of outputBuffer (which may be the same buffer as sourceBuffer)
+# function(bandArray, bandRegion, origin, *args) is called for each band, and must return the same kind of result as
+#   ImageManipulator.rgbFuncArray() (whose parameters these match) or None if it can't manipulate the band
+# footprint is the number of pixels beyond its own position which the manipulation of a pixel may read from, and
+#   each band is read with that many extra rows and columns on every side (see hypnic_tiles.py)
+# Returns False, without writing anything, if function returns None. Otherwise returns True
+def manipulateInBands(sourceBuffer, outputBuffer, region, footprint, bandRows, function, *args):
+    x0, y0, x1, y1 = region
+    yRes, xRes = sourceBuffer.shape[0], sourceBuffer.shape[1]
+    # Neighborhoods which extend on every side (positiveOnly=False) are found by rounding half-way values to even, so
+    #     their extent depends on whether a coordinate is odd or even. Bands are always read from an even row and
+    #     column so that this is the same within a band as within the whole image, which may take one extra row above
+    above = footprint + 1
+    # Every row which a band reads above itself must belong to the band just before it, and no earlier band
+    bandRows = max(bandRows, above, 1)
+    readX0 = max(x0 - footprint, 0)
+    readX0 -= readX0 % 2
+    readX1 = min(x1 + footprint, xRes)
+
+    # When reading from the buffer being written to, the rows at the bottom of the previous band have already been
+    #     overwritten by the time the next band reads them, so a copy of their original contents is kept
+    previousRows = None
+    for bandY0 in range(y0, y1, bandRows):
+        bandY1 = min(bandY0 + bandRows, y1)
+        readY0 = max(bandY0 - footprint, 0)
+        readY0 -= readY0 % 2
+        readY1 = min(bandY1 + footprint, yRes)
+        bandArray = numpy.array(sourceBuffer[readY0:readY1, readX0:readX1])
+        if (sourceBuffer is outputBuffer) and (previousRows is not None) and (bandY0 > readY0):
+            bandArray[:bandY0 - readY0] = previousRows[len(previousRows) - (bandY0 - readY0):]
+
+        resultArray = function(bandArray, (x0 - readX0, bandY0 - readY0, x1 - readX0, bandY1 - readY0),
+                               (readX0, readY0), *args)
+        if resultArray is None:
+            return False
+
+        previousRows = bandArray[max(bandY1 - above, readY0) - readY0:bandY1 - readY0].copy()
+        outputBuffer[bandY0:bandY1, x0:x1] = hypnic_vectorized.toImageArray(resultArray)
+
+    outputBuffer.flush()
+    return True
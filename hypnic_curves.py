@@ -0,0 +1,135 @@
+# TODO:
+#  ==============================================================================
+#  S. A curve must only ever be built from a function of a single 0-255 value. Anything which depends on more than one
+#     channel at once belongs in a 3D lookup table instead (see hypnic_luts.py)
+#  ==============================================================================
+
+__name__ = "hypnic_curves"
+
+# Library Imports
+import numpy
+
+# Local Imports
+import hypnic_vectorized
+
+
+# C U R V E   C O N V E N T I O N S
+# A curve is an int64 array of 256 entries holding the output value for every possible input R, G, or B value, so that
+#   it can be applied to a whole channel at once by indexing it with that channel (curve[rgbArray[..., 0]])
+# Like the per-pixel functions, curves are NOT limited to 0-255 unless stated otherwise
+# Every value which a curve may be applied to
+CURVE_INPUTS = numpy.arange(256)
+
+# Curves which have already been built during this run, keyed by (function name, parameters)
+_curveCache = {}
+
+
+# Builds a curve from function(value, *args), which is called once for each of the 256 possible values
+# function may be either a per-value function such as ImageManipulator.calcFromCustomDomainRGB(), or an array function
+#   such as hypnic_vectorized.calcFromCustomDomainRGB() when arrayFunction is True (in which case it's called only once)
+def bakeCurve(function, args=(), arrayFunction=False):
+    if arrayFunction:
+        return numpy.asarray(function(CURVE_INPUTS, *args), dtype=numpy.int64)
+    return numpy.array([function(value, *args) for value in range(256)], dtype=numpy.int64)
+
+
+# Returns the curve of function(value, *args) (see bakeCurve()), building it only if it hasn't been built already
+def getCurve(function, args=(), arrayFunction=False):
+    key = (function.__module__, function.__qualname__, tuple(args), arrayFunction)
+    if key not in _curveCache:
+        _curveCache[key] = bakeCurve(function, args, arrayFunction)
+    return _curveCache[key]
+
+
+# Returns the curve of ImageManipulator.calcFromCustomDomainRGB() for the given parameters
+# Values that end up outside of 0-255 wrap around (modulo 255) when wrap is True, which is what
+#   ImageManipulator.calcFromCustomDomainRGB() does, or are limited to 0-255 when it's False
+def customDomainCurve(lowerBound, upperBound, yIntBelow, slopeBelow, yIntAbove, slopeAbove, wrap=True):
+    args = (lowerBound, upperBound, yIntBelow, slopeBelow, yIntAbove, slopeAbove)
+    if wrap:
+        return getCurve(hypnic_vectorized.calcFromCustomDomainRGB, args, arrayFunction=True)
+    return getCurve(_clampedCustomDomain, args, arrayFunction=True)
+
+
+# Same as hypnic_vectorized.calcFromCustomDomainRGB(), but limiting the result to 0-255 instead of wrapping it around
+def _clampedCustomDomain(valArray, lowerBound, upperBound, yIntBelow, slopeBelow, yIntAbove, slopeAbove):
+    valIn = valArray.astype(numpy.float64)
+    valOut = numpy.where(valIn <= lowerBound,
+                         valIn + (slopeBelow * (valIn - lowerBound) + yIntBelow),
+                         numpy.where(valIn >= upperBound,
+                                     valIn + (slopeAbove * (upperBound - valIn) + yIntAbove),
+                                     valIn))
+    return numpy.rint(numpy.clip(valOut, 0, 255)).astype(numpy.int64)
+
+
+# Returns a curve which reduces every value to the closest of numLevels evenly spaced levels between 0 and 255
+def posterizeCurve(numLevels):
+    return getCurve(_posterize, (numLevels,), arrayFunction=True)
+
+
+# Array function behind posterizeCurve()
+def _posterize(valArray, numLevels):
+    step = 255 / (numLevels - 1)
+    return numpy.rint(numpy.rint(valArray / step) * step).astype(numpy.int64)
+
+
+# Returns a curve which stretches values between inBlack and inWhite to fill outBlack to outWhite, like the "levels"
+#   tool of most image editors. Values outside of inBlack to inWhite are limited to it
+# gamma brightens (above 1) or darkens (below 1) the values in between without changing either end
+def levelsCurve(inBlack=0, inWhite=255, gamma=1.0, outBlack=0, outWhite=255):
+    return getCurve(_levels, (inBlack, inWhite, gamma, outBlack, outWhite), arrayFunction=True)
+
+
+# Array function behind levelsCurve()
+def _levels(valArray, inBlack, inWhite, gamma, outBlack, outWhite):
+    position = numpy.clip((valArray - inBlack) / max(inWhite - inBlack, 1), 0, 1) ** (1 / gamma)
+    return numpy.rint(outBlack + position * (outWhite - outBlack)).astype(numpy.int64)
+
+
+# Applies a separate curve to each channel of rgbArray, returning an int64 array of the same shape
+# curves holds the curves which produce the new R, G, and B values, in that order
+# sourceChannels holds the channel (0 for R, 1 for G, 2 for B) that each of those curves reads its input from, so that
+#   for example (2, 2, 2) builds every output channel from the B value, as manip_index 8 does
+def applyCurves(rgbArray, curves, sourceChannels=(0, 1, 2)):
+    return numpy.stack([curves[k][rgbArray[..., sourceChannels[k]]] for k in range(3)], axis=-1)
+
+
+# CHANNEL CURVES
+# Each of these returns the curves which produce the new R, G, and B values of a hypnic_operations.CurveOperation, in
+#   that order, and has an apply*() twin which applies them to a whole frame (see applyCurves()), called as
+#   function(rgbArray, sourceChannels, *params)
+
+# Returns the curves of ImageManipulator.calcFromCustomDomainRGB(), where every parameter holds that parameter's value
+#   for each of the output channels, in the same way as hypnic_numba.calcFromCustomDomainRGB()
+def customDomainCurves(lowerBounds, upperBounds, yIntsBelow, slopesBelow, yIntsAbove, slopesAbove, wrap=True):
+    return [customDomainCurve(lowerBounds[k], upperBounds[k], yIntsBelow[k], slopesBelow[k], yIntsAbove[k],
+                              slopesAbove[k], wrap)
+            for k in range(3)]
+
+
+# Applies the curves of ImageManipulator.calcFromCustomDomainRGB() to rgbArray, returning an int64 array of the same shape
+def applyCustomDomainCurves(rgbArray, sourceChannels, lowerBounds, upperBounds, yIntsBelow, slopesBelow, yIntsAbove,
+                            slopesAbove, wrap=True):
+    return applyCurves(rgbArray, customDomainCurves(lowerBounds, upperBounds, yIntsBelow, slopesBelow, yIntsAbove,
+                                                    slopesAbove, wrap),
+                       sourceChannels)
+
+
+# Returns the same posterizeCurve() for every output channel
+def posterizeCurves(numLevels):
+    return [posterizeCurve(numLevels)] * 3
+
+
+# Applies posterizeCurves() to rgbArray, returning an int64 array of the same shape
+def applyPosterizeCurves(rgbArray, sourceChannels, numLevels):
+    return applyCurves(rgbArray, posterizeCurves(numLevels), sourceChannels)
+
+
+# Returns the same levelsCurve() for every output channel
+def levelsCurves(inBlack=0, inWhite=255, gamma=1.0, outBlack=0, outWhite=255):
+    return [levelsCurve(inBlack, inWhite, gamma, outBlack, outWhite)] * 3
+
+
+# Applies levelsCurves() to rgbArray, returning an int64 array of the same shape
+def applyLevelsCurves(rgbArray, sourceChannels, inBlack=0, inWhite=255, gamma=1.0, outBlack=0, outWhite=255):
+    return applyCurves(rgbArray, levelsCurves(inBlack, inWhite, gamma, outBlack, outWhite), sourceChannels)
@@ -0,0 +1,117 @@
+# TODO:
+#  ==============================================================================
+#  S. A frame must come back from a FrameStore exactly as it was added, whether it was kept in memory or spilled to disk
+#  ==============================================================================
+#  A. Frames are spilled in the order they're added, so the earliest frames stay in memory even if they'll be needed
+#     last (such as the first frames of an animation, when REVERSE_ANIMATION_AT_END is True)
+
+__name__ = "hypnic_frames"
+
+# Library Imports
+import os
+from pathlib import Path
+import numpy
+from PIL import Image
+
+
+# F R A M E   S T O R E   C O N V E N T I O N S
+# A FrameStore holds the frames of an animation, each of them a uint8 array of shape (height, width, 3) (or
+#   (height, width, 4) for RGBA images), which are given a frame number (their position within the store) when added
+# An animation is then described as a list of frame numbers, in which the same number may appear many times (such as
+#   when GIF_FRAMES_PER_IMAGE_FORWARD is above 1, or REVERSE_ANIMATION_AT_END is True) without storing it again
+# Frames are kept in memory until they would take up more than memoryBudget bytes altogether. Every frame added after
+#   that is spilled to a raw .npy file within spillDirectory, which is lossless and needs no encoding, and is
+#   memory-mapped when read back so that only one frame at a time has to be in memory
+# A frame may be added along with a rectangle outside of which it's known to be identical to an earlier frame (such as
+#   the dirty rectangle of an output image, see ImageManipulator.renderOutputImage()), so that writers which only
+#   encode what changed between frames (see hypnic_gif.py) only have to compare the frames within that rectangle
+
+
+# Returns the frame numbers of frameNumbers as a list of (frameNumber, count) pairs, where each run of the same frame
+#   number repeated count times in a row is replaced by a single pair
+def collapseRepeats(frameNumbers):
+    runs = []
+    for frameNumber in frameNumbers:
+        if runs and (runs[-1][0] == frameNumber):
+            runs[-1] = (frameNumber, runs[-1][1] + 1)
+        else:
+            runs.append((frameNumber, 1))
+    return runs
+
+
+class FrameStore():
+
+    # memoryBudget is the most bytes of frames which are kept in memory, or None for no limit
+    # spillDirectory is where frames beyond memoryBudget are written to. If None, every frame is kept in memory
+    def __init__(self, memoryBudget=None, spillDirectory=None):
+
+        self.memoryBudget = memoryBudget
+        self.spillDirectory = None if spillDirectory is None else Path(spillDirectory)
+        # Holds each frame in order of frame number, as either an array (kept in memory) or the Path it was spilled to
+        self.frames = []
+        # The number of bytes taken up by the frames which are kept in memory
+        self.memoryUsed = 0
+        # Maps a frame number to (baseNumber, region), where region is a rectangle outside of which the frame is known
+        #     to be identical to frame baseNumber (see self.changedRegion())
+        self.changedRegions = {}
+
+    def __len__(self):
+        return len(self.frames)
+
+    # Adds a copy of image (a PIL Image, or an array holding one) to the store, returning its frame number
+    # If given, region is a rectangle (see hypnic_tiles.py) outside of which image is known to be identical to the frame
+    #     with frame number baseNumber
+    def add(self, image, baseNumber=None, region=None):
+
+        # Images of any other mode (such as palette images) are stored as the RGB colors they show
+        if isinstance(image, Image.Image) and (image.mode not in ("RGB", "RGBA")):
+            image = image.convert("RGB")
+        frame = numpy.array(image, dtype=numpy.uint8)
+        frameNumber = len(self.frames)
+        if (self.spillDirectory is None) or (self.memoryBudget is None) or \
+                (self.memoryUsed + frame.nbytes <= self.memoryBudget):
+            self.frames.append(frame)
+            self.memoryUsed += frame.nbytes
+        else:
+            os.makedirs(self.spillDirectory, exist_ok=True)
+            path = self.spillDirectory / ("frame_" + str(frameNumber) + ".npy")
+            numpy.save(path, frame)
+            self.frames.append(path)
+        if (baseNumber is not None) and (region is not None):
+            self.changedRegions[frameNumber] = (baseNumber, region)
+        return frameNumber
+
+    # Returns a rectangle outside of which the frames with frame numbers firstNumber and secondNumber are known to be
+    #     identical, or None if that isn't known
+    def changedRegion(self, firstNumber, secondNumber):
+
+        if firstNumber == secondNumber:
+            return (0, 0, 0, 0)
+        for baseNumber, frameNumber in ((firstNumber, secondNumber), (secondNumber, firstNumber)):
+            if (frameNumber in self.changedRegions) and (self.changedRegions[frameNumber][0] == baseNumber):
+                return self.changedRegions[frameNumber][1]
+        return None
+
+    # Returns the frame with the given frame number, which must not be changed
+    def get(self, frameNumber):
+
+        frame = self.frames[frameNumber]
+        if isinstance(frame, Path):
+            return numpy.load(frame, mmap_mode="r")
+        return frame
+
+    # Returns every frame of frameNumbers in turn, reading each of them only when it is needed
+    def iterate(self, frameNumbers):
+
+        for frameNumber in frameNumbers:
+            yield self.get(frameNumber)
+
+    # Forgets every frame, deleting any that were spilled to disk
+    def clear(self):
+
+        for frame in self.frames:
+            if isinstance(frame, Path) and frame.exists():
+                os.remove(frame)
+        self.frames = []
+        self.memoryUsed = 0
+        self.changedRegions = {}
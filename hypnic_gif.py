@@ -0,0 +1,183 @@
+# TODO:
+#  ==============================================================================
+#  S. Every frame must look exactly as it would if it were encoded whole. Only pixels that differ from the frame before
+#     it may be left out, and the frames before it must never be cleared (disposal method 1, "do not dispose")
+#  ==============================================================================
+#  A. Without a global palette, each changed rectangle is given its own palette of up to 256 colors, so colors can still
+#     shift slightly between frames wherever a rectangle has more colors than that
+#  B. Frames that repeat later on (such as when REVERSE_ANIMATION_AT_END is True) are encoded again, since the
+#     rectangle that changed is different each time
+
+__name__ = "hypnic_gif"
+
+# Library Imports
+import numpy
+from PIL import Image
+from PIL import GifImagePlugin
+
+# Local Imports
+import hypnic_frames
+import hypnic_quantize
+
+
+# G I F   W R I T E R   C O N V E N T I O N S
+# A GIFWriter writes an animated GIF one frame at a time, so only the frame being written and the one before it are ever
+#   held in memory. Frames are uint8 arrays of shape (height, width, 3), all of the same size
+# If the GIFWriter is given a global palette (see hypnic_quantize.py), frames are instead uint8 arrays of shape
+#   (height, width) holding the palette index of every pixel, and the palette is written once for the whole GIF
+# Consecutive frames with identical contents are written once, with the durations of all of them added together
+# Every frame after the first only holds the smallest rectangle containing every pixel that changed since the frame
+#   before it (its delta rectangle), drawn at that rectangle's position over whatever was already shown
+
+
+# Returns the rectangle of pixels which differ between previousArray and frameArray, as (x0, y0, x1, y1) where x1 and y1
+#   are exclusive (see hypnic_tiles.py), or None if they're identical
+# If region is given, the arrays are known to be identical outside of that rectangle, so only pixels within it are
+#   compared
+def changedRectangle(previousArray, frameArray, region=None):
+    if region is not None:
+        x0, y0, x1, y1 = region
+        rectangle = changedRectangle(previousArray[y0:y1, x0:x1], frameArray[y0:y1, x0:x1])
+        if rectangle is None:
+            return None
+        return (rectangle[0] + x0, rectangle[1] + y0, rectangle[2] + x0, rectangle[3] + y0)
+    changed = previousArray != frameArray
+    if changed.ndim == 3:
+        changed = numpy.any(changed, axis=2)
+    rows = numpy.flatnonzero(changed.any(axis=1))
+    if len(rows) == 0:
+        return None
+    columns = numpy.flatnonzero(changed.any(axis=0))
+    return (int(columns[0]), int(rows[0]), int(columns[-1]) + 1, int(rows[-1]) + 1)
+
+
+class GIFWriter():
+
+    # path is where the GIF is written, and loop is how many times it repeats (0 for forever)
+    # palette is the global palette shared by every frame, or None to give each frame its own
+    def __init__(self, path, loop=0, palette=None):
+
+        self.file = open(path, "wb")
+        self.loop = loop
+        self.palette = palette
+        # The last frame added, which is only written once a different frame arrives (or the GIF is closed), so that
+        #     the durations of any identical frames after it can be added to its own
+        self.pendingArray = None
+        self.pendingDuration = 0
+        # The rectangle outside of which the pending frame is known to be identical to the frame shown before it, or
+        #     None if that isn't known
+        self.pendingRegion = None
+        # The frame shown before the pending one, which its delta rectangle is found against
+        self.previousArray = None
+        # Whether the header has been written yet, which is done along with the first frame
+        self.headerWritten = False
+
+    # Adds a frame to the GIF, to be shown for duration milliseconds
+    # If given, region is a rectangle outside of which the frame is known to be identical to the frame added before it
+    #     (see hypnic_frames.FrameStore.changedRegion()), so that only the pixels within it have to be compared
+    def addFrame(self, frameArray, duration, region=None):
+
+        frameArray = numpy.asarray(frameArray)
+        if self.palette is None:
+            frameArray = frameArray[..., :3]
+        if (self.pendingArray is not None) and (changedRectangle(self.pendingArray, frameArray, region) is None):
+            self.pendingDuration += duration
+            return
+        self.writePending()
+        self.pendingArray = numpy.array(frameArray)
+        self.pendingDuration = duration
+        self.pendingRegion = region
+
+    # Returns the rectangle of a frame as a palette image. Without a global palette, the rectangle is reduced to up to
+    #     256 colors in the same way as PIL would if the whole frame were saved as a GIF
+    def quantize(self, frameArray, rectangle):
+
+        x0, y0, x1, y1 = rectangle
+        area = numpy.ascontiguousarray(frameArray[y0:y1, x0:x1])
+        if self.palette is None:
+            return Image.fromarray(area).convert("P", palette=Image.Palette.ADAPTIVE)
+        image = Image.fromarray(area, "P")
+        image.putpalette(self.palette.tobytes())
+        return image
+
+    # Writes the pending frame (if there is one), holding only its delta rectangle
+    def writePending(self):
+
+        if self.pendingArray is None:
+            return
+        if self.previousArray is None:
+            rectangle = (0, 0, self.pendingArray.shape[1], self.pendingArray.shape[0])
+        else:
+            rectangle = changedRectangle(self.previousArray, self.pendingArray, self.pendingRegion)
+        frameImage = self.quantize(self.pendingArray, rectangle)
+
+        if not self.headerWritten:
+            header, usedPaletteColors = GifImagePlugin.getheader(frameImage, None,
+                                                                 {"loop": self.loop, "duration": self.pendingDuration})
+            # The header describes the whole canvas, which the first frame always covers
+            for chunk in header:
+                self.file.write(chunk)
+            self.headerWritten = True
+
+        # Rounded down to the nearest 10 milliseconds by the GIF format
+        for chunk in GifImagePlugin.getdata(frameImage, (rectangle[0], rectangle[1]), duration=self.pendingDuration,
+                                            disposal=1, include_color_table=self.palette is None):
+            self.file.write(chunk)
+
+        self.previousArray = self.pendingArray
+        self.pendingArray = None
+
+    # Writes the last frame and the end of the GIF, then closes its file
+    def close(self):
+
+        try:
+            self.writePending()
+            self.file.write(b";")
+        finally:
+            self.file.close()
+
+
+# Returns the rectangle outside of which each run's frame is known to be identical to the frame of the run before it
+#   (see hypnic_frames.FrameStore.changedRegion()), or None where that isn't known (including for the first run)
+def changedRegions(frameStore, runs):
+    regions = [None]
+    for (previousNumber, previousCount), (frameNumber, count) in zip(runs, runs[1:]):
+        regions.append(frameStore.changedRegion(previousNumber, frameNumber))
+    return regions
+
+
+# Writes an animated GIF at path showing the frames of frameStore (see hypnic_frames.py) given by frameNumbers in order,
+#   each for secondsPerFrame seconds. Runs of the same frame number become a single frame shown for longer, and each
+#   distinct frame is read from frameStore just once per run
+# Wherever frameStore knows the rectangle outside of which a frame is identical to the one before it, only that
+#   rectangle is compared to find the frame's delta rectangle
+# If palette is given, every frame is remapped to it (see hypnic_quantize.remapFrames(), to which ditherStrength and
+#   executor are passed on) just once, and the remapped frames are kept in a FrameStore with the same memory budget
+def writeGIF(path, frameStore, frameNumbers, secondsPerFrame, loop=0, palette=None, ditherStrength=0, executor=None):
+    runs = hypnic_frames.collapseRepeats(frameNumbers)
+    writer = GIFWriter(path, loop, palette)
+    indexStore = None
+    try:
+        regions = changedRegions(frameStore, runs)
+        if palette is None:
+            for (frameNumber, count), region in zip(runs, regions):
+                writer.addFrame(frameStore.get(frameNumber), secondsPerFrame * 1000 * count, region)
+        else:
+            spillDirectory = None if frameStore.spillDirectory is None else frameStore.spillDirectory / "indices"
+            indexStore = hypnic_frames.FrameStore(frameStore.memoryBudget, spillDirectory)
+            remapped = hypnic_quantize.remapFrames(frameStore, [frameNumber for frameNumber, count in runs], palette,
+                                                   ditherStrength, executor)
+            # Maps each frame number to the number of its remapped frame within indexStore
+            indexNumbers = {}
+            for (frameNumber, count), region in zip(runs, regions):
+                # Frames are remapped in order of first appearance, so the next one is always the one needed
+                if frameNumber not in indexNumbers:
+                    remappedNumber, indices = next(remapped)
+                    indexNumbers[remappedNumber] = indexStore.add(indices)
+                # Remapping depends only on each pixel's color and position, so remapped frames are identical wherever
+                #     the frames they came from are
+                writer.addFrame(indexStore.get(indexNumbers[frameNumber]), secondsPerFrame * 1000 * count, region)
+    finally:
+        writer.close()
+        if indexStore is not None:
+            indexStore.clear()
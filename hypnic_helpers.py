@@ -11,6 +11,7 @@
 # Library Imports
 import random
 import math
+import numpy
 
 __name__ = "hypnic_helpers"
 
@@ -190,6 +191,89 @@ def fromHSVtoRGB(hsv):
     return tuple(rgb)
 
 
+# ARRAY COLOR CONVERSION
+# These convert an entire image at once, and produce the exact same values as calling fromRGBtoHSV() and
+#   fromHSVtoRGB() on every pixel individually (including the rounding of H to an integer)
+# Images are numpy arrays of shape (height, width, 3) holding R, G, and B values, indexed as rgbArray[y, x]
+# HSV values are held as three separate "planes", each of shape (height, width)
+
+# Array version of fromRGBtoHSV()
+# rgbArray is an integer array (usually uint8) of shape (height, width, 3)
+# Returns a tuple of three planes: H as int64 from 0 to 359, S and V as float64 from 0 to 1
+def fromRGBtoHSVArray(rgbArray):
+    r = rgbArray[..., 0].astype(numpy.int64)
+    g = rgbArray[..., 1].astype(numpy.int64)
+    b = rgbArray[..., 2].astype(numpy.int64)
+    maxRGB = numpy.maximum(numpy.maximum(r, g), b)
+    minRGB = numpy.minimum(numpy.minimum(r, g), b)
+    deltaRGB = (maxRGB - minRGB).astype(numpy.float64)
+
+    v = maxRGB / 255
+    # Divisors of zero are swapped for ones so that no warnings are raised; those pixels are overwritten below anyway
+    safeMax = numpy.where(maxRGB == 0, 1, maxRGB).astype(numpy.float64)
+    safeDelta = numpy.where(deltaRGB == 0, 1.0, deltaRGB)
+    s = numpy.where(maxRGB == 0, 0.0, deltaRGB / safeMax)
+
+    # The three hue formulas, checked in the same order as fromRGBtoHSV() so that ties resolve identically
+    hRed = 60 * ((g - b) / safeDelta)
+    hGreen = 60 * (2 + ((b - r) / safeDelta))
+    hBlue = 60 * (4 + ((r - g) / safeDelta))
+    h = numpy.where(r == maxRGB, hRed, numpy.where(g == maxRGB, hGreen, hBlue))
+    # numpy.rint() rounds halves to even, exactly like Python's round()
+    h = numpy.rint(h).astype(numpy.int64) % 360
+    h[deltaRGB == 0] = 0
+
+    return (h, s, v)
+
+
+# Array version of fromHSVtoRGB()
+# h, s, and v are planes of identical shape (or scalars which broadcast against them)
+# Returns an int64 array of shape (height, width, 3)
+# Just like fromHSVtoRGB(), values may fall outside of 0-255 if S or V were pushed outside of 0-1 beforehand
+def fromHSVtoRGBArray(h, s, v):
+    c = s * v
+    x = c * (1 - numpy.abs(numpy.mod(h / 60.0, 2) - 1))
+    m = v - c
+    zero = numpy.zeros_like(c)
+
+    # One condition per 60 degree sector of the hue wheel, in the same order as fromHSVtoRGB()
+    conditions = [h < 60, h < 120, h < 180, h < 240, h < 300]
+    rgb = numpy.empty(numpy.shape(c) + (3,), dtype=numpy.int64)
+    rgb[..., 0] = numpy.rint(255 * (numpy.select(conditions, [c, x, zero, zero, x], c) + m))
+    rgb[..., 1] = numpy.rint(255 * (numpy.select(conditions, [x, c, c, x, zero], zero) + m))
+    rgb[..., 2] = numpy.rint(255 * (numpy.select(conditions, [zero, zero, x, c, c], x) + m))
+    return rgb
+
+
+# HSV CYLINDER COORDINATES
+# Places an HSV color within a cylinder, where H is the angle around its axis, S is the distance from its axis, and V is
+#   the height along it. Returns the (X, Y, Z) coordinates of that point, each between -1 and 1 (Z between 0 and 1)
+# Unlike comparing H values directly, this treats hues of 359 and 0 as neighbors and every hue of a gray as identical
+# The sine and cosine of each whole number of degrees are kept in tables, so that both versions below use the exact same
+#   values (H is always a whole number when it comes from fromRGBtoHSV() or fromRGBtoHSVArray())
+HUE_COSINES = numpy.array([math.cos(math.radians(h)) for h in range(360)])
+HUE_SINES = numpy.array([math.sin(math.radians(h)) for h in range(360)])
+
+
+# Returns the (X, Y, Z) cylinder coordinates of an HSV tuple
+def fromHSVtoCylinder(hsv):
+    h = hsv[0] % 360
+    if h == int(h):
+        cosH = float(HUE_COSINES[int(h)])
+        sinH = float(HUE_SINES[int(h)])
+    else:
+        cosH = math.cos(math.radians(h))
+        sinH = math.sin(math.radians(h))
+    return (hsv[1] * cosH, hsv[1] * sinH, hsv[2])
+
+
+# Array version of fromHSVtoCylinder(), for whole-number H planes such as those from fromRGBtoHSVArray()
+# Returns a float64 array of shape (height, width, 3)
+def fromHSVtoCylinderArray(h, s, v):
+    h = numpy.asarray(h, dtype=numpy.int64) % 360
+    return numpy.stack([s * HUE_COSINES[h], s * HUE_SINES[h], numpy.asarray(v, dtype=numpy.float64)], axis=-1)
+
+
 # Takes a 3-element RGB tuple as input and returns the luminosity, which also has a magnitude of 0 to 255
 # Luminosity is usually considered the best approach for turning images to grayscale
 # Based on the explanation from https://www.johndcook.com/blog/2009/08/24/algorithms-convert-color-grayscale/
@@ -0,0 +1,132 @@
+# TODO:
+#  ==============================================================================
+#  S. Only functions whose result depends on nothing but a pixel's own color (plus fixed parameters) may be baked into
+#     a lookup table. Anything which depends on a pixel's position, its neighbors, or random values may not
+#  ==============================================================================
+#  A. Tables smaller than 256 entries per axis interpolate between entries, so their output is no longer identical to
+#     that of the function they were baked from. It's only close to it for functions whose result changes smoothly with
+#     a pixel's color, and can be off by almost 255 wherever a result jumps (such as where an S or V value wraps around)
+
+__name__ = "hypnic_luts"
+
+# Library Imports
+import hashlib
+import os
+from pathlib import Path
+import numpy
+
+# Local Imports
+import hypnic_vectorized
+
+
+# L O O K U P   T A B L E   C O N V E N T I O N S
+# A lookup table (LUT) is a uint8 array of shape (size, size, size, 3), indexed as lut[r, g, b], holding the result of
+#   a color function for a lattice of colors spread evenly between 0 and 255 along each axis
+# With a size of 256 there is an entry for every possible color and applying the table is exact
+# Results are limited to 0-255 when the table is baked, just as they would be when written to an image
+# A color function is any function from hypnic_vectorized.py called as function(rgbArray, *args), such as
+#   hypnic_vectorized.modSaturationShift(rgbArray, shift)
+
+# Tables which have already been baked during this run, keyed by describeLUT()
+_lutCache = {}
+
+# The number of lattice colors along the R axis which are passed to a color function at once while baking
+# Keeps the memory used by the intermediate arrays of the color function to a few hundred MB at most
+_BAKE_ROWS_PER_CHUNK = 16
+
+
+# Returns the key describing the table of a color function with the given arguments and size
+# The arguments are described by their repr(), as some (such as lists of palette colors) can't be used as keys
+def describeLUT(function, args, size):
+    return (function.__module__, function.__name__, repr(tuple(args)), size)
+
+
+# Returns the R/G/B value of every lattice point along one axis of a table of the given size
+def latticeValues(size):
+    return numpy.rint(numpy.arange(size) * (255 / (size - 1))).astype(numpy.int64)
+
+
+# Evaluates function(rgbArray, *args) for every color of the lattice, returning the resulting table
+def bakeLUT(function, args, size=256):
+    values = latticeValues(size)
+    lut = numpy.empty((size, size, size, 3), dtype=numpy.uint8)
+    # Every lattice color with a given R value, laid out as an image of shape (size, size, 3) indexed as [g, b]
+    gbGrid = numpy.stack(numpy.meshgrid(values, values, indexing="ij"), axis=-1)
+    for r0 in range(0, size, _BAKE_ROWS_PER_CHUNK):
+        r1 = min(r0 + _BAKE_ROWS_PER_CHUNK, size)
+        chunk = numpy.empty((r1 - r0, size, size, 3), dtype=numpy.int64)
+        chunk[..., 0] = values[r0:r1, numpy.newaxis, numpy.newaxis]
+        chunk[..., 1:] = gbGrid
+        # Color functions expect an image, so the chunk is flattened to one very tall image and back again
+        result = function(chunk.reshape(-1, size, 3), *args)
+        lut[r0:r1] = hypnic_vectorized.toImageArray(result).reshape(r1 - r0, size, size, 3)
+    return lut
+
+
+# Returns the table of function(rgbArray, *args), baking it only if it hasn't been baked already
+# If cacheDirectory is given, tables are also saved to and loaded from it, so that they can be reused by later runs
+# If bake is False, returns None instead of baking a table which isn't already available
+def getLUT(function, args, size=256, cacheDirectory=None, bake=True):
+    key = describeLUT(function, args, size)
+    if key in _lutCache:
+        return _lutCache[key]
+
+    path = None
+    if cacheDirectory is not None:
+        # The key is hashed rather than used directly, as parameters may contain characters that are invalid in paths
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+        path = Path(cacheDirectory) / (function.__name__ + "_" + str(size) + "_" + digest + ".npy")
+        if path.exists():
+            _lutCache[key] = numpy.load(path)
+            return _lutCache[key]
+
+    if not bake:
+        return None
+    lut = bakeLUT(function, args, size)
+    _lutCache[key] = lut
+    if path is not None:
+        os.makedirs(path.parent, exist_ok=True)
+        numpy.save(path, lut)
+    return lut
+
+
+# Returns the table of a run of color functions applied one after another (see hypnic_vectorized.applyInTurn()), given
+#   as (function, args) pairs along with the table of each of them, composing the tables only if that hasn't been
+#   done already. The composition of tables of size 256 is exact, while smaller ones interpolate at every step
+def getComposedLUT(functions, luts):
+    size = luts[0].shape[0]
+    key = tuple(describeLUT(function, args, size) for function, args in functions)
+    if key not in _lutCache:
+        lut = luts[0]
+        for nextLUT in luts[1:]:
+            lut = hypnic_vectorized.toImageArray(applyLUT(lut, nextLUT))
+        _lutCache[key] = lut
+    return _lutCache[key]
+
+
+# Forgets every table baked during this run (but not those saved to a cache directory)
+def clearLUTCache():
+    _lutCache.clear()
+
+
+# Applies a table to every pixel of rgbArray, returning an int64 array of the same shape
+# Tables of size 256 are applied as a single lookup per pixel, while smaller ones interpolate between the 8 entries
+#   surrounding each color (trilinear interpolation)
+def applyLUT(rgbArray, lut):
+    size = lut.shape[0]
+    if size == 256:
+        return lut.reshape(-1, 3)[hypnic_vectorized.packColors(rgbArray)].astype(numpy.int64)
+
+    # The position of each color between lattice points, as an integer index and a fraction of the way to the next
+    position = numpy.asarray(rgbArray, dtype=numpy.float64) * ((size - 1) / 255)
+    index0 = numpy.minimum(position.astype(numpy.int64), size - 2)
+    fraction = position - index0
+    r0, g0, b0 = index0[..., 0], index0[..., 1], index0[..., 2]
+    fr, fg, fb = fraction[..., 0:1], fraction[..., 1:2], fraction[..., 2:3]
+
+    result = numpy.zeros(numpy.shape(rgbArray), dtype=numpy.float64)
+    for dr, wr in ((0, 1 - fr), (1, fr)):
+        for dg, wg in ((0, 1 - fg), (1, fg)):
+            for db, wb in ((0, 1 - fb), (1, fb)):
+                result += (wr * wg * wb) * lut[r0 + dr, g0 + dg, b0 + db]
+    return numpy.rint(result).astype(numpy.int64)
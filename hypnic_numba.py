@@ -0,0 +1,758 @@
+# TODO:
+#  ==============================================================================
+#  S. Every kernel in this file must produce the exact same output as its per-pixel counterpart within
+#     hypnic1.ImageManipulator, just like the functions within hypnic_vectorized.py
+#  ==============================================================================
+#  A. The first call of each kernel (per combination of argument types) triggers compilation, which can take several
+#     seconds. cache=True saves the compiled result in __pycache__ so that this only happens once per machine
+
+__name__ = "hypnic_numba"
+
+# Library Imports
+import numba
+import numpy
+from numba import njit, prange
+
+# Local Imports
+import hypnic_helpers
+import hypnic_vectorized
+
+
+# K E R N E L   C O N V E N T I O N S
+# sourceArray is a uint8 (or other integer) numpy array of shape (height, width, 3), indexed as sourceArray[y, x]
+# x0, y0, x1, and y1 describe the rectangle of pixels to manipulate, where x1 and y1 are exclusive
+# Every kernel returns an int64 array of shape (y1 - y0, x1 - x0, 3) which, just like the tuples returned by the
+#   per-pixel functions, is NOT limited to 0-255. Use hypnic_vectorized.toImageArray() before saving the result
+# Rows are split between all available CPU cores via prange()
+
+
+# COLOR CONVERSION
+
+# Compiled version of hypnic_helpers.fromRGBtoHSV(), taking and returning separate values instead of tuples
+@njit(cache=True)
+def fromRGBtoHSV(r, g, b):
+    # Values read from uint8 arrays would otherwise wrap around when subtracted from each other
+    r = numpy.int64(r)
+    g = numpy.int64(g)
+    b = numpy.int64(b)
+    minRGB = float(min(r, g, b))
+    maxRGB = float(max(r, g, b))
+    deltaRGB = maxRGB - minRGB
+    h = 0
+    s = 0.0
+    v = maxRGB / 255
+    # r == g == b == 0
+    if maxRGB == 0:
+        return (h, s, v)
+    s = deltaRGB / maxRGB
+
+    # Hue is null
+    if deltaRGB == 0:
+        return (h, s, v)
+    # Hue is between yellow and magenta
+    if r == maxRGB:
+        h = round(60 * ((g - b) / deltaRGB))
+    # Hue is between cyan and yellow
+    elif g == maxRGB:
+        h = round(60 * (2 + ((b - r) / deltaRGB)))
+    # Hue is between magenta and cyan
+    else:
+        h = round(60 * (4 + ((r - g) / deltaRGB)))
+    # Ensure that Hue is in the 0 <= H < 360 range
+    h %= 360
+    return (h, s, v)
+
+
+# Compiled version of hypnic_helpers.fromHSVtoRGB(), taking and returning separate values instead of tuples
+@njit(cache=True)
+def fromHSVtoRGB(h, s, v):
+    c = s * v
+    x = c * (1 - abs((h / 60.0) % 2 - 1))
+    m = v - c
+
+    if h < 60:
+        r, g, b = c, x, 0.0
+    elif h < 120:
+        r, g, b = x, c, 0.0
+    elif h < 180:
+        r, g, b = 0.0, c, x
+    elif h < 240:
+        r, g, b = 0.0, x, c
+    elif h < 300:
+        r, g, b = x, 0.0, c
+    else:
+        r, g, b = c, 0.0, x
+
+    return (round(255 * (r + m)), round(255 * (g + m)), round(255 * (b + m)))
+
+
+# Writes an (r, g, b) result into an output array
+@njit(cache=True)
+def _store(out, j, i, rgb):
+    out[j, i, 0] = rgb[0]
+    out[j, i, 1] = rgb[1]
+    out[j, i, 2] = rgb[2]
+
+
+# HSV MODIFICATION
+
+# Shifts the Hue value of every pixel by a given number of degrees
+@njit(parallel=True, cache=True)
+def modHueShift(sourceArray, x0, y0, x1, y1, shift):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            h, s, v = fromRGBtoHSV(sourceArray[y0 + j, x0 + i, 0],
+                                   sourceArray[y0 + j, x0 + i, 1],
+                                   sourceArray[y0 + j, x0 + i, 2])
+            _store(out, j, i, fromHSVtoRGB((h + shift) % 360, s, v))
+    return out
+
+
+# Shifts the Hue value of every pixel by ((x + 1) % (y + 1)) % 360 degrees, based on its own X/Y coordinates
+# This is the coordinate-dependent variant of modHueShift() used by manip_index 9
+# originX and originY are the coordinates of sourceArray[0, 0] within the full image, for when sourceArray only holds
+#   part of it (as it does when manipulating out of core)
+@njit(parallel=True, cache=True)
+def modHueShiftByCoordinates(sourceArray, x0, y0, x1, y1, originX=0, originY=0):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        y = y0 + j
+        imageY = originY + y
+        for i in range(x1 - x0):
+            x = x0 + i
+            imageX = originX + x
+            h, s, v = fromRGBtoHSV(sourceArray[y, x, 0], sourceArray[y, x, 1], sourceArray[y, x, 2])
+            _store(out, j, i, fromHSVtoRGB((h + ((imageX + 1) % (imageY + 1)) % 360) % 360, s, v))
+    return out
+
+
+# Shifts the Saturation value of every pixel by a given amount
+@njit(parallel=True, cache=True)
+def modSaturationShift(sourceArray, x0, y0, x1, y1, shift):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            h, s, v = fromRGBtoHSV(sourceArray[y0 + j, x0 + i, 0],
+                                   sourceArray[y0 + j, x0 + i, 1],
+                                   sourceArray[y0 + j, x0 + i, 2])
+            _store(out, j, i, fromHSVtoRGB(h, (s + shift) % 1, v))
+    return out
+
+
+# Shifts the Value value of every pixel by a given amount
+@njit(parallel=True, cache=True)
+def modValueShift(sourceArray, x0, y0, x1, y1, shift):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            h, s, v = fromRGBtoHSV(sourceArray[y0 + j, x0 + i, 0],
+                                   sourceArray[y0 + j, x0 + i, 1],
+                                   sourceArray[y0 + j, x0 + i, 2])
+            _store(out, j, i, fromHSVtoRGB(h, s, (v + shift) % 1))
+    return out
+
+
+# Sets the Saturation value of every pixel to a multiple of its previous value
+@njit(parallel=True, cache=True)
+def modSaturationMultiple(sourceArray, x0, y0, x1, y1, multiple):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            h, s, v = fromRGBtoHSV(sourceArray[y0 + j, x0 + i, 0],
+                                   sourceArray[y0 + j, x0 + i, 1],
+                                   sourceArray[y0 + j, x0 + i, 2])
+            _store(out, j, i, fromHSVtoRGB(h, (s * multiple) % 1, v))
+    return out
+
+
+# Sets the Value value of every pixel to a multiple of its previous value
+@njit(parallel=True, cache=True)
+def modValueMultiple(sourceArray, x0, y0, x1, y1, multiple):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            h, s, v = fromRGBtoHSV(sourceArray[y0 + j, x0 + i, 0],
+                                   sourceArray[y0 + j, x0 + i, 1],
+                                   sourceArray[y0 + j, x0 + i, 2])
+            _store(out, j, i, fromHSVtoRGB(h, s, (v * multiple) % 1))
+    return out
+
+
+# Swaps the Saturation and Value values of every pixel
+@njit(parallel=True, cache=True)
+def modFlipSV(sourceArray, x0, y0, x1, y1):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            h, s, v = fromRGBtoHSV(sourceArray[y0 + j, x0 + i, 0],
+                                   sourceArray[y0 + j, x0 + i, 1],
+                                   sourceArray[y0 + j, x0 + i, 2])
+            _store(out, j, i, fromHSVtoRGB(h, v, s))
+    return out
+
+
+# Moves Saturation and Value values closer together by a given percentage factor of their difference
+# See ImageManipulator.modSlideSV() for details
+@njit(parallel=True, cache=True)
+def modSlideSV(sourceArray, x0, y0, x1, y1, factor):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            r = sourceArray[y0 + j, x0 + i, 0]
+            g = sourceArray[y0 + j, x0 + i, 1]
+            b = sourceArray[y0 + j, x0 + i, 2]
+            h, s, v = fromRGBtoHSV(r, g, b)
+            # Written with the same operator order as the per-pixel version, since (a * b) % 1 != a * (b % 1)
+            offset = (abs(v - s) * (float(factor) / 2)) % 1
+            if s < v:
+                _store(out, j, i, fromHSVtoRGB(h, s + offset, v - offset))
+            elif v < s:
+                _store(out, j, i, fromHSVtoRGB(h, s - offset, v + offset))
+            else:
+                _store(out, j, i, (r, g, b))
+    return out
+
+
+# RGB MODIFICATION
+
+# Rearranges the R/G/B values of every pixel, such that the new R value is the old value at index order0, etc.
+@njit(parallel=True, cache=True)
+def permuteRGB(sourceArray, x0, y0, x1, y1, order0, order1, order2):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            out[j, i, 0] = sourceArray[y0 + j, x0 + i, order0]
+            out[j, i, 1] = sourceArray[y0 + j, x0 + i, order1]
+            out[j, i, 2] = sourceArray[y0 + j, x0 + i, order2]
+    return out
+
+
+# Rotates the R/G/B values of every pixel by 1
+def modRotate1RGB(sourceArray, x0, y0, x1, y1):
+    return permuteRGB(sourceArray, x0, y0, x1, y1, 1, 2, 0)
+
+
+# Rotates the R/G/B values of every pixel by 2
+def modRotate2RGB(sourceArray, x0, y0, x1, y1):
+    return permuteRGB(sourceArray, x0, y0, x1, y1, 2, 0, 1)
+
+
+# Swaps the R and B values of every pixel
+def modFlipRGB(sourceArray, x0, y0, x1, y1):
+    return permuteRGB(sourceArray, x0, y0, x1, y1, 2, 1, 0)
+
+
+# Swaps the G and B values of every pixel
+def modFlipRotate1RGB(sourceArray, x0, y0, x1, y1):
+    return permuteRGB(sourceArray, x0, y0, x1, y1, 0, 2, 1)
+
+
+# Swaps the R and G values of every pixel
+def modFlipRotate2RGB(sourceArray, x0, y0, x1, y1):
+    return permuteRGB(sourceArray, x0, y0, x1, y1, 1, 0, 2)
+
+
+# Compiled version of ImageManipulator.calcFromCustomDomainRGB(), for a single value
+@njit(cache=True)
+def _calcFromCustomDomainRGB(valIn, lowerBound, upperBound, yIntBelow, slopeBelow, yIntAbove, slopeAbove):
+    valOut = float(valIn)
+    if valIn <= lowerBound:
+        valOut += slopeBelow * (valIn - lowerBound) + yIntBelow
+    elif valIn >= upperBound:
+        valOut += slopeAbove * (upperBound - valIn) + yIntAbove
+    return round(valOut % 255)
+
+
+# Sets each of the R, G, and B values of every pixel using calcFromCustomDomainRGB()
+# sourceChannels holds, for each output channel, the index of the input channel it is calculated from
+#   (manip_index 8, for example, calculates all three from the B value and so uses (2, 2, 2))
+# Every other parameter is a 3-element array holding that parameter's value for each of the output channels
+@njit(parallel=True, cache=True)
+def calcFromCustomDomainRGB(sourceArray, x0, y0, x1, y1, sourceChannels,
+                            lowerBounds, upperBounds, yIntsBelow, slopesBelow, yIntsAbove, slopesAbove):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            for k in range(3):
+                out[j, i, k] = _calcFromCustomDomainRGB(sourceArray[y0 + j, x0 + i, sourceChannels[k]],
+                                                        lowerBounds[k], upperBounds[k],
+                                                        yIntsBelow[k], slopesBelow[k],
+                                                        yIntsAbove[k], slopesAbove[k])
+    return out
+
+
+# Sets each of the R, G, and B values of every pixel by looking it up from a curve (see hypnic_curves.applyCurves())
+# curves is an int64 array of shape (3, 256) holding the curve of each output channel, and sourceChannels holds the
+#   index of the input channel each of them reads from
+@njit(parallel=True, cache=True)
+def applyCurves(sourceArray, x0, y0, x1, y1, curves, sourceChannels):
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            for k in range(3):
+                out[j, i, k] = curves[k, sourceArray[y0 + j, x0 + i, sourceChannels[k]]]
+    return out
+
+
+# PALETTE MATCHING
+# Compiled versions of the matching done by hypnic_vectorized.matchColors(), which find the index (within colorList) of
+#   the member that a matcher from hypnic_vectorized.colorListMatcher() chooses for every pixel
+# Each returns an int64 array of shape (y1 - y0, x1 - x0) holding those indices, rather than colors
+
+# The "key" of each matcher which is looked up from a table, in the order of the tableKey given to _matchByTable()
+TABLE_KEYS = ("R", "G", "B", "H", "V", "sum")
+
+
+# Looks up the index of every pixel from table, by its R (tableKey 0), G (1), B (2), or H (3) value, the largest of its
+#   R, G, and B values (4), or the sum of its R, G, and B values (5)
+@njit(parallel=True, cache=True)
+def _matchByTable(sourceArray, x0, y0, x1, y1, table, tableKey):
+    out = numpy.empty((y1 - y0, x1 - x0), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            r = numpy.int64(sourceArray[y0 + j, x0 + i, 0])
+            g = numpy.int64(sourceArray[y0 + j, x0 + i, 1])
+            b = numpy.int64(sourceArray[y0 + j, x0 + i, 2])
+            if tableKey == 0:
+                value = r
+            elif tableKey == 1:
+                value = g
+            elif tableKey == 2:
+                value = b
+            elif tableKey == 3:
+                value = numpy.int64(fromRGBtoHSV(r, g, b)[0])
+            elif tableKey == 4:
+                value = max(r, g, b)
+            else:
+                value = r + g + b
+            out[j, i] = table[value]
+    return out
+
+
+# Finds the index of every pixel by a binary search through the sorted S values of a color list (see
+#   hypnic_vectorized._matchClosestSorted())
+@njit(parallel=True, cache=True)
+def _matchBySortedKeys(sourceArray, x0, y0, x1, y1, keys, lastIndex):
+    out = numpy.empty((y1 - y0, x1 - x0), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            s = fromRGBtoHSV(sourceArray[y0 + j, x0 + i, 0], sourceArray[y0 + j, x0 + i, 1],
+                             sourceArray[y0 + j, x0 + i, 2])[1]
+            position = numpy.searchsorted(keys, s)
+            below = min(max(position - 1, 0), len(keys) - 1)
+            above = min(max(position, 0), len(keys) - 1)
+            belowDist = abs(keys[below] - s)
+            aboveDist = abs(keys[above] - s)
+            if belowDist < aboveDist:
+                out[j, i] = lastIndex[below]
+            elif aboveDist < belowDist:
+                out[j, i] = lastIndex[above]
+            else:
+                out[j, i] = max(lastIndex[below], lastIndex[above])
+    return out
+
+
+# Finds the index of every pixel through a "cube" palette index (see hypnic_palettes.py), from the closest R, G, and B
+#   values within its tables
+@njit(parallel=True, cache=True)
+def _matchByCube(sourceArray, x0, y0, x1, y1, rTable, gTable, bTable, size):
+    out = numpy.empty((y1 - y0, x1 - x0), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        for i in range(x1 - x0):
+            out[j, i] = (rTable[sourceArray[y0 + j, x0 + i, 0]] * size + gTable[sourceArray[y0 + j, x0 + i, 1]]) * \
+                        size + bTable[sourceArray[y0 + j, x0 + i, 2]]
+    return out
+
+
+# Finds the index of every pixel through a "grid" palette index (see hypnic_palettes.py), checking only the candidates
+#   of the cell that each pixel's point falls within, or every point if it falls outside of the grid
+# Points are R/G/B values, or when cylinder is True, points within the HSV cylinder (see
+#   hypnic_helpers.fromHSVtoCylinder())
+@njit(parallel=True, cache=True)
+def _matchByGrid(sourceArray, x0, y0, x1, y1, points, lower, upper, cellSize, cellsPerAxis, candidates, numCandidates,
+                 cylinder, hueCosines, hueSines):
+    out = numpy.empty((y1 - y0, x1 - x0), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        query = numpy.empty(3, dtype=numpy.float64)
+        for i in range(x1 - x0):
+            r = sourceArray[y0 + j, x0 + i, 0]
+            g = sourceArray[y0 + j, x0 + i, 1]
+            b = sourceArray[y0 + j, x0 + i, 2]
+            if cylinder:
+                h, s, v = fromRGBtoHSV(r, g, b)
+                query[0] = s * hueCosines[h % 360]
+                query[1] = s * hueSines[h % 360]
+                query[2] = v
+            else:
+                query[0] = float(r)
+                query[1] = float(g)
+                query[2] = float(b)
+
+            inside = True
+            for k in range(3):
+                if (query[k] < lower[k]) or (query[k] > upper[k]):
+                    inside = False
+            bestDist = numpy.inf
+            bestIndex = 0
+            if inside:
+                cell = 0
+                for k in range(3):
+                    c = int(numpy.floor((query[k] - lower[k]) / cellSize[k]))
+                    cell = cell * cellsPerAxis + min(max(c, 0), cellsPerAxis - 1)
+                for n in range(numCandidates[cell]):
+                    m = candidates[cell, n]
+                    d0 = query[0] - points[m, 0]
+                    d1 = query[1] - points[m, 1]
+                    d2 = query[2] - points[m, 2]
+                    dist = (d0 * d0 + d1 * d1) + d2 * d2
+                    if dist <= bestDist:
+                        bestDist = dist
+                        bestIndex = m
+            else:
+                for m in range(len(points)):
+                    d0 = query[0] - points[m, 0]
+                    d1 = query[1] - points[m, 1]
+                    d2 = query[2] - points[m, 2]
+                    dist = (d0 * d0 + d1 * d1) + d2 * d2
+                    if dist <= bestDist:
+                        bestDist = dist
+                        bestIndex = m
+            out[j, i] = bestIndex
+    return out
+
+
+# Sets every pixel's color to the member of palette (an int64 array of the colors of colorList) which matcher (from
+#   hypnic_vectorized.colorListMatcher()) chooses for it, exactly as hypnic_vectorized.matchColors() would
+def limitColors(sourceArray, x0, y0, x1, y1, palette, matcher):
+    key = matcher["key"]
+    if key in TABLE_KEYS:
+        indices = _matchByTable(sourceArray, x0, y0, x1, y1, matcher["table"], TABLE_KEYS.index(key))
+    elif key == "S":
+        indices = _matchBySortedKeys(sourceArray, x0, y0, x1, y1, matcher["keys"], matcher["lastIndex"])
+    elif matcher["index"]["kind"] == "cube":
+        tables = matcher["index"]["tables"]
+        indices = _matchByCube(sourceArray, x0, y0, x1, y1, tables[0], tables[1], tables[2], matcher["index"]["size"])
+    else:
+        index = matcher["index"]
+        indices = _matchByGrid(sourceArray, x0, y0, x1, y1, index["points"], index["lower"], index["upper"],
+                               index["cellSize"], index["cellsPerAxis"], index["candidates"], index["numCandidates"],
+                               key == "HSV", hypnic_helpers.HUE_COSINES, hypnic_helpers.HUE_SINES)
+    return palette[indices]
+
+
+# NEIGHBORHOOD FILTERS
+# These read from sourceArray as it was before the manipulation started, which is only identical to the per-pixel
+#   behavior when the pixels being read are never ones which were already rewritten earlier in the same pass
+#   (true whenever positiveOnly is True, or whenever the reference image is not the image being written to)
+# See the FEEDBACK FILTERS below for the versions which do read rewritten pixels
+
+# Returns the (lowest, highest + 1) coordinates of the neighbors of coordinate c along an axis of size res
+# Identical to the way that ImageManipulator.setToAverageOfNeighbors() builds its xValues and yValues lists
+@njit(cache=True)
+def neighborRange(c, res, searchDistance, positiveOnly):
+    if positiveOnly:
+        lo = c
+        hi = c + searchDistance + 1
+    else:
+        lo = round(c - searchDistance / 2)
+        hi = round(c + searchDistance / 2 + 1)
+    return (max(lo, 0), min(hi, res))
+
+
+# Sets every pixel's color to be the average of all of its neighbors, on an RGB basis
+@njit(parallel=True, cache=True)
+def setToAverageOfNeighbors(sourceArray, x0, y0, x1, y1, searchDistance, positiveOnly):
+    yRes, xRes = sourceArray.shape[0], sourceArray.shape[1]
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        yLo, yHi = neighborRange(y0 + j, yRes, searchDistance, positiveOnly)
+        for i in range(x1 - x0):
+            xLo, xHi = neighborRange(x0 + i, xRes, searchDistance, positiveOnly)
+            totalR = 0
+            totalG = 0
+            totalB = 0
+            for x in range(xLo, xHi):
+                for y in range(yLo, yHi):
+                    totalR += sourceArray[y, x, 0]
+                    totalG += sourceArray[y, x, 1]
+                    totalB += sourceArray[y, x, 2]
+            numNeighbors = (xHi - xLo) * (yHi - yLo)
+            out[j, i, 0] = round(totalR / numNeighbors)
+            out[j, i, 1] = round(totalG / numNeighbors)
+            out[j, i, 2] = round(totalB / numNeighbors)
+    return out
+
+
+# Same as setToAverageOfNeighbors() but works in constant time per pixel, regardless of searchDistance, by reading from
+#   a table built by hypnic_vectorized.summedAreaTable() instead of from the image itself
+@njit(parallel=True, cache=True)
+def setToAverageOfNeighborsFromTable(table, x0, y0, x1, y1, searchDistance, positiveOnly):
+    yRes, xRes = table.shape[0] - 1, table.shape[1] - 1
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for j in prange(y1 - y0):
+        yLo, yHi = neighborRange(y0 + j, yRes, searchDistance, positiveOnly)
+        for i in range(x1 - x0):
+            xLo, xHi = neighborRange(x0 + i, xRes, searchDistance, positiveOnly)
+            numNeighbors = (xHi - xLo) * (yHi - yLo)
+            for k in range(3):
+                total = numpy.int64(table[yHi, xHi, k]) - numpy.int64(table[yLo, xHi, k]) - \
+                        numpy.int64(table[yHi, xLo, k]) + numpy.int64(table[yLo, xLo, k])
+                # Undoes any wrapping around of the uint32 sums, as described in hypnic_vectorized.summedAreaTable()
+                out[j, i, k] = round((total & 0xFFFFFFFF) / numNeighbors)
+    return out
+
+
+# SLIDING HISTOGRAM FILTERS
+# Rather than counting every neighborhood from scratch, these keep a histogram of the current neighborhood and move it
+#   along each row, adding the column which enters the neighborhood and removing the one which leaves it (Huang's
+#   algorithm), so each pixel costs O(searchDistance) instead of O(searchDistance ** 2) or worse
+# Rows are split into one contiguous block per thread, so that each thread only allocates its histograms once
+
+# Splits numRows rows into numBlocks contiguous blocks, returning the first row of each block (plus the end)
+def _rowBlocks(numRows):
+    numBlocks = max(1, min(numRows, numba.get_num_threads()))
+    return numpy.linspace(0, numRows, numBlocks + 1).astype(numpy.int64)
+
+
+# Finds the most frequent label of every neighborhood, given an array of dense color labels (0 to numLabels - 1)
+# See setToMostFrequentNeighbor()
+@njit(parallel=True, cache=True)
+def _mostFrequentNeighborLabels(labels, numLabels, x0, y0, x1, y1, searchDistance, positiveOnly, blocks):
+    yRes, xRes = labels.shape[0], labels.shape[1]
+    out = numpy.empty((y1 - y0, x1 - x0), dtype=numpy.int64)
+    # The largest possible number of pixels in a neighborhood, which is also the largest possible count
+    maxNeighbors = (searchDistance + 3) * (searchDistance + 3)
+    for b in prange(len(blocks) - 1):
+        # counts[label] is the number of times that label appears in the current neighborhood, and
+        #     countsOfCounts[n] is the number of labels which appear exactly n times
+        counts = numpy.zeros(numLabels, dtype=numpy.int32)
+        countsOfCounts = numpy.zeros(maxNeighbors + 1, dtype=numpy.int32)
+        # Used to find which of the most frequent labels reaches its count first, in visiting order
+        runningCounts = numpy.zeros(numLabels, dtype=numpy.int32)
+        visited = numpy.empty(maxNeighbors, dtype=numpy.int64)
+        for j in range(blocks[b], blocks[b + 1]):
+            y = y0 + j
+            yLo, yHi = neighborRange(y, yRes, searchDistance, positiveOnly)
+            # The histogram currently holds columns colLo <= x < colHi
+            colLo, colHi = neighborRange(x0, xRes, searchDistance, positiveOnly)
+            colHi = colLo
+            maxFreq = 0
+            for i in range(x1 - x0):
+                x = x0 + i
+                xLo, xHi = neighborRange(x, xRes, searchDistance, positiveOnly)
+                # Removes the columns which have left the neighborhood
+                while colLo < min(xLo, colHi):
+                    for yn in range(yLo, yHi):
+                        label = labels[yn, colLo]
+                        countsOfCounts[counts[label]] -= 1
+                        counts[label] -= 1
+                        countsOfCounts[counts[label]] += 1
+                        if countsOfCounts[maxFreq] == 0:
+                            maxFreq -= 1
+                    colLo += 1
+                if colHi < xLo:
+                    colLo = xLo
+                    colHi = xLo
+                # Adds the columns which have entered the neighborhood
+                while colHi < xHi:
+                    for yn in range(yLo, yHi):
+                        label = labels[yn, colHi]
+                        countsOfCounts[counts[label]] -= 1
+                        counts[label] += 1
+                        countsOfCounts[counts[label]] += 1
+                        if counts[label] > maxFreq:
+                            maxFreq = counts[label]
+                    colHi += 1
+
+                # With no repeated colors, the pixel keeps its own
+                if maxFreq <= 1:
+                    out[j, i] = labels[y, x]
+                    continue
+                # Otherwise the winner is the first label whose running count reaches maxFreq, in visiting order
+                n = 0
+                winner = -1
+                for xn in range(xLo, xHi):
+                    for yn in range(yLo, yHi):
+                        label = labels[yn, xn]
+                        visited[n] = label
+                        n += 1
+                        runningCounts[label] += 1
+                        if runningCounts[label] == maxFreq:
+                            winner = label
+                            break
+                    if winner >= 0:
+                        break
+                for k in range(n):
+                    runningCounts[visited[k]] = 0
+                out[j, i] = winner
+
+            # Empties the histogram for the next row
+            while colLo < colHi:
+                for yn in range(yLo, yHi):
+                    label = labels[yn, colLo]
+                    countsOfCounts[counts[label]] -= 1
+                    counts[label] -= 1
+                    countsOfCounts[counts[label]] += 1
+                colLo += 1
+    return out
+
+
+# Sets every pixel's color to be that of the most frequently occurring color between itself and its neighbors
+# Ties resolve exactly as they do per-pixel: neighbors are visited X outer, Y inner, and the color which reaches the
+#   highest count first wins. With no repeated colors, the pixel keeps its own
+# Colors are packed into uint32 values and then numbered 0 to (number of unique colors - 1), which is what allows the
+#   histogram to be a plain array
+def setToMostFrequentNeighbor(sourceArray, x0, y0, x1, y1, searchDistance, positiveOnly):
+    uniqueColors, labels = numpy.unique(hypnic_vectorized.packColors(sourceArray), return_inverse=True)
+    labels = labels.reshape(sourceArray.shape[0], sourceArray.shape[1]).astype(numpy.int64)
+    winners = _mostFrequentNeighborLabels(labels, len(uniqueColors), x0, y0, x1, y1, searchDistance, positiveOnly,
+                                          _rowBlocks(y1 - y0))
+    return hypnic_vectorized.unpackColors(uniqueColors)[winners]
+
+
+# Sets each of the R, G, and B values of every pixel to the value found at a given rank among its neighbors' values
+# rank is a fraction, where 0 is the lowest value, 1 is the highest, and 0.5 is the median. The value chosen is the one
+#   at index round(rank * (numNeighbors - 1)) of the sorted values, just as in ImageManipulator.setToRankOfNeighbors()
+@njit(parallel=True, cache=True)
+def _rankOfNeighbors(sourceArray, x0, y0, x1, y1, rank, searchDistance, positiveOnly, blocks):
+    yRes, xRes = sourceArray.shape[0], sourceArray.shape[1]
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    for b in prange(len(blocks) - 1):
+        # One 256-bin histogram per channel
+        counts = numpy.zeros((3, 256), dtype=numpy.int32)
+        # pointers[k] is the value currently believed to be at the desired rank within channel k, and below[k] is
+        #     the number of values in the neighborhood which are less than pointers[k]
+        pointers = numpy.zeros(3, dtype=numpy.int64)
+        below = numpy.zeros(3, dtype=numpy.int64)
+        for j in range(blocks[b], blocks[b + 1]):
+            y = y0 + j
+            yLo, yHi = neighborRange(y, yRes, searchDistance, positiveOnly)
+            colLo, colHi = neighborRange(x0, xRes, searchDistance, positiveOnly)
+            colHi = colLo
+            for k in range(3):
+                pointers[k] = 0
+                below[k] = 0
+            for i in range(x1 - x0):
+                x = x0 + i
+                xLo, xHi = neighborRange(x, xRes, searchDistance, positiveOnly)
+                while colLo < min(xLo, colHi):
+                    for yn in range(yLo, yHi):
+                        for k in range(3):
+                            value = sourceArray[yn, colLo, k]
+                            counts[k, value] -= 1
+                            if value < pointers[k]:
+                                below[k] -= 1
+                    colLo += 1
+                if colHi < xLo:
+                    colLo = xLo
+                    colHi = xLo
+                while colHi < xHi:
+                    for yn in range(yLo, yHi):
+                        for k in range(3):
+                            value = sourceArray[yn, colHi, k]
+                            counts[k, value] += 1
+                            if value < pointers[k]:
+                                below[k] += 1
+                    colHi += 1
+
+                # Moves each pointer until below[k] <= target < below[k] + counts[k, pointers[k]]
+                # Neighboring neighborhoods are similar, so the pointers rarely have far to go
+                target = round(rank * ((xHi - xLo) * (yHi - yLo) - 1))
+                for k in range(3):
+                    while below[k] > target:
+                        pointers[k] -= 1
+                        below[k] -= counts[k, pointers[k]]
+                    while below[k] + counts[k, pointers[k]] <= target:
+                        below[k] += counts[k, pointers[k]]
+                        pointers[k] += 1
+                    out[j, i, k] = pointers[k]
+
+            while colLo < colHi:
+                for yn in range(yLo, yHi):
+                    for k in range(3):
+                        counts[k, sourceArray[yn, colLo, k]] -= 1
+                colLo += 1
+    return out
+
+
+# Sets each of the R, G, and B values of every pixel to the value found at a given rank among its neighbors' values
+def setToRankOfNeighbors(sourceArray, x0, y0, x1, y1, rank, searchDistance, positiveOnly):
+    return _rankOfNeighbors(sourceArray, x0, y0, x1, y1, float(rank), searchDistance, positiveOnly,
+                            _rowBlocks(y1 - y0))
+
+
+# Sets each of the R, G, and B values of every pixel to the median of its neighbors' values
+def setToMedianOfNeighbors(sourceArray, x0, y0, x1, y1, searchDistance, positiveOnly):
+    return setToRankOfNeighbors(sourceArray, x0, y0, x1, y1, 0.5, searchDistance, positiveOnly)
+
+
+# FEEDBACK FILTERS
+# When a neighborhood function reads from the very image it is writing to (MANIPULATE_PREVIOUS_OUTPUT with
+#   hypnic1.NEIGHBORHOOD_FEEDBACK) and positiveOnly is False, every pixel reads some of the pixels which were rewritten
+#   before it during the same pass. These reproduce that exactly by visiting the pixels in the same raster order (rows
+#   top to bottom, each row left to right) and writing each result back into a working copy of the image before moving
+#   on to the next pixel, limited to 0-255 just as PIL would
+# Every pixel depends on the ones before it, so these run on a single core
+
+# Sweeps through image (an int64 copy of the image being written to) in raster order, setting every pixel of the
+#   rectangle to the average of its neighbors as they are at that moment. See setToAverageOfNeighbors()
+@njit(cache=True)
+def _averageOfNeighborsFeedback(image, x0, y0, x1, y1, searchDistance, positiveOnly):
+    yRes, xRes = image.shape[0], image.shape[1]
+    for y in range(y0, y1):
+        yLo, yHi = neighborRange(y, yRes, searchDistance, positiveOnly)
+        for x in range(x0, x1):
+            xLo, xHi = neighborRange(x, xRes, searchDistance, positiveOnly)
+            numNeighbors = (xHi - xLo) * (yHi - yLo)
+            for k in range(3):
+                total = 0
+                for xn in range(xLo, xHi):
+                    for yn in range(yLo, yHi):
+                        total += image[yn, xn, k]
+                value = round(total / numNeighbors)
+                image[y, x, k] = min(max(value, 0), 255)
+
+
+# Same as setToAverageOfNeighbors(), but every pixel reads the pixels rewritten before it during the same pass
+def setToAverageOfNeighborsFeedback(sourceArray, x0, y0, x1, y1, searchDistance, positiveOnly):
+    image = numpy.asarray(sourceArray).astype(numpy.int64)
+    _averageOfNeighborsFeedback(image, x0, y0, x1, y1, searchDistance, positiveOnly)
+    return image[y0:y1, x0:x1].copy()
+
+
+# Sweeps through labels (dense color labels, as in setToMostFrequentNeighbor()) in raster order, setting every pixel of
+#   the rectangle to the most frequent label among its neighbors as they are at that moment
+# Neighbors are visited X outer, Y inner, and only a label which beats the highest count so far replaces the winner, so
+#   with no repeated labels the pixel keeps its own, exactly as in ImageManipulator.setToMostFrequentNeighbor()
+@njit(cache=True)
+def _mostFrequentNeighborFeedback(labels, numLabels, x0, y0, x1, y1, searchDistance, positiveOnly):
+    yRes, xRes = labels.shape[0], labels.shape[1]
+    counts = numpy.zeros(numLabels, dtype=numpy.int32)
+    for y in range(y0, y1):
+        yLo, yHi = neighborRange(y, yRes, searchDistance, positiveOnly)
+        for x in range(x0, x1):
+            xLo, xHi = neighborRange(x, xRes, searchDistance, positiveOnly)
+            maxFreq = 1
+            winner = labels[y, x]
+            for xn in range(xLo, xHi):
+                for yn in range(yLo, yHi):
+                    label = labels[yn, xn]
+                    counts[label] += 1
+                    if counts[label] > maxFreq:
+                        maxFreq = counts[label]
+                        winner = label
+            # Empties the histogram for the next pixel
+            for xn in range(xLo, xHi):
+                for yn in range(yLo, yHi):
+                    counts[labels[yn, xn]] = 0
+            labels[y, x] = winner
+
+
+# Same as setToMostFrequentNeighbor(), but every pixel reads the pixels rewritten before it during the same pass
+# The winner is always one of the colors already present, so the labels of the original colors are enough
+def setToMostFrequentNeighborFeedback(sourceArray, x0, y0, x1, y1, searchDistance, positiveOnly):
+    uniqueColors, labels = numpy.unique(hypnic_vectorized.packColors(sourceArray), return_inverse=True)
+    labels = labels.reshape(sourceArray.shape[0], sourceArray.shape[1]).astype(numpy.int64)
+    _mostFrequentNeighborFeedback(labels, len(uniqueColors), x0, y0, x1, y1, searchDistance, positiveOnly)
+    return hypnic_vectorized.unpackColors(uniqueColors)[labels[y0:y1, x0:x1]]
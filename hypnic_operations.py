@@ -0,0 +1,612 @@
+# TODO:
+#  ==============================================================================
+#  S. Every backend of an operation must produce the exact same output as its per-pixel version, just like the functions
+#     within hypnic_vectorized.py and hypnic_numba.py which they call
+#  ==============================================================================
+#  A. Operations can only be described through the classes below. Anything else still needs a new class, which is
+#     usually just a matter of naming the ImageManipulator method (and whole-frame functions) it calls
+
+__name__ = "hypnic_operations"
+
+# Library Imports
+import numpy
+
+# Local Imports
+import hypnic_curves
+import hypnic_vectorized
+# Numba is only required when EXECUTION_BACKEND is "numba"
+try:
+    import hypnic_numba
+except ImportError:
+    hypnic_numba = None
+
+
+# O P E R A T I O N   C O N V E N T I O N S
+# An operation is a single manipulation pass, such as shifting the saturation of every pixel by -0.3
+# hypnic1.MANIPULATIONS is the ordered list of operations applied during each round of manipulation, where the first of
+#   them has a manip_index of 1
+# Every operation declares:
+#   name: A short description, printed while it runs
+#   params: The parameters it was created with
+#   footprint: What the new color of a pixel depends on, besides the pixel's own color:
+#       COLOR: nothing else at all
+#       COORDINATE: the pixel's X/Y coordinates
+#       NEIGHBORHOOD: the colors of the pixels within halo pixels of it (only below and to the right of it when the
+#           operation's positiveOnly is True, or on every side of it otherwise)
+#   halo: How far (in pixels) beyond its own position the manipulation of a pixel may read from, or None if it can't
+#       be known (see ImageManipulator.manipulationFootprint())
+#   numManipulations: How many entries of hypnic1.MANIPULATIONS it stands for, which is only ever more than 1 for a
+#       FusedColorOperation
+#   backends(): The values of EXECUTION_BACKEND which have a version of the operation. "python" always does
+#   prepare(manipulator): Called once at the start of every pass, before any of the backends, so that anything the pass
+#       needs (such as a color list) is built once and shared by every tile and band of it
+# Each backend is a method, which is looked up once per manipulation pass rather than once per pixel:
+#   pixelKernel(manipulator): Returns a function which takes the color of the current pixel (manipulator.currentX,
+#       manipulator.currentY) and returns its new color, like ImageManipulator.rgbFunc() used to
+#   arrayResult(manipulator, sourceArray, region, origin): Returns the new colors of every pixel in region, taking the
+#       same parameters and returning the same kind of result as ImageManipulator.rgbFuncArray(), or None
+#   numbaResult(manipulator, sourceArray, region, origin): The same, but using the kernels of hypnic_numba.py
+# Methods of the ImageManipulator (and kernels within hypnic_numba.py) are named rather than referred to directly, since
+#   this file is imported before the ImageManipulator class exists, and hypnic_numba may not be available at all
+
+# The footprint of every operation is one of these
+COLOR = "color"
+COORDINATE = "coordinate"
+NEIGHBORHOOD = "neighborhood"
+
+
+# Base class of every operation, which only has a per-pixel version
+class Operation():
+
+    def __init__(self, name, footprint, halo, params=()):
+
+        self.name = name
+        self.footprint = footprint
+        self.halo = halo
+        self.params = tuple(params)
+        self.numManipulations = 1
+
+    # Returns the values of EXECUTION_BACKEND which have a version of this operation
+    def backends(self):
+
+        backends = ["python"]
+        if self.hasArrayVersion():
+            backends.append("numpy")
+        if self.hasNumbaVersion() and (hypnic_numba is not None):
+            backends.append("numba")
+        return backends
+
+    # Whether self.arrayResult() can ever return a result
+    def hasArrayVersion(self):
+        return False
+
+    # Builds anything the coming pass needs, as described above. Most operations need nothing
+    def prepare(self, manipulator):
+        pass
+
+    # Whether self.numbaResult() can ever return a result (as long as numba is installed)
+    def hasNumbaVersion(self):
+        return False
+
+    # Returns the per-pixel version of this operation for manipulator, as described above
+    def pixelKernel(self, manipulator):
+        raise NotImplementedError
+
+    # Returns the new colors of every pixel in region, or None if there's no whole-frame version of this operation
+    def arrayResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+        return None
+
+    # Same as self.arrayResult(), but compiled by numba
+    def numbaResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+        return None
+
+    # Operations are printed as their names
+    def __repr__(self):
+        return self.name
+
+
+# An operation whose result only depends on each pixel's own color, such as ImageManipulator.modSaturationShift()
+# pixelMethod is the name of the ImageManipulator method, called as method(rgbIn, *params)
+# colorFunction is its whole-frame version from hypnic_vectorized.py (or any other function called as
+#   colorFunction(rgbArray, *params)), which is applied through ImageManipulator.colorFunctionArray()
+# numbaKernel is the name of its version within hypnic_numba.py, if there is one
+# continuous is whether the result changes smoothly along with a pixel's color, with no sudden jumps (such as those of
+#   S or V values wrapping around from 1 to 0), in which case its lookup tables may interpolate between entries
+class ColorOperation(Operation):
+
+    def __init__(self, name, pixelMethod, colorFunction=None, numbaKernel=None, params=(), continuous=False):
+
+        Operation.__init__(self, name, COLOR, 0, params)
+        self.pixelMethod = pixelMethod
+        self.colorFunction = colorFunction
+        self.numbaKernel = numbaKernel
+        # Whether colorFunction may be baked into a lookup table (see hypnic1.USE_COLOR_LUTS)
+        self.bakeable = True
+        # Whether those tables may have fewer than 256 entries along each axis (see hypnic1.COLOR_LUT_SIZE)
+        self.continuous = continuous
+
+    def hasArrayVersion(self):
+        return self.colorFunction is not None
+
+    def hasNumbaVersion(self):
+        return self.numbaKernel is not None
+
+    # Returns the parameters which self.colorFunction is called with, after the image itself
+    def colorFunctionParams(self, manipulator):
+        return self.params
+
+    def pixelKernel(self, manipulator):
+
+        method = getattr(manipulator, self.pixelMethod)
+        params = self.params
+        return lambda rgbIn: method(rgbIn, *params)
+
+    def arrayResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        if self.colorFunction is None:
+            return None
+        x0, y0, x1, y1 = region
+        return manipulator.colorFunctionArray(self.colorFunction, sourceArray[y0:y1, x0:x1],
+                                              *self.colorFunctionParams(manipulator), bakeable=self.bakeable,
+                                              continuous=self.continuous)
+
+    def numbaResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        if (self.numbaKernel is None) or (hypnic_numba is None):
+            return None
+        x0, y0, x1, y1 = region
+        return getattr(hypnic_numba, self.numbaKernel)(sourceArray, x0, y0, x1, y1, *self.params)
+
+
+# Sets each of the R, G, and B values of a pixel by looking it up from a curve (see hypnic_curves.py), built from just
+#   one of the pixel's own R, G, or B values
+# curvesFunction is the function of hypnic_curves.py which returns the curves for the new R, G, and B values, called as
+#   curvesFunction(*curveParams), and colorFunction is its apply*() twin within hypnic_curves.py
+# sourceChannels holds, for each output channel, the index of the input channel its curve reads from
+# Every backend looks values up from the same curves, which are only built once per run
+class CurveOperation(ColorOperation):
+
+    def __init__(self, name, curvesFunction, colorFunction, curveParams=(), sourceChannels=(0, 1, 2),
+                 continuous=False):
+
+        ColorOperation.__init__(self, name, None, colorFunction, None, (tuple(sourceChannels),) + tuple(curveParams),
+                                continuous)
+        self.curvesFunction = curvesFunction
+        self.sourceChannels = tuple(sourceChannels)
+        self.curveParams = tuple(curveParams)
+
+    def hasNumbaVersion(self):
+        return True
+
+    def pixelKernel(self, manipulator):
+
+        curveR, curveG, curveB = [curve.tolist() for curve in self.curvesFunction(*self.curveParams)]
+        sourceR, sourceG, sourceB = self.sourceChannels
+        return lambda rgbIn: (curveR[rgbIn[sourceR]], curveG[rgbIn[sourceG]], curveB[rgbIn[sourceB]])
+
+    def numbaResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        if hypnic_numba is None:
+            return None
+        x0, y0, x1, y1 = region
+        curves = numpy.stack(self.curvesFunction(*self.curveParams))
+        return hypnic_numba.applyCurves(sourceArray, x0, y0, x1, y1, curves, numpy.array(self.sourceChannels))
+
+
+# Sets each of the R, G, and B values of a pixel using ImageManipulator.calcFromCustomDomainRGB()
+# sourceChannels holds, for each output channel, the index of the input channel it is calculated from, and every
+#   other parameter is a 3-element tuple holding that parameter's value for each of the output channels
+# Values outside of 0-255 wrap around when wrap is True, as they do within ImageManipulator.calcFromCustomDomainRGB(),
+#   or are limited to 0-255 otherwise (which only the curves of hypnic_curves.customDomainCurve() offer)
+class CustomDomainOperation(CurveOperation):
+
+    def __init__(self, name, sourceChannels, lowerBounds, upperBounds, yIntsBelow, slopesBelow, yIntsAbove,
+                 slopesAbove, wrap=True):
+
+        CurveOperation.__init__(self, name, hypnic_curves.customDomainCurves, hypnic_curves.applyCustomDomainCurves,
+                                (tuple(lowerBounds), tuple(upperBounds), tuple(yIntsBelow), tuple(slopesBelow),
+                                 tuple(yIntsAbove), tuple(slopesAbove), wrap),
+                                sourceChannels)
+        self.wrap = wrap
+
+    def pixelKernel(self, manipulator):
+
+        if not self.wrap:
+            return CurveOperation.pixelKernel(self, manipulator)
+        calc = manipulator.calcFromCustomDomainRGB
+        channels = list(zip(self.sourceChannels, *self.curveParams[:-1]))
+        return lambda rgbIn: tuple(calc(rgbIn[source], lowerBound, upperBound, yIntBelow, slopeBelow, yIntAbove,
+                                        slopeAbove)
+                                   for source, lowerBound, upperBound, yIntBelow, slopeBelow, yIntAbove, slopeAbove
+                                   in channels)
+
+    def numbaResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        if (hypnic_numba is None) or (not self.wrap):
+            return CurveOperation.numbaResult(self, manipulator, sourceArray, region, origin)
+        x0, y0, x1, y1 = region
+        return hypnic_numba.calcFromCustomDomainRGB(sourceArray, x0, y0, x1, y1, numpy.array(self.sourceChannels),
+                                                    *[numpy.array(param) for param in self.curveParams[:-1]])
+
+
+# Shifts the Hue value of a pixel by ((x + 1) % (y + 1)) % 360 degrees, based on its own X/Y coordinates
+class HueShiftByCoordinatesOperation(Operation):
+
+    def __init__(self, name):
+
+        Operation.__init__(self, name, COORDINATE, 0)
+
+    def hasArrayVersion(self):
+        return True
+
+    def hasNumbaVersion(self):
+        return True
+
+    def pixelKernel(self, manipulator):
+
+        modHueShift = manipulator.modHueShift
+        return lambda rgbIn: modHueShift(rgbIn, ((manipulator.currentX + 1) % (manipulator.currentY + 1)) % 360)
+
+    def arrayResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        x0, y0, x1, y1 = region
+        # The X and Y coordinates of each pixel, shaped so that they broadcast against each other
+        xGrid = numpy.arange(origin[0] + x0, origin[0] + x1)[numpy.newaxis, :]
+        yGrid = numpy.arange(origin[1] + y0, origin[1] + y1)[:, numpy.newaxis]
+        return hypnic_vectorized.modHueShift(sourceArray[y0:y1, x0:x1], ((xGrid + 1) % (yGrid + 1)) % 360)
+
+    def numbaResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        if hypnic_numba is None:
+            return None
+        x0, y0, x1, y1 = region
+        return hypnic_numba.modHueShiftByCoordinates(sourceArray, x0, y0, x1, y1, origin[0], origin[1])
+
+
+# Sets every pixel to a member of a color list, using one of the ImageManipulator.limitColorsBy*() functions (named by
+#   matchFunction, such as "limitColorsByMatchRGB") and its twin within hypnic_vectorized.py
+# The color list is built at the start of every pass by the ImageManipulator method paletteMethod (such as
+#   "colorListCubeRGB"), called as method(*paletteParams), since self.manipulate() empties it after every pass
+# Every backend matches colors through the same matcher (see hypnic_vectorized.colorListMatcher())
+# Never baked into a lookup table: an interpolated table would blend palette members into colors outside of the color
+#   list, and color lists such as those of colorListRandom() change every pass, so each table would only be used once
+class LimitColorsOperation(ColorOperation):
+
+    def __init__(self, name, matchFunction, paletteMethod, paletteParams=()):
+
+        ColorOperation.__init__(self, name, matchFunction, getattr(hypnic_vectorized, matchFunction), None,
+                                (paletteMethod, tuple(paletteParams)))
+        self.paletteMethod = paletteMethod
+        self.paletteParams = tuple(paletteParams)
+        self.bakeable = False
+        # Whether matchFunction also needs the HSV value of every member of the color list
+        self.usesHSV = matchFunction in ("limitColorsByMatchHSV", "limitColorsByMatchH", "limitColorsByMatchS",
+                                         "limitColorsByMatchV")
+        # The color lists built for the current pass by self.prepare(), and the matcher of matchFunction for them
+        self.colorList = None
+        self.colorListHSV = None
+        self.matcher = None
+
+    def hasNumbaVersion(self):
+        return True
+
+    # Builds the color lists through manipulator, which also makes them the manipulator's own
+    def prepare(self, manipulator):
+
+        getattr(manipulator, self.paletteMethod)(*self.paletteParams)
+        self.colorList = manipulator.colorList
+        self.colorListHSV = manipulator.colorListHSV
+        self.matcher = None
+
+    # The color lists, built now if the operation hasn't been prepared (such as when a single pixel is manipulated)
+    def colorFunctionParams(self, manipulator):
+
+        if self.colorList is None:
+            self.prepare(manipulator)
+        if self.usesHSV:
+            return (self.colorList, self.colorListHSV)
+        return (self.colorList,)
+
+    def pixelKernel(self, manipulator):
+
+        self.colorFunctionParams(manipulator)
+        manipulator.colorList = self.colorList
+        manipulator.colorListHSV = self.colorListHSV
+        return getattr(manipulator, self.pixelMethod)
+
+    def numbaResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        if hypnic_numba is None:
+            return None
+        params = self.colorFunctionParams(manipulator)
+        if self.matcher is None:
+            self.matcher = hypnic_vectorized.colorListMatcher(self.pixelMethod, *params)
+        x0, y0, x1, y1 = region
+        return hypnic_numba.limitColors(sourceArray, x0, y0, x1, y1, numpy.array(self.colorList, dtype=numpy.int64),
+                                        self.matcher)
+
+
+# A run of adjacent COLOR operations applied as a single operation, so that the image is only read and written once for
+#   the whole run instead of once for each of them (see hypnic1.FUSE_COLOR_MANIPULATIONS)
+# Each operation's result is limited to 0-255 before the next one reads it, exactly as if it had been written to the
+#   image in between, so the output is identical to that of applying them one at a time
+class FusedColorOperation(Operation):
+
+    def __init__(self, operations):
+
+        Operation.__init__(self, " + ".join(operation.name for operation in operations), COLOR, 0)
+        self.operations = list(operations)
+        self.numManipulations = len(self.operations)
+
+    # Only operations with whole-frame versions are ever fused (see findFusibleRuns())
+    def hasArrayVersion(self):
+        return True
+
+    def prepare(self, manipulator):
+
+        for operation in self.operations:
+            operation.prepare(manipulator)
+
+    def pixelKernel(self, manipulator):
+
+        kernels = [operation.pixelKernel(manipulator) for operation in self.operations]
+
+        def fusedKernel(rgbIn):
+            for kernel in kernels:
+                rgbOut = kernel(rgbIn)
+                rgbIn = (min(max(rgbOut[0], 0), 255), min(max(rgbOut[1], 0), 255), min(max(rgbOut[2], 0), 255))
+            return rgbIn
+
+        return fusedKernel
+
+    # The whole run is applied as a single composite function, or a single lookup table composed from the table of each
+    #     operation (see ImageManipulator.colorFunctionsArray()) when every one of them may be baked
+    def arrayResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        x0, y0, x1, y1 = region
+        functions = [(operation.colorFunction, operation.colorFunctionParams(manipulator))
+                     for operation in self.operations]
+        return manipulator.colorFunctionsArray(functions, sourceArray[y0:y1, x0:x1],
+                                               all(operation.bakeable for operation in self.operations),
+                                               all(operation.continuous for operation in self.operations))
+
+
+# Returns every run of two or more adjacent operations within operations which can be fused into a FusedColorOperation,
+#   as a dictionary mapping the position (within operations) of the first operation of each run to its fused operation
+# Only COLOR operations with a whole-frame version are fused, as those are the ones which can be applied as a single
+#   composite function
+def findFusibleRuns(operations):
+
+    runs = {}
+    start = 0
+    while start < len(operations):
+        end = start
+        while (end < len(operations)) and (operations[end].footprint == COLOR) and \
+                operations[end].hasArrayVersion() and (operations[end].numManipulations == 1):
+            end += 1
+        if end - start >= 2:
+            runs[start] = FusedColorOperation(operations[start:end])
+        start = max(end, start + 1)
+    return runs
+
+
+# An operation based on the colors of the pixels surrounding each one, such as
+#   ImageManipulator.setToAverageOfNeighbors()
+# pixelMethod is the name of the ImageManipulator method, called as method(searchDistance, positiveOnly)
+# arrayMethod and numbaMethod are the names of its whole-frame versions within ImageManipulator (if there are any),
+#   called as method(sourceArray, region, searchDistance, positiveOnly) and returning None when they can't be used
+# With positiveOnly False, a pixel also reads the pixels above and to the left of it, which were already rewritten
+#   earlier in the same pass whenever the operation reads from the image it writes to (see
+#   hypnic1.NEIGHBORHOOD_FEEDBACK). The whole-frame versions must then either reproduce that or return None
+class NeighborhoodOperation(Operation):
+
+    def __init__(self, name, searchDistance, pixelMethod, arrayMethod=None, numbaMethod=None, positiveOnly=True):
+
+        Operation.__init__(self, name, NEIGHBORHOOD, searchDistance, (searchDistance, positiveOnly))
+        self.positiveOnly = positiveOnly
+        self.pixelMethod = pixelMethod
+        self.arrayMethod = arrayMethod
+        self.numbaMethod = numbaMethod
+
+    def hasArrayVersion(self):
+        return self.arrayMethod is not None
+
+    def hasNumbaVersion(self):
+        return self.numbaMethod is not None
+
+    def pixelKernel(self, manipulator):
+
+        method = getattr(manipulator, self.pixelMethod)
+        searchDistance = self.halo
+        positiveOnly = self.positiveOnly
+        return lambda rgbIn: method(searchDistance, positiveOnly)
+
+    def arrayResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        if self.arrayMethod is None:
+            return None
+        return getattr(manipulator, self.arrayMethod)(sourceArray, region, self.halo, self.positiveOnly)
+
+    def numbaResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        if (self.numbaMethod is None) or (hypnic_numba is None):
+            return None
+        return getattr(manipulator, self.numbaMethod)(sourceArray, region, self.halo, self.positiveOnly)
+
+
+# Sets each of the R, G, and B values of a pixel to the value found at a given rank among its neighbors' values (see
+#   ImageManipulator.setToRankOfNeighbors()), where rank is a fraction between 0 (the lowest) and 1 (the highest)
+# The ImageManipulator methods are called with rank before every other parameter
+class RankOfNeighborsOperation(NeighborhoodOperation):
+
+    def __init__(self, name, rank, searchDistance, positiveOnly=True):
+
+        NeighborhoodOperation.__init__(self, name, searchDistance, "setToRankOfNeighbors", "rankOfNeighborsArray",
+                                       "rankOfNeighborsNumba", positiveOnly)
+        self.rank = rank
+        self.params = (rank, searchDistance, positiveOnly)
+
+    def pixelKernel(self, manipulator):
+
+        method = getattr(manipulator, self.pixelMethod)
+        rank = self.rank
+        searchDistance = self.halo
+        positiveOnly = self.positiveOnly
+        return lambda rgbIn: method(rank, searchDistance, positiveOnly)
+
+    def arrayResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+        return getattr(manipulator, self.arrayMethod)(sourceArray, region, self.rank, self.halo, self.positiveOnly)
+
+    def numbaResult(self, manipulator, sourceArray, region, origin=(0, 0)):
+
+        if hypnic_numba is None:
+            return None
+        return getattr(manipulator, self.numbaMethod)(sourceArray, region, self.rank, self.halo, self.positiveOnly)
+
+
+# OPERATIONS
+# Shorthands for creating each operation which ImageManipulator.rgbFunc() used to offer, for use within
+#   hypnic1.MANIPULATIONS
+
+# Returns the name of a neighborhood operation, which only mentions positiveOnly when it isn't the default of True
+def _neighborhoodName(name, searchDistance, positiveOnly):
+    if positiveOnly:
+        return name + "(" + str(searchDistance) + ")"
+    return name + "(" + str(searchDistance) + ", positiveOnly=False)"
+
+
+# Sets every pixel to the average of its neighbors within searchDistance (see
+#   ImageManipulator.setToAverageOfNeighbors())
+def averageOfNeighbors(searchDistance, positiveOnly=True):
+    return NeighborhoodOperation(_neighborhoodName("averageOfNeighbors", searchDistance, positiveOnly), searchDistance,
+                                 "setToAverageOfNeighbors", "averageOfNeighborsArray", "averageOfNeighborsNumba",
+                                 positiveOnly)
+
+
+# Sets every pixel to the most frequent color among its neighbors within searchDistance
+def mostFrequentNeighbor(searchDistance, positiveOnly=True):
+    return NeighborhoodOperation(_neighborhoodName("mostFrequentNeighbor", searchDistance, positiveOnly),
+                                 searchDistance, "setToMostFrequentNeighbor", None, "mostFrequentNeighborNumba",
+                                 positiveOnly)
+
+
+# Sets each of the R, G, and B values of every pixel to the value at a given rank among its neighbors within
+#   searchDistance (see RankOfNeighborsOperation)
+def rankOfNeighbors(rank, searchDistance, positiveOnly=True):
+    name = "rankOfNeighbors(" + str(rank) + ", " + str(searchDistance)
+    if not positiveOnly:
+        name += ", positiveOnly=False"
+    return RankOfNeighborsOperation(name + ")", rank, searchDistance, positiveOnly)
+
+
+# Sets each of the R, G, and B values of every pixel to the median of its neighbors' values within searchDistance
+def medianOfNeighbors(searchDistance, positiveOnly=True):
+    return RankOfNeighborsOperation(_neighborhoodName("medianOfNeighbors", searchDistance, positiveOnly), 0.5,
+                                    searchDistance, positiveOnly)
+
+
+# Shifts the Hue value of every pixel by a given number of degrees
+def hueShift(shift):
+    return ColorOperation("hueShift(" + str(shift) + ")", "modHueShift", hypnic_vectorized.modHueShift,
+                          "modHueShift", (shift,), True)
+
+
+# Shifts the Saturation value of every pixel by a given amount
+def saturationShift(shift):
+    return ColorOperation("saturationShift(" + str(shift) + ")", "modSaturationShift",
+                          hypnic_vectorized.modSaturationShift, "modSaturationShift", (shift,))
+
+
+# Shifts the Value value of every pixel by a given amount
+def valueShift(shift):
+    return ColorOperation("valueShift(" + str(shift) + ")", "modValueShift", hypnic_vectorized.modValueShift,
+                          "modValueShift", (shift,))
+
+
+# Sets the Saturation value of every pixel to a multiple of its previous value
+def saturationMultiple(multiple):
+    return ColorOperation("saturationMultiple(" + str(multiple) + ")", "modSaturationMultiple",
+                          hypnic_vectorized.modSaturationMultiple, "modSaturationMultiple", (multiple,))
+
+
+# Sets the Value value of every pixel to a multiple of its previous value
+def valueMultiple(multiple):
+    return ColorOperation("valueMultiple(" + str(multiple) + ")", "modValueMultiple",
+                          hypnic_vectorized.modValueMultiple, "modValueMultiple", (multiple,))
+
+
+# Swaps the Saturation and Value values of every pixel
+def flipSV():
+    return ColorOperation("flipSV", "modFlipSV", hypnic_vectorized.modFlipSV, "modFlipSV")
+
+
+# Moves the Saturation and Value values of every pixel closer together by a given percentage factor of their difference
+#   (see ImageManipulator.modSlideSV())
+def slideSV(factor):
+    return ColorOperation("slideSV(" + str(factor) + ")", "modSlideSV", hypnic_vectorized.modSlideSV, "modSlideSV",
+                          (factor,))
+
+
+# Rotates the R/G/B values of every pixel by 1
+def rotate1RGB():
+    return ColorOperation("rotate1RGB", "modRotate1RGB", hypnic_vectorized.modRotate1RGB, "modRotate1RGB", (), True)
+
+
+# Rotates the R/G/B values of every pixel by 2
+def rotate2RGB():
+    return ColorOperation("rotate2RGB", "modRotate2RGB", hypnic_vectorized.modRotate2RGB, "modRotate2RGB", (), True)
+
+
+# Swaps the R and B values of every pixel
+def flipRGB():
+    return ColorOperation("flipRGB", "modFlipRGB", hypnic_vectorized.modFlipRGB, "modFlipRGB", (), True)
+
+
+# Swaps the G and B values of every pixel
+def flipRotate1RGB():
+    return ColorOperation("flipRotate1RGB", "modFlipRotate1RGB", hypnic_vectorized.modFlipRotate1RGB,
+                          "modFlipRotate1RGB", (), True)
+
+
+# Swaps the R and G values of every pixel
+def flipRotate2RGB():
+    return ColorOperation("flipRotate2RGB", "modFlipRotate2RGB", hypnic_vectorized.modFlipRotate2RGB,
+                          "modFlipRotate2RGB", (), True)
+
+
+# Sets every pixel's R, G, and B values from calcFromCustomDomainRGB() (see CustomDomainOperation)
+# With wrap False, values outside of 0-255 are limited to it instead of wrapping around
+def customDomainRGB(sourceChannels, lowerBounds, upperBounds, yIntsBelow, slopesBelow, yIntsAbove, slopesAbove,
+                    wrap=True):
+    name = "customDomainRGB" if wrap else "customDomainRGB(wrap=False)"
+    return CustomDomainOperation(name, sourceChannels, lowerBounds, upperBounds, yIntsBelow, slopesBelow, yIntsAbove,
+                                 slopesAbove, wrap)
+
+
+# Reduces each of the R, G, and B values of every pixel to the closest of numLevels evenly spaced levels between 0 and
+#   255 (see hypnic_curves.posterizeCurve())
+def posterize(numLevels):
+    return CurveOperation("posterize(" + str(numLevels) + ")", hypnic_curves.posterizeCurves,
+                          hypnic_curves.applyPosterizeCurves, (numLevels,))
+
+
+# Stretches each of the R, G, and B values of every pixel between inBlack and inWhite to fill outBlack to outWhite,
+#   brightening or darkening the values in between by gamma (see hypnic_curves.levelsCurve())
+def levels(inBlack=0, inWhite=255, gamma=1.0, outBlack=0, outWhite=255):
+    params = (inBlack, inWhite, gamma, outBlack, outWhite)
+    return CurveOperation("levels(" + ", ".join(str(param) for param in params) + ")", hypnic_curves.levelsCurves,
+                          hypnic_curves.applyLevelsCurves, params, continuous=True)
+
+
+# Shifts the Hue value of every pixel based on its own X/Y coordinates (see HueShiftByCoordinatesOperation)
+def hueShiftByCoordinates():
+    return HueShiftByCoordinatesOperation("hueShiftByCoordinates")
+
+
+# Sets every pixel to a member of the color list built by the ImageManipulator method paletteMethod (such as
+#   "colorListCubeRGB"), where match names the ImageManipulator.limitColorsBy*() function that chooses the member (such
+#   as "MatchRGB" for limitColorsByMatchRGB()). For example limitColors("MatchHSV", "colorListCubeRGB", 4)
+def limitColors(match, paletteMethod, *paletteParams):
+    palette = paletteMethod + "(" + ", ".join(str(param) for param in paletteParams) + ")"
+    return LimitColorsOperation("limitColorsBy" + match + "(" + palette + ")", "limitColorsBy" + match, paletteMethod,
+                                paletteParams)
@@ -0,0 +1,240 @@
+# TODO:
+#  ==============================================================================
+#  S. Matching colors through an index must always find the same palette color as checking every palette color in
+#     turn would, including which one is chosen when several are equally close (the LAST of them within the palette)
+#  ==============================================================================
+#  A. Palettes whose colors are bunched together (or repeated many times) leave some cells with long candidate lists,
+#     in which case the index is only a little quicker than checking every palette color
+
+__name__ = "hypnic_palettes"
+
+# Library Imports
+import math
+import numpy
+
+
+# P A L E T T E   I N D E X   C O N V E N T I O N S
+# A palette is a list of colors, such as ImageManipulator.colorList, given here as a float64 or int64 array of points of
+#   shape (numColors, 3) within some 3D space (R/G/B values, or the HSV cylinder coordinates of
+#   hypnic_helpers.fromHSVtoCylinder())
+# Queries are arrays of points of shape (numQueries, 3) in the same space, and the result of a query is the index within
+#   the palette of the closest point to each of them, by straight-line distance
+# An index is a dictionary, built once per palette by getPaletteIndex() and reused for every later frame, which is
+#   either:
+#   "cube": for a palette holding every combination of a list of R values, G values, and B values, in the nested order
+#       that ImageManipulator.colorListCubeRGB() produces. Each channel is then matched separately through a table
+#       of 256 entries, which takes the same time no matter how large the palette is
+#   "grid": for any other palette. Space is split into a grid of cells, and each cell keeps the list of the only palette
+#       points which could be the closest to somewhere within it (its candidates), so that only those are checked
+# Single points (such as the color of the one pixel being manipulated by ImageManipulator.rgbFunc()) are matched through
+#   plain Python lists copied from the index instead, as a numpy call costs far more than matching a single point
+
+# Indices which have already been built during this run, keyed by the bytes of their palette points
+_indexCache = {}
+
+# The number of cells along each side of the grid of a "grid" index
+GRID_CELLS_PER_AXIS = 16
+
+
+# Returns the index of the closest palette point (the last one if several are equally close) for each of queries,
+#   by checking every palette point in turn. Used for queries that fall outside of a grid
+def _closestByScan(points, queries):
+    bestDist = numpy.full(len(queries), numpy.inf)
+    bestIndex = numpy.zeros(len(queries), dtype=numpy.int64)
+    for n in range(len(points)):
+        diff = queries - points[n]
+        dist = (diff[:, 0] ** 2 + diff[:, 1] ** 2) + diff[:, 2] ** 2
+        closer = dist <= bestDist
+        bestDist[closer] = dist[closer]
+        bestIndex[closer] = n
+    return bestIndex
+
+
+# Returns the (rValues, gValues, bValues) lists which points is every combination of, in the order of
+#   ImageManipulator.colorListCubeRGB() (B changing fastest, then G, then R), or None if it isn't such a palette
+def findCubeAxes(points):
+    numColors = len(points)
+    size = int(round(numColors ** (1 / 3)))
+    if (size < 2) or (size ** 3 != numColors) or (points.dtype.kind not in "iu"):
+        return None
+    rValues = points[::size * size, 0]
+    gValues = points[:size * size:size, 1]
+    bValues = points[:size, 2]
+    cube = numpy.stack(numpy.meshgrid(rValues, gValues, bValues, indexing="ij"), axis=-1).reshape(-1, 3)
+    if not numpy.array_equal(cube, points):
+        return None
+    return (rValues, gValues, bValues)
+
+
+# Returns a table of 256 entries holding the position (within values) of the closest of values to every possible
+#   R/G/B value, choosing the LAST position of any that are equally close
+def _closestValueTable(values):
+    dist = numpy.abs(numpy.arange(256)[:, numpy.newaxis] - numpy.asarray(values)[numpy.newaxis, :])
+    isClosest = dist == dist.min(axis=1, keepdims=True)
+    return len(values) - 1 - numpy.argmax(isClosest[:, ::-1], axis=1)
+
+
+# Builds the "cube" index of a palette from the axes returned by findCubeAxes()
+# Within such a palette, the closest color is the closest R value combined with the closest G and B values, and the last
+#   of several equally close colors is the one made up of the last of each of those values
+def buildCubeIndex(axes):
+    size = len(axes[0])
+    return {"kind": "cube", "size": size, "tables": [_closestValueTable(values) for values in axes]}
+
+
+# Builds the "grid" index of any palette, over the box between lower and upper (which must contain every query)
+def buildGridIndex(points, lower, upper, cellsPerAxis=GRID_CELLS_PER_AXIS):
+    points = numpy.asarray(points, dtype=numpy.float64)
+    lower = numpy.asarray(lower, dtype=numpy.float64)
+    cellSize = (numpy.asarray(upper, dtype=numpy.float64) - lower) / cellsPerAxis
+
+    # The lowest corner of every cell, in the same order as the cell numbers used by _cellsOf()
+    cellIndices = numpy.stack(numpy.meshgrid(*[numpy.arange(cellsPerAxis)] * 3, indexing="ij"), axis=-1)
+    cellLower = lower + cellIndices.reshape(-1, 3) * cellSize
+    cellUpper = cellLower + cellSize
+
+    # For each cell, the smallest (over every palette point) of the distances to the point's furthest corner of the cell
+    # No point within the cell can be further than that from its closest palette point
+    bound = numpy.full(len(cellLower), numpy.inf)
+    for point in points:
+        furthest = numpy.maximum(numpy.abs(cellLower - point), numpy.abs(cellUpper - point))
+        bound = numpy.minimum(bound, (furthest ** 2).sum(axis=1))
+    # A small allowance is added so that rounding can never remove a point that is exactly as close as the bound
+    bound += 1e-9 * (1 + bound)
+
+    # A palette point is a candidate for a cell unless even its closest possible distance to the cell is beyond bound
+    isCandidate = numpy.empty((len(cellLower), len(points)), dtype=bool)
+    for n, point in enumerate(points):
+        nearest = numpy.clip(point, cellLower, cellUpper) - point
+        isCandidate[:, n] = (nearest ** 2).sum(axis=1) <= bound
+
+    # Candidate lists are padded with -1 to the length of the longest one, so they can be held in a single array
+    numCandidates = isCandidate.sum(axis=1)
+    candidates = numpy.full((len(cellLower), max(int(numCandidates.max()), 1)), -1, dtype=numpy.int64)
+    for cell in numpy.flatnonzero(numCandidates):
+        candidates[cell, :numCandidates[cell]] = numpy.flatnonzero(isCandidate[cell])
+
+    return {"kind": "grid", "points": points, "lower": lower, "upper": lower + cellSize * cellsPerAxis,
+            "cellSize": cellSize, "cellsPerAxis": cellsPerAxis, "candidates": candidates,
+            "numCandidates": numCandidates}
+
+
+# Returns the index of a palette, building it only if it hasn't been built already
+# lower and upper describe the box that every query will fall within (anything outside of it is still matched
+#   correctly, only more slowly). Palettes of R/G/B values may be given a "cube" index, anything else a "grid" one
+def getPaletteIndex(points, lower=(0, 0, 0), upper=(255, 255, 255)):
+    points = numpy.asarray(points)
+    key = (points.dtype.str, points.tobytes(), tuple(lower), tuple(upper))
+    if key not in _indexCache:
+        axes = findCubeAxes(points)
+        if axes is not None:
+            _indexCache[key] = buildCubeIndex(axes)
+        else:
+            _indexCache[key] = buildGridIndex(points, lower, upper)
+    return _indexCache[key]
+
+
+# Forgets every index built during this run
+def clearPaletteIndexCache():
+    _indexCache.clear()
+
+
+# Returns the number of the grid cell that each of queries falls within
+def _cellsOf(index, queries):
+    cells = numpy.floor((queries - index["lower"]) / index["cellSize"]).astype(numpy.int64)
+    cells = numpy.clip(cells, 0, index["cellsPerAxis"] - 1)
+    return (cells[:, 0] * index["cellsPerAxis"] + cells[:, 1]) * index["cellsPerAxis"] + cells[:, 2]
+
+
+# Returns the index of the closest palette point for each of queries, choosing the last one if several are equally close
+# Only the candidates of each query's cell are checked. Queries are sorted by how many candidates their cell has, so
+#   that the n-th candidate of every query which has one can be checked at once, without checking any padding
+def _closestByGrid(index, queries):
+    points = index["points"]
+    result = numpy.empty(len(queries), dtype=numpy.int64)
+    inside = numpy.all((queries >= index["lower"]) & (queries <= index["upper"]), axis=1)
+    outside = numpy.flatnonzero(~inside)
+    if len(outside):
+        result[outside] = _closestByScan(points, queries[outside])
+
+    insideQueries = numpy.flatnonzero(inside)
+    cells = _cellsOf(index, queries[insideQueries])
+    numCandidates = index["numCandidates"][cells]
+    order = numpy.argsort(-numCandidates, kind="stable")
+    insideQueries, cells, numCandidates = insideQueries[order], cells[order], numCandidates[order]
+    sortedQueries = queries[insideQueries]
+
+    bestDist = numpy.full(len(insideQueries), numpy.inf)
+    bestIndex = numpy.zeros(len(insideQueries), dtype=numpy.int64)
+    # Candidates are listed in palette order, so replacing equally close matches keeps the last of them
+    for n in range(index["candidates"].shape[1]):
+        numActive = int(numpy.count_nonzero(numCandidates > n))
+        candidates = index["candidates"][cells[:numActive], n]
+        diff = sortedQueries[:numActive] - points[candidates]
+        dist = (diff[:, 0] ** 2 + diff[:, 1] ** 2) + diff[:, 2] ** 2
+        closer = dist <= bestDist[:numActive]
+        bestDist[:numActive][closer] = dist[closer]
+        bestIndex[:numActive][closer] = candidates[closer]
+    result[insideQueries] = bestIndex
+    return result
+
+
+# Returns the index (within the palette described by index) of the closest palette point for each of queries
+def closestPaletteIndices(index, queries):
+    if index["kind"] == "cube":
+        # Values outside of 0-255 have the same closest value as 0 or 255 along a single axis
+        channels = numpy.clip(numpy.asarray(queries, dtype=numpy.int64), 0, 255)
+        size = index["size"]
+        tables = index["tables"]
+        return (tables[0][channels[:, 0]] * size + tables[1][channels[:, 1]]) * size + tables[2][channels[:, 2]]
+    return _closestByGrid(index, numpy.asarray(queries, dtype=numpy.float64))
+
+
+# Returns the plain Python lists which closestPaletteIndex() searches through, copying them from index the first time
+def _indexLists(index):
+    if "lists" not in index:
+        if index["kind"] == "cube":
+            index["lists"] = {"tables": [table.tolist() for table in index["tables"]]}
+        else:
+            index["lists"] = {"points": index["points"].tolist(), "lower": index["lower"].tolist(),
+                              "upper": index["upper"].tolist(), "cellSize": index["cellSize"].tolist(),
+                              "candidates": [index["candidates"][cell, :numCandidates].tolist()
+                                             for cell, numCandidates in enumerate(index["numCandidates"])]}
+    return index["lists"]
+
+
+# Same as closestPaletteIndices(), but for a single point given as a tuple, returning a single index
+# Each step is the same as that of closestPaletteIndices() (down to the order of the floating point operations), so the
+#   same palette point is always chosen
+def closestPaletteIndex(index, point):
+    lists = _indexLists(index)
+    if index["kind"] == "cube":
+        size = index["size"]
+        tables = lists["tables"]
+        return (tables[0][min(max(int(point[0]), 0), 255)] * size + tables[1][min(max(int(point[1]), 0), 255)]) * \
+            size + tables[2][min(max(int(point[2]), 0), 255)]
+
+    points = lists["points"]
+    point = (float(point[0]), float(point[1]), float(point[2]))
+    lower, upper, cellSize = lists["lower"], lists["upper"], lists["cellSize"]
+    if all(lower[k] <= point[k] <= upper[k] for k in range(3)):
+        cellsPerAxis = index["cellsPerAxis"]
+        cell = 0
+        for k in range(3):
+            cell = cell * cellsPerAxis + min(max(math.floor((point[k] - lower[k]) / cellSize[k]), 0), cellsPerAxis - 1)
+        candidates = lists["candidates"][cell]
+    else:
+        candidates = range(len(points))
+
+    bestDist = math.inf
+    bestIndex = 0
+    # Candidates are listed in palette order, so replacing equally close matches keeps the last of them
+    for n in candidates:
+        d0 = point[0] - points[n][0]
+        d1 = point[1] - points[n][1]
+        d2 = point[2] - points[n][2]
+        dist = (d0 * d0 + d1 * d1) + d2 * d2
+        if dist <= bestDist:
+            bestDist = dist
+            bestIndex = n
+    return bestIndex
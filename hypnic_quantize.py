@@ -0,0 +1,112 @@
+# TODO:
+#  ==============================================================================
+#  S. A pixel's palette index must depend only on its color, its position (when dithering), and the shared palette,
+#     so frames can be remapped in any order, or on any worker, and still give the same result
+#  ==============================================================================
+#  A. The palette only sees a sample of the pixels of every frame, so a color found in only a handful of pixels across
+#     the whole animation may be left out of it and matched to a nearby color instead
+
+__name__ = "hypnic_quantize"
+
+# Library Imports
+import numpy
+from PIL import Image
+
+# Local Imports
+import hypnic_palettes
+import hypnic_random
+import hypnic_vectorized
+
+
+# G L O B A L   P A L E T T E   C O N V E N T I O N S
+# A global palette is a uint8 array of shape (numColors, 3), where numColors is at most 256, which is shared by every
+#   frame of an animated GIF. Since no frame is given its own palette, colors which stay the same between frames are
+#   always shown the same way (a crossfade doesn't flicker), and only one palette has to be written
+# The palette is built from a sample of the pixels of every distinct frame, which is reduced by median cut (and then
+#   optionally refined by passes of k-means) into the colors that best cover all of them
+# Each frame is then remapped, which turns it into a uint8 array of shape (height, width) holding the index within the
+#   palette of the closest color to each pixel (see hypnic_palettes.py), optionally after ordered dithering, which
+#   nudges each pixel by an amount depending only on its position within an 8x8 Bayer matrix
+
+# The 8x8 Bayer matrix, holding each of the values 0-63 once, arranged so that each threshold is as far as possible from
+#   the ones closest to it in value
+BAYER_MATRIX = numpy.array([[0, 32, 8, 40, 2, 34, 10, 42],
+                            [48, 16, 56, 24, 50, 18, 58, 26],
+                            [12, 44, 4, 36, 14, 46, 6, 38],
+                            [60, 28, 52, 20, 62, 30, 54, 22],
+                            [3, 35, 11, 43, 1, 33, 9, 41],
+                            [51, 19, 59, 27, 49, 17, 57, 25],
+                            [15, 47, 7, 39, 13, 45, 5, 37],
+                            [63, 31, 55, 23, 61, 29, 53, 21]])
+
+
+# Returns up to numSamples pixels (as an array of shape (numSamples, 3)) drawn from the frames of frameStore (see
+#   hypnic_frames.py) with the given frame numbers, taking an equal share from each of them
+# Pixels are chosen by streams of hypnic_random keyed by frame number, so the same frames always give the same sample
+def samplePixels(frameStore, frameNumbers, numSamples):
+    frameNumbers = list(dict.fromkeys(frameNumbers))
+    perFrame = max(numSamples // max(len(frameNumbers), 1), 1)
+    samples = []
+    for frameNumber in frameNumbers:
+        pixels = numpy.asarray(frameStore.get(frameNumber))[..., :3].reshape(-1, 3)
+        if len(pixels) <= perFrame:
+            samples.append(numpy.array(pixels))
+        else:
+            chosen = hypnic_random.getStream((frameNumber,)).choice(len(pixels), perFrame, replace=False)
+            samples.append(pixels[numpy.sort(chosen)])
+    return numpy.concatenate(samples).astype(numpy.uint8)
+
+
+# Returns the global palette of up to numColors colors which best covers samples, found by median cut followed by
+#   kmeans passes of k-means (none if kmeans is 0)
+def buildPalette(samples, numColors=256, kmeans=0):
+    strip = Image.fromarray(numpy.ascontiguousarray(samples, dtype=numpy.uint8)[numpy.newaxis])
+    quantized = strip.quantize(colors=numColors, method=Image.Quantize.MEDIANCUT, kmeans=kmeans)
+    # Only the palette entries which are actually used by some sample are kept
+    numUsed = int(numpy.asarray(quantized).max()) + 1
+    return numpy.array(quantized.getpalette()[:numUsed * 3], dtype=numpy.uint8).reshape(-1, 3)
+
+
+# Returns frameArray nudged by an ordered dither of the given strength (the largest amount any channel is moved by, in
+#   either direction), as an int64 array limited to 0-255
+def orderedDither(frameArray, strength):
+    height, width = frameArray.shape[0], frameArray.shape[1]
+    thresholds = numpy.tile(BAYER_MATRIX, ((height + 7) // 8, (width + 7) // 8))[:height, :width]
+    offsets = ((thresholds + 0.5) / 64 - 0.5) * (2 * strength)
+    return numpy.clip(numpy.rint(frameArray[..., :3] + offsets[..., numpy.newaxis]), 0, 255).astype(numpy.int64)
+
+
+# Remaps a frame to the global palette, returning the palette index of every pixel as a uint8 array of shape
+#   (height, width). If ditherStrength is above 0, the frame is first dithered by orderedDither()
+# Runs on the worker processes used by remapFrames(), so depends on nothing but its arguments
+def remapFrame(frameArray, palette, ditherStrength=0):
+    if ditherStrength > 0:
+        frameArray = orderedDither(frameArray, ditherStrength)
+    else:
+        frameArray = numpy.asarray(frameArray, dtype=numpy.int64)[..., :3]
+    index = hypnic_palettes.getPaletteIndex(numpy.asarray(palette, dtype=numpy.int64))
+    # Each distinct color of the frame is only looked up once
+    colors, inverse = hypnic_vectorized.uniqueColors(frameArray)
+    return hypnic_palettes.closestPaletteIndices(index, colors[0]).astype(numpy.uint8)[inverse]
+
+
+# Remaps the frames of frameStore with the given frame numbers to the global palette, yielding (frameNumber, indices)
+#   for each distinct frame number in order of first appearance
+# If executor is given, frames are remapped on it in parallel, with at most maxPending of them handed over at once so
+#   that the frames waiting to be written never all have to be held in memory. Results are still yielded in order
+def remapFrames(frameStore, frameNumbers, palette, ditherStrength=0, executor=None, maxPending=8):
+    frameNumbers = list(dict.fromkeys(frameNumbers))
+    if executor is None:
+        for frameNumber in frameNumbers:
+            yield frameNumber, remapFrame(frameStore.get(frameNumber), palette, ditherStrength)
+        return
+
+    pending = []
+    for frameNumber in frameNumbers:
+        if len(pending) >= maxPending:
+            doneNumber, future = pending.pop(0)
+            yield doneNumber, future.result()
+        frameArray = numpy.asarray(frameStore.get(frameNumber))
+        pending.append((frameNumber, executor.submit(remapFrame, frameArray, palette, ditherStrength)))
+    for doneNumber, future in pending:
+        yield doneNumber, future.result()
@@ -0,0 +1,82 @@
+# TODO:
+#  ==============================================================================
+#  S. The random values given to any pixel must depend only on the root seed, the key of the stream, and the pixel's
+#     position, and NEVER on how the image was split up or how many workers there were, or on the order they ran in
+#  ==============================================================================
+#  A. Values are drawn for every pixel of each block that a region overlaps, so a region much smaller than a block
+#     still pays for the whole block
+
+__name__ = "hypnic_random"
+
+# Library Imports
+import numpy
+
+
+# R A N D O M   S T R E A M   C O N V E N T I O N S
+# Every random value is drawn from a stream, which is a numpy Generator built on the counter-based Philox bit generator
+# A stream is named by a key, which is a tuple of non-negative integers such as (frame, variant), and is seeded by the
+#   numpy SeedSequence of the root seed spawned along that key (the same as SeedSequence(rootSeed).spawn() would give
+#   for the same path of children), so that streams with different keys are independent of one another and a stream
+#   can be rebuilt by any worker from its key alone
+# A plane is an array of random values for every pixel of a region, with shape (height, width) or
+#   (height, width, channels), where a region is an (x0, y0, x1, y1) rectangle as in hypnic_tiles.py
+# The image is split into blocks of BLOCK_SIZE x BLOCK_SIZE pixels, counted from its top-left corner, and every block has
+#   its own stream (keyed by the plane's key followed by the block's row and column). The values of a plane are those of
+#   the blocks it overlaps, which makes them the same no matter how a frame is split into tiles
+
+# The seed that every stream is spawned from
+ROOT_SEED = 333
+
+# The width and height (in pixels) of the blocks which each have their own stream
+BLOCK_SIZE = 256
+
+
+# Sets the seed that every stream is spawned from
+def setRootSeed(seed):
+    global ROOT_SEED
+    ROOT_SEED = int(seed)
+
+
+# Returns the stream with the given key (see R A N D O M   S T R E A M   C O N V E N T I O N S)
+def getStream(key):
+    seedSequence = numpy.random.SeedSequence(ROOT_SEED, spawn_key=tuple(int(k) for k in key))
+    return numpy.random.Generator(numpy.random.Philox(seedSequence))
+
+
+# Returns the plane of a whole block, drawing every value of it in one call
+# kind is "uniform" for floats in [0, 1), or "byte" for integers between 0 and 255 inclusive
+def _blockPlane(key, blockRow, blockCol, channels, kind):
+    stream = getStream(tuple(key) + (blockRow, blockCol))
+    shape = (BLOCK_SIZE, BLOCK_SIZE) if channels is None else (BLOCK_SIZE, BLOCK_SIZE, channels)
+    if kind == "uniform":
+        return stream.random(shape)
+    if kind == "byte":
+        return stream.integers(0, 256, shape, dtype=numpy.uint8)
+    raise ValueError("Unknown kind of random plane: " + str(kind))
+
+
+# Returns the plane of region for the stream with the given key (see R A N D O M   S T R E A M   C O N V E N T I O N S)
+# channels is the number of values per pixel, or None for a single one (giving a plane of shape (height, width))
+def randomPlane(key, region, channels=None, kind="uniform"):
+    x0, y0, x1, y1 = region
+    shape = (y1 - y0, x1 - x0) if channels is None else (y1 - y0, x1 - x0, channels)
+    plane = numpy.empty(shape, dtype=numpy.float64 if kind == "uniform" else numpy.uint8)
+    for blockRow in range(y0 // BLOCK_SIZE, (y1 + BLOCK_SIZE - 1) // BLOCK_SIZE):
+        for blockCol in range(x0 // BLOCK_SIZE, (x1 + BLOCK_SIZE - 1) // BLOCK_SIZE):
+            blockX = blockCol * BLOCK_SIZE
+            blockY = blockRow * BLOCK_SIZE
+            # The part of the region which falls within this block
+            bx0, by0 = max(x0, blockX), max(y0, blockY)
+            bx1, by1 = min(x1, blockX + BLOCK_SIZE), min(y1, blockY + BLOCK_SIZE)
+            block = _blockPlane(key, blockRow, blockCol, channels, kind)
+            plane[by0 - y0:by1 - y0, bx0 - x0:bx1 - x0] = block[by0 - blockY:by1 - blockY, bx0 - blockX:bx1 - blockX]
+    return plane
+
+
+# Returns an int64 array of shape (height, width, 3) holding a random color for every pixel of region, like
+#   hypnic_helpers.getRandomRGB(r, g, b) gives for a single pixel: each channel is a random value between 0 and 255
+#   inclusive if its flag is 1, or 0 otherwise
+def randomRGBPlane(key, region, r=1, g=1, b=1):
+    colors = randomPlane(key, region, 3, "byte").astype(numpy.int64)
+    colors[..., [flag != 1 for flag in (r, g, b)]] = 0
+    return colors
@@ -0,0 +1,85 @@
+# TODO:
+#  ==============================================================================
+#  S. Splitting a manipulation into tiles must never change its output. Only manipulations which declare a footprint
+#     (see ImageManipulator.manipulationFootprint()) may be tiled, and each tile must be given every pixel that the
+#     manipulation could read while producing it
+#  ==============================================================================
+#  A. Tiles are currently rectangles of equal size, which balances poorly when some areas of an image are much more
+#     expensive to manipulate than others
+
+__name__ = "hypnic_tiles"
+
+# Library Imports
+import concurrent.futures
+import multiprocessing
+import os
+
+
+# T I L E   C O N V E N T I O N S
+# Every region and tile is an (x0, y0, x1, y1) rectangle of pixels, where x1 and y1 are exclusive
+# A tile's "halo" is the extra border of pixels around it which a manipulation reads from but doesn't write to
+# The footprint of a manipulation is the width of the halo it needs, which is 0 for anything that only depends on a
+#   pixel's own color and coordinates, and searchDistance for the neighborhood functions
+
+
+# Splits region into tiles no larger than tileSize x tileSize, in row-by-row order from top left to bottom right
+# Returns an empty list for an empty region
+def splitIntoTiles(region, tileSize):
+    x0, y0, x1, y1 = region
+    tiles = []
+    for tileY in range(y0, y1, tileSize):
+        for tileX in range(x0, x1, tileSize):
+            tiles.append((tileX, tileY, min(tileX + tileSize, x1), min(tileY + tileSize, y1)))
+    return tiles
+
+
+# Extends tile by footprint pixels in every direction, without going beyond the edges of an xRes x yRes image
+def addHalo(tile, footprint, xRes, yRes):
+    x0, y0, x1, y1 = tile
+    return (max(x0 - footprint, 0), max(y0 - footprint, 0), min(x1 + footprint, xRes), min(y1 + footprint, yRes))
+
+
+# Same as addHalo(), but the halo always starts on an even row and column
+# Neighborhoods which extend on every side of a pixel (positiveOnly=False) round half-way coordinates to even, so they
+#   only cover the same pixels within an area cut out of the image when it starts on an even coordinate
+def addEvenHalo(tile, footprint, xRes, yRes):
+    x0, y0, x1, y1 = addHalo(tile, footprint, xRes, yRes)
+    return (x0 - x0 % 2, y0 - y0 % 2, x1, y1)
+
+
+# Returns the smallest rectangle containing every one of rectangles, or None if there are none
+def boundingRectangle(rectangles):
+    if len(rectangles) == 0:
+        return None
+    return (min(rectangle[0] for rectangle in rectangles), min(rectangle[1] for rectangle in rectangles),
+            max(rectangle[2] for rectangle in rectangles), max(rectangle[3] for rectangle in rectangles))
+
+
+# Returns the number of workers to use when numWorkers isn't set, which is one per CPU core
+def defaultNumWorkers():
+    return os.cpu_count() or 1
+
+
+# Creates the pool on which tiles are run
+# kind is either "thread" or "process". Threads share memory but only run in parallel while the work being done
+#   releases the GIL (as large NumPy operations do), while processes always run in parallel but every tile and its
+#   result has to be copied between them
+# initializer(*initargs) is called once within every new process, and is ignored for threads
+# Processes are always started fresh ("spawn") rather than forked, as they are on Windows, since forking a process
+#   which is already running other threads (such as those of numba) can leave the new process deadlocked
+def createExecutor(kind, numWorkers=None, initializer=None, initargs=()):
+    if numWorkers is None:
+        numWorkers = defaultNumWorkers()
+    if kind == "thread":
+        return concurrent.futures.ThreadPoolExecutor(max_workers=numWorkers)
+    elif kind == "process":
+        return concurrent.futures.ProcessPoolExecutor(max_workers=numWorkers,
+                                                      mp_context=multiprocessing.get_context("spawn"),
+                                                      initializer=initializer, initargs=initargs)
+    raise ValueError("Unknown tile executor \"" + str(kind) + "\", expected \"thread\" or \"process\"")
+
+
+# Calls function(*args) on executor for every tuple of args within argsList, and returns the results in the same order
+def mapTiles(executor, function, argsList):
+    futures = [executor.submit(function, *args) for args in argsList]
+    return [future.result() for future in futures]
@@ -0,0 +1,561 @@
+# TODO:
+#  ==============================================================================
+#  S. Every function in this file must produce the exact same output as its per-pixel counterpart within
+#     hypnic1.ImageManipulator, down to the rounding behavior. If a counterpart changes, so must its twin in here
+#  ==============================================================================
+#  A. Only the functions which depend on nothing but a pixel's own color (plus simple parameters) exist so far
+
+__name__ = "hypnic_vectorized"
+
+# Library Imports
+import bisect
+import functools
+import numpy
+
+# Local Imports
+import hypnic_helpers
+import hypnic_palettes
+
+# The most neighbor values (summed over every pixel) which setToRankOfNeighbors() gathers at once, for each of R, G, and
+#   B. Keeps the memory used to sort them to a few hundred MB at most
+_RANK_VALUES_PER_CHUNK = 1 << 22
+
+# The most pixels which the HSV modification functions convert at once (see _inPixelChunks()). Their intermediate
+#   planes take about 150 bytes per pixel, so this keeps them to a few dozen MB however large the image is
+_HSV_PIXELS_PER_CHUNK = 1 << 18
+
+
+# A R R A Y   C O N V E N T I O N S
+# Every function in this file works on an entire image (or a rectangular area of one) at the same time
+# "rgbArray" is always an integer numpy array of shape (height, width, 3), indexed as rgbArray[y, x]
+#   Returned arrays are of dtype int64 and are NOT limited to 0-255, just like the tuples returned by the per-pixel
+#   functions within hypnic1.ImageManipulator. Call toImageArray() before writing them to a PIL Image
+# Parameters which are described as "scalar or array" may either be a single number applied to every pixel, or an
+#   array of shape (height, width) providing a separate value for each pixel
+
+
+# Converts an array returned by any function in this file into a uint8 array which can be given to Image.fromarray()
+# Values are limited to 0-255 inclusive, which matches what PIL does when a per-pixel result is out of range
+def toImageArray(rgbArray):
+    return numpy.clip(rgbArray, 0, 255).astype(numpy.uint8)
+
+
+# COLOR PACKING
+
+# Packs every pixel's color into a single uint32 value of the form 0x00RRGGBB, so that colors can be compared, sorted,
+#   and counted as single numbers. Values must already be within 0-255
+def packColors(rgbArray):
+    rgbArray = numpy.asarray(rgbArray)
+    return (rgbArray[..., 0].astype(numpy.uint32) << 16) | \
+           (rgbArray[..., 1].astype(numpy.uint32) << 8) | \
+           rgbArray[..., 2].astype(numpy.uint32)
+
+
+# Reverses packColors(), returning an int64 array with one more dimension (of size 3) than packedArray
+def unpackColors(packedArray):
+    packedArray = numpy.asarray(packedArray, dtype=numpy.int64)
+    return numpy.stack(((packedArray >> 16) & 0xFF, (packedArray >> 8) & 0xFF, packedArray & 0xFF), axis=-1)
+
+
+# UNIQUE COLOR COMPACTION
+# A function which only depends on each pixel's own color gives the same result for every pixel of the same color, so
+#   for images with few distinct colors (such as palette-limited outputs or GIF frames) it's much quicker to apply it to
+#   each distinct color once and copy the results back out to every pixel
+
+# Returns (colors, inverse), where colors is an int64 array of shape (1, numColors, 3) holding every distinct color of
+#   rgbArray (itself an image one pixel tall), and inverse holds the index within colors of each pixel's color, such
+#   that colors[0][inverse] is equal to rgbArray. Values must already be within 0-255
+def uniqueColors(rgbArray):
+    uniquePacked, inverse = numpy.unique(packColors(rgbArray), return_inverse=True)
+    return (unpackColors(uniquePacked)[numpy.newaxis], inverse.reshape(numpy.shape(rgbArray)[:-1]))
+
+
+# Estimates the number of distinct colors in rgbArray divided by its number of pixels, from at most sampleSize pixels
+#   spread evenly throughout it (exact for images with no more than sampleSize pixels)
+# Images with few colors give a low estimate no matter how large they are, which is all this is used to detect
+def estimateUniqueColorRatio(rgbArray, sampleSize=65536):
+    packed = packColors(rgbArray).ravel()
+    sample = packed[::max(1, len(packed) // sampleSize)]
+    return len(numpy.unique(sample)) / max(len(sample), 1)
+
+
+# Returns function(rgbArray, *args) for any function which only depends on each pixel's own color, by applying it to
+#   each distinct color of rgbArray once and copying the results back out to every pixel
+def applyToUniqueColors(function, rgbArray, *args):
+    colors, inverse = uniqueColors(rgbArray)
+    return numpy.asarray(function(colors, *args))[0][inverse]
+
+
+# Applies a run of functions which only depend on each pixel's own color one after another, given as a list of
+#   (function, args) pairs. Colors are limited to 0-255 between functions, just as they would be if each result was
+#   written to an image before the next function read it back
+def applyInTurn(rgbArray, functions):
+    for function, args in functions:
+        rgbArray = numpy.clip(function(rgbArray, *args), 0, 255)
+    return rgbArray
+
+
+# HSV MODIFICATION
+
+# Wraps a function(rgbArray, *args) below so that it's applied to at most _HSV_PIXELS_PER_CHUNK pixels at a time, rather
+#   than converting the whole image to HSV (and back) at once. Parameters which are arrays (one value per pixel) are
+#   split up along with the pixels, while scalars are passed to every chunk as they are
+# Pixels are taken in order regardless of the shape of rgbArray, so that images one pixel tall (such as those of
+#   uniqueColors()) are split up just as well as any other
+def _inPixelChunks(function):
+
+    @functools.wraps(function)
+    def chunkedFunction(rgbArray, *args):
+        shape = numpy.shape(rgbArray)[:-1]
+        numPixels = int(numpy.prod(shape))
+        if numPixels <= _HSV_PIXELS_PER_CHUNK:
+            return function(rgbArray, *args)
+        pixels = numpy.reshape(rgbArray, (numPixels, 3))
+        args = [numpy.reshape(numpy.broadcast_to(arg, shape), numPixels) if numpy.ndim(arg) else arg for arg in args]
+        out = numpy.empty((numPixels, 3), dtype=numpy.int64)
+        for p0 in range(0, numPixels, _HSV_PIXELS_PER_CHUNK):
+            p1 = min(p0 + _HSV_PIXELS_PER_CHUNK, numPixels)
+            out[p0:p1] = function(pixels[p0:p1], *[arg[p0:p1] if numpy.ndim(arg) else arg for arg in args])
+        return out.reshape(shape + (3,))
+
+    return chunkedFunction
+
+
+# Swaps the Saturation and Value values for every pixel
+@_inPixelChunks
+def modFlipSV(rgbArray):
+    h, s, v = hypnic_helpers.fromRGBtoHSVArray(rgbArray)
+    return hypnic_helpers.fromHSVtoRGBArray(h, v, s)
+
+
+# Moves Saturation and Value values closer together by a given percentage factor of their difference
+# See ImageManipulator.modSlideSV() for details. Pixels with equal S and V are returned untouched, as they are there
+@_inPixelChunks
+def modSlideSV(rgbArray, factor):
+    h, s, v = hypnic_helpers.fromRGBtoHSVArray(rgbArray)
+    # Written with the same operator order as the per-pixel version, since (a * b) % 1 != a * (b % 1)
+    offset = (numpy.abs(v - s) * (float(factor) / 2)) % 1
+    sOut = numpy.where(s < v, s + offset, s - offset)
+    vOut = numpy.where(s < v, v - offset, v + offset)
+
+    rgbOut = hypnic_helpers.fromHSVtoRGBArray(h, sOut, vOut)
+    unchanged = (s == v)
+    rgbOut[unchanged] = rgbArray[unchanged]
+    return rgbOut
+
+
+# Shifts the Hue value by a given number of degrees
+# shift may be a scalar or an array
+@_inPixelChunks
+def modHueShift(rgbArray, shift):
+    h, s, v = hypnic_helpers.fromRGBtoHSVArray(rgbArray)
+    return hypnic_helpers.fromHSVtoRGBArray((h + shift) % 360, s, v)
+
+
+# Shifts the Saturation value by a given amount
+# shift may be a scalar or an array
+@_inPixelChunks
+def modSaturationShift(rgbArray, shift):
+    h, s, v = hypnic_helpers.fromRGBtoHSVArray(rgbArray)
+    return hypnic_helpers.fromHSVtoRGBArray(h, (s + shift) % 1, v)
+
+
+# Shifts the Value value by a given amount
+# shift may be a scalar or an array
+@_inPixelChunks
+def modValueShift(rgbArray, shift):
+    h, s, v = hypnic_helpers.fromRGBtoHSVArray(rgbArray)
+    return hypnic_helpers.fromHSVtoRGBArray(h, s, (v + shift) % 1)
+
+
+# Sets the Saturation value to a multiple of its previous value
+# multiple may be a scalar or an array
+@_inPixelChunks
+def modSaturationMultiple(rgbArray, multiple):
+    h, s, v = hypnic_helpers.fromRGBtoHSVArray(rgbArray)
+    return hypnic_helpers.fromHSVtoRGBArray(h, (s * multiple) % 1, v)
+
+
+# Sets the Value value to a multiple of its previous value
+# multiple may be a scalar or an array
+@_inPixelChunks
+def modValueMultiple(rgbArray, multiple):
+    h, s, v = hypnic_helpers.fromRGBtoHSVArray(rgbArray)
+    return hypnic_helpers.fromHSVtoRGBArray(h, s, (v * multiple) % 1)
+
+
+# RGB MODIFICATION
+
+# Rotates the R/G/B values of every pixel by 1
+def modRotate1RGB(rgbArray):
+    return rgbArray[..., [1, 2, 0]].astype(numpy.int64)
+
+
+# Rotates the R/G/B values of every pixel by 2
+def modRotate2RGB(rgbArray):
+    return rgbArray[..., [2, 0, 1]].astype(numpy.int64)
+
+
+# Swaps the R and B values of every pixel
+def modFlipRGB(rgbArray):
+    return rgbArray[..., [2, 1, 0]].astype(numpy.int64)
+
+
+# Swaps the G and B values of every pixel
+def modFlipRotate1RGB(rgbArray):
+    return rgbArray[..., [0, 2, 1]].astype(numpy.int64)
+
+
+# Swaps the R and G values of every pixel
+def modFlipRotate2RGB(rgbArray):
+    return rgbArray[..., [1, 0, 2]].astype(numpy.int64)
+
+
+# Array version of ImageManipulator.calcFromCustomDomainRGB()
+# valArray is an array of R, G, or B values (for example rgbArray[..., 2]) and the result has the same shape
+def calcFromCustomDomainRGB(valArray, lowerBound, upperBound, yIntBelow, slopeBelow, yIntAbove, slopeAbove):
+    valIn = valArray.astype(numpy.float64)
+    valOut = numpy.where(valIn <= lowerBound,
+                         valIn + (slopeBelow * (valIn - lowerBound) + yIntBelow),
+                         numpy.where(valIn >= upperBound,
+                                     valIn + (slopeAbove * (upperBound - valIn) + yIntAbove),
+                                     valIn))
+    return numpy.rint(valOut % 255).astype(numpy.int64)
+
+
+# PALETTE MATCHING
+# These are array versions of the ImageManipulator.limitColorsBy*() functions
+# colorList is a non-empty list of RGB tuples, and colorListHSV (only needed to match by H, S, or V) holds the HSV tuple
+#   of each element of colorList
+# When several colors are equally close, the one which appears LAST in colorList is chosen, as it is per-pixel
+# Rather than checking every member of colorList for every pixel, the members are first sorted (or laid out in a table
+#   over every value a pixel can have) once per call, and each pixel is then matched with a single lookup
+
+# Returns the index (within colorList) of the closest match for every pixel, given a plane of per-pixel values and the
+#   matching value of each palette color
+def _matchClosestValue(valuePlane, paletteValues):
+    bestDist = numpy.full(numpy.shape(valuePlane), numpy.inf)
+    bestIndex = numpy.zeros(numpy.shape(valuePlane), dtype=numpy.int64)
+    for n, paletteValue in enumerate(paletteValues):
+        dist = numpy.abs(paletteValue - valuePlane)
+        closer = dist <= bestDist
+        bestDist[closer] = dist[closer]
+        bestIndex[closer] = n
+    return bestIndex
+
+
+# Returns a table holding the index (within colorList) of the closest match for each whole number from 0 up to (but not
+#   including) numValues, which a plane of such values can then be looked up from (table[valuePlane])
+def _closestValueTable(numValues, paletteValues):
+    return _matchClosestValue(numpy.arange(numValues), paletteValues)
+
+
+# Returns (keys, lastIndex), where keys are the distinct values of paletteValues in ascending order and lastIndex holds
+#   the index (within colorList) of the last palette color with each of them, for use by _matchClosestSorted()
+def _sortedValueKeys(paletteValues):
+    keys, inverse = numpy.unique(numpy.asarray(paletteValues, dtype=numpy.float64), return_inverse=True)
+    lastIndex = numpy.zeros(len(keys), dtype=numpy.int64)
+    numpy.maximum.at(lastIndex, inverse.ravel(), numpy.arange(len(paletteValues)))
+    return (keys, lastIndex)
+
+
+# Same as _matchClosestValue(), but searches through the sorted palette values (see _sortedValueKeys()) rather than
+#   checking all of them
+# Only the closest palette value below and above each pixel's value can be the closest match, and of several palette
+#   colors sharing the same value, only the last of them can be chosen
+# Assumes that no two different palette values are so close together that their distance from a pixel's value rounds
+#   to the same number, which holds for the H, S, and V values of any RGB color (which differ by at least 1 / 65025)
+def _matchClosestSorted(valuePlane, keys, lastIndex):
+    position = numpy.searchsorted(keys, valuePlane)
+    below = numpy.clip(position - 1, 0, len(keys) - 1)
+    above = numpy.clip(position, 0, len(keys) - 1)
+    belowDist = numpy.abs(keys[below] - valuePlane)
+    aboveDist = numpy.abs(keys[above] - valuePlane)
+    return numpy.where(belowDist < aboveDist, lastIndex[below],
+                       numpy.where(aboveDist < belowDist, lastIndex[above],
+                                   numpy.maximum(lastIndex[below], lastIndex[above])))
+
+
+# Same as _matchClosestSorted(), but for a single value, searching plain Python lists of the keys with bisect
+def _matchClosestSortedValue(value, keys, lastIndex):
+    position = bisect.bisect_left(keys, value)
+    below = min(max(position - 1, 0), len(keys) - 1)
+    above = min(position, len(keys) - 1)
+    belowDist = abs(keys[below] - value)
+    aboveDist = abs(keys[above] - value)
+    if belowDist < aboveDist:
+        return lastIndex[below]
+    if aboveDist < belowDist:
+        return lastIndex[above]
+    return max(lastIndex[below], lastIndex[above])
+
+
+# Returns the table used to match colors by their average value of R, G, and B (see limitColorsByAverageRGB()), holding
+#   the index (within colorList) of the member for each of the 766 possible sums of R, G, and B
+# Each member covers an equal range of averages, which includes its lower end but not its upper end, except that the
+#   last member also covers an average of exactly 255 (white)
+def _averageTable(numColors):
+    average = numpy.arange(766) / 3
+    table = numpy.full(766, numColors - 1, dtype=numpy.int64)
+    for n in range(numColors):
+        table[(average >= 255 * (n / numColors)) & (average < 255 * ((n + 1) / numColors))] = n
+    return table
+
+
+# Returns the matcher of the limitColorsBy*() function of this file called functionName (such as
+#   "limitColorsByMatchRGB") for the given color lists, which is a dictionary describing how each color is matched to a
+#   member of colorList. Its "key" is the value of a color that it's matched by, which is either:
+#   "R", "G", "B", "H", "V", or "sum": the R, G, B, or H value of a color, the largest of its R, G, and B values (which
+#       V only depends on), or the sum of its R, G, and B values (which its average only depends on). "table" holds the
+#       index of the member chosen for every possible value
+#   "S": the S value of a color, where "keys" and "lastIndex" are the sorted S values of colorListHSV (see
+#       _sortedValueKeys())
+#   "RGB": all of its R/G/B values, where "index" is an index of colorList (see hypnic_palettes.py)
+#   "HSV": its point within the HSV cylinder, where "index" is an index of the points of colorListHSV within it
+# A matcher only depends on the color lists, so it can be built once and then reused for every color matched to them,
+#   which is how the per-pixel versions within ImageManipulator match one color at a time
+def colorListMatcher(functionName, colorList, colorListHSV=None):
+    if functionName == "limitColorsByAverageRGB":
+        return {"key": "sum", "table": _averageTable(len(colorList))}
+    if functionName in ("limitColorsByMatchR", "limitColorsByMatchG", "limitColorsByMatchB"):
+        channel = "RGB".index(functionName[-1])
+        return {"key": functionName[-1], "table": _closestValueTable(256, [rgb[channel] for rgb in colorList])}
+    if functionName == "limitColorsByMatchH":
+        return {"key": "H", "table": _closestValueTable(360, [hsv[0] for hsv in colorListHSV])}
+    if functionName == "limitColorsByMatchS":
+        keys, lastIndex = _sortedValueKeys([hsv[1] for hsv in colorListHSV])
+        return {"key": "S", "keys": keys, "lastIndex": lastIndex}
+    if functionName == "limitColorsByMatchV":
+        return {"key": "V", "table": _matchClosestValue(numpy.arange(256) / 255, [hsv[2] for hsv in colorListHSV])}
+    if functionName == "limitColorsByMatchRGB":
+        return {"key": "RGB", "index": hypnic_palettes.getPaletteIndex(numpy.array(colorList, dtype=numpy.int64))}
+    if functionName == "limitColorsByMatchHSV":
+        h, s, v = (numpy.array(values) for values in zip(*colorListHSV))
+        return {"key": "HSV", "index": hypnic_palettes.getPaletteIndex(hypnic_helpers.fromHSVtoCylinderArray(h, s, v),
+                                                                        (-1, -1, 0), (1, 1, 1))}
+    raise ValueError("Unknown palette matching function: " + str(functionName))
+
+
+# Returns the index (within colorList) of the member which matcher (from colorListMatcher()) chooses for each of colors,
+#   an integer array of shape (..., 3), as an array of shape (...)
+def matchColors(matcher, colors):
+    colors = numpy.asarray(colors, dtype=numpy.int64)
+    key = matcher["key"]
+    if key in ("R", "G", "B"):
+        return matcher["table"][colors[..., "RGB".index(key)]]
+    if key == "V":
+        return matcher["table"][numpy.max(colors, axis=-1)]
+    if key == "sum":
+        return matcher["table"][colors[..., 0] + colors[..., 1] + colors[..., 2]]
+    if key == "RGB":
+        return hypnic_palettes.closestPaletteIndices(matcher["index"], colors.reshape(-1, 3)).reshape(colors.shape[:-1])
+
+    h, s, v = hypnic_helpers.fromRGBtoHSVArray(colors)
+    if key == "H":
+        return matcher["table"][h]
+    if key == "S":
+        return _matchClosestSorted(s, matcher["keys"], matcher["lastIndex"])
+    queries = hypnic_helpers.fromHSVtoCylinderArray(h, s, v).reshape(-1, 3)
+    return hypnic_palettes.closestPaletteIndices(matcher["index"], queries).reshape(colors.shape[:-1])
+
+
+# Same as matchColors(), but for a single color (a tuple of its R, G, and B values), returning a single index
+# Used by the per-pixel versions within ImageManipulator, which match one color at a time. Nothing here calls numpy, as
+#   a numpy call costs far more than a single lookup: tables and sorted keys are read from plain Python lists copied
+#   from matcher the first time it's used, and palette indices are searched the same way (see
+#   hypnic_palettes.closestPaletteIndex())
+def matchColor(matcher, rgb):
+    if "lists" not in matcher:
+        matcher["lists"] = {name: matcher[name].tolist() for name in ("table", "keys", "lastIndex") if name in matcher}
+    lists = matcher["lists"]
+    key = matcher["key"]
+    if key in ("R", "G", "B"):
+        return lists["table"][rgb["RGB".index(key)]]
+    if key == "V":
+        return lists["table"][max(rgb[0], rgb[1], rgb[2])]
+    if key == "sum":
+        return lists["table"][rgb[0] + rgb[1] + rgb[2]]
+    if key == "RGB":
+        return hypnic_palettes.closestPaletteIndex(matcher["index"], rgb)
+
+    h, s, v = hypnic_helpers.fromRGBtoHSV(rgb)
+    if key == "H":
+        return lists["table"][h]
+    if key == "S":
+        return _matchClosestSortedValue(s, lists["keys"], lists["lastIndex"])
+    return hypnic_palettes.closestPaletteIndex(matcher["index"], hypnic_helpers.fromHSVtoCylinder((h, s, v)))
+
+
+# Sets every pixel's color to a member of colorList, sequentially based on its average value of R, G, and B
+# White (an average of exactly 255) is given the last member of colorList, as it is by every other backend
+# The average only depends on the sum of R, G, and B, so the member for each of the 766 possible sums is found first
+def limitColorsByAverageRGB(rgbArray, colorList):
+    indices = matchColors(colorListMatcher("limitColorsByAverageRGB", colorList), rgbArray)
+    return numpy.array(colorList, dtype=numpy.int64)[indices]
+
+
+# Sets every pixel's color to the member of colorList which is least distant from it, treating R, G, and B as the X, Y,
+#   and Z coordinates of a 3D grid
+# Searches through an index of the palette (see hypnic_palettes.py) rather than checking every member of colorList, and
+#   only searches once for each distinct color of rgbArray
+def limitColorsByMatchRGB(rgbArray, colorList):
+    palette = numpy.array(colorList, dtype=numpy.int64)
+    matcher = colorListMatcher("limitColorsByMatchRGB", colorList)
+    if matcher["index"]["kind"] == "cube":
+        return palette[matchColors(matcher, rgbArray)]
+    colors, inverse = uniqueColors(rgbArray)
+    return palette[matchColors(matcher, colors[0])][inverse]
+
+
+# Sets every pixel's color to the member of colorList which is least distant from it within the HSV cylinder (see
+#   hypnic_helpers.fromHSVtoCylinder()), where H is the angle around the cylinder
+def limitColorsByMatchHSV(rgbArray, colorList, colorListHSV):
+    palette = numpy.array(colorList, dtype=numpy.int64)
+    colors, inverse = uniqueColors(rgbArray)
+    matcher = colorListMatcher("limitColorsByMatchHSV", colorList, colorListHSV)
+    return palette[matchColors(matcher, colors[0])][inverse]
+
+
+# Sets every pixel's color to the member of colorList with the closest R value
+def limitColorsByMatchR(rgbArray, colorList):
+    indices = matchColors(colorListMatcher("limitColorsByMatchR", colorList), rgbArray)
+    return numpy.array(colorList, dtype=numpy.int64)[indices]
+
+
+# Sets every pixel's color to the member of colorList with the closest G value
+def limitColorsByMatchG(rgbArray, colorList):
+    indices = matchColors(colorListMatcher("limitColorsByMatchG", colorList), rgbArray)
+    return numpy.array(colorList, dtype=numpy.int64)[indices]
+
+
+# Sets every pixel's color to the member of colorList with the closest B value
+def limitColorsByMatchB(rgbArray, colorList):
+    indices = matchColors(colorListMatcher("limitColorsByMatchB", colorList), rgbArray)
+    return numpy.array(colorList, dtype=numpy.int64)[indices]
+
+
+# Sets every pixel's color to the member of colorList with the closest H value
+def limitColorsByMatchH(rgbArray, colorList, colorListHSV):
+    indices = matchColors(colorListMatcher("limitColorsByMatchH", colorList, colorListHSV), rgbArray)
+    return numpy.array(colorList, dtype=numpy.int64)[indices]
+
+
+# Sets every pixel's color to the member of colorList with the closest S value
+def limitColorsByMatchS(rgbArray, colorList, colorListHSV):
+    indices = matchColors(colorListMatcher("limitColorsByMatchS", colorList, colorListHSV), rgbArray)
+    return numpy.array(colorList, dtype=numpy.int64)[indices]
+
+
+# Sets every pixel's color to the member of colorList with the closest V value
+# V only depends on the largest of R, G, and B, so the member for each of the 256 possible V values is found first
+def limitColorsByMatchV(rgbArray, colorList, colorListHSV):
+    indices = matchColors(colorListMatcher("limitColorsByMatchV", colorList, colorListHSV), rgbArray)
+    return numpy.array(colorList, dtype=numpy.int64)[indices]
+
+
+# NEIGHBORHOOD FUNCTIONS
+
+# Returns two arrays holding the (lowest, highest + 1) coordinates of the neighbors of each element of coordinates,
+#   along an axis of size res
+# Identical to the way that ImageManipulator.setToAverageOfNeighbors() builds its xValues and yValues lists,
+#   including the rounding of halves to even when positiveOnly is False and searchDistance is odd
+def neighborRanges(coordinates, res, searchDistance, positiveOnly):
+    coordinates = numpy.asarray(coordinates, dtype=numpy.int64)
+    if positiveOnly:
+        lo = coordinates
+        hi = coordinates + searchDistance + 1
+    else:
+        lo = numpy.rint(coordinates - searchDistance / 2).astype(numpy.int64)
+        hi = numpy.rint(coordinates + searchDistance / 2 + 1).astype(numpy.int64)
+    return (numpy.clip(lo, 0, res), numpy.clip(hi, 0, res))
+
+
+# Builds a summed-area table (also known as an integral image) of rgbArray
+# table[y, x] holds the per-channel sum of every pixel above and to the left of (x, y), excluding row y and column x,
+#   so the table has one more row and one more column than rgbArray
+# Sums are stored as uint32 and are allowed to wrap around. Because the sum of any area is found by adding and
+#   subtracting table values, the wrapped result is still exact for any area whose true sum fits within 32 bits
+#   (any area of up to 16 million pixels), while the table takes half the memory of an int64 one
+def summedAreaTable(rgbArray):
+    height, width = rgbArray.shape[0], rgbArray.shape[1]
+    table = numpy.zeros((height + 1, width + 1, 3), dtype=numpy.uint32)
+    numpy.cumsum(rgbArray, axis=0, dtype=numpy.uint32, out=table[1:, 1:])
+    numpy.cumsum(table[1:, 1:], axis=1, dtype=numpy.uint32, out=table[1:, 1:])
+    return table
+
+
+# Brings table (from summedAreaTable()) up to date in place, after the pixels within region of rgbArray have changed
+# Only the part of the table below and to the right of the top left corner of region depends on those pixels, so only
+#   that part is rebuilt, from the unchanged row and column of the table just above and to the left of it
+def updateSummedAreaTable(table, rgbArray, region):
+    x0, y0 = region[0], region[1]
+    part = table[y0 + 1:, x0 + 1:]
+    numpy.cumsum(rgbArray[y0:, x0:], axis=0, dtype=numpy.uint32, out=part)
+    numpy.cumsum(part, axis=1, dtype=numpy.uint32, out=part)
+    # Any wrapping around of these uint32 sums cancels out, as described in summedAreaTable()
+    part += table[y0 + 1:, x0:x0 + 1]
+    part += table[y0:y0 + 1, x0 + 1:]
+    part -= table[y0, x0]
+    return table
+
+
+# Returns the per-channel sums of the rectangles spanning xLo <= x < xHi and yLo <= y < yHi, using a table from
+#   summedAreaTable(). The coordinate arrays must broadcast against each other (for example (height, 1) and (1, width))
+def summedAreaSums(table, xLo, xHi, yLo, yHi):
+    total = table[yHi, xHi].astype(numpy.int64) - table[yLo, xHi] - table[yHi, xLo] + table[yLo, xLo]
+    # Undoes any wrapping around of the uint32 sums, as described in summedAreaTable()
+    return total & 0xFFFFFFFF
+
+
+# Sets every pixel's color to be the average of all of its neighbors, on an RGB basis
+# Works in constant time per pixel, regardless of searchDistance, by reading from a table built by summedAreaTable()
+# region is an (x0, y0, x1, y1) rectangle of pixels to manipulate, where x1 and y1 are exclusive
+# The table must be of the image which ImageManipulator.setToAverageOfNeighbors() would read from
+def setToAverageOfNeighbors(table, region, searchDistance=1, positiveOnly=True):
+    x0, y0, x1, y1 = region
+    yRes, xRes = table.shape[0] - 1, table.shape[1] - 1
+    xLo, xHi = neighborRanges(numpy.arange(x0, x1), xRes, searchDistance, positiveOnly)
+    yLo, yHi = neighborRanges(numpy.arange(y0, y1), yRes, searchDistance, positiveOnly)
+    xLo, xHi = xLo[numpy.newaxis, :], xHi[numpy.newaxis, :]
+    yLo, yHi = yLo[:, numpy.newaxis], yHi[:, numpy.newaxis]
+
+    totals = summedAreaSums(table, xLo, xHi, yLo, yHi)
+    numNeighbors = ((xHi - xLo) * (yHi - yLo))[..., numpy.newaxis]
+    return numpy.rint(totals / numNeighbors).astype(numpy.int64)
+
+
+# Sets each of the R, G, and B values of every pixel to the value found at a given rank among its neighbors' values,
+#   at index round(rank * (numNeighbors - 1)) of the sorted values, just as in ImageManipulator.setToRankOfNeighbors()
+# region is an (x0, y0, x1, y1) rectangle of pixels to manipulate, where x1 and y1 are exclusive
+# The values of every pixel's neighbors are gathered into a list of their own and sorted. Neighborhoods cut short by
+#   the edge of the image are padded out with 256, which sorts after every real value and so is never chosen
+def setToRankOfNeighbors(sourceArray, region, rank, searchDistance=1, positiveOnly=True):
+    x0, y0, x1, y1 = region
+    yRes, xRes = sourceArray.shape[0], sourceArray.shape[1]
+    xLo, xHi = neighborRanges(numpy.arange(x0, x1), xRes, searchDistance, positiveOnly)
+    yLo, yHi = neighborRanges(numpy.arange(y0, y1), yRes, searchDistance, positiveOnly)
+    numNeighbors = (yHi - yLo)[:, numpy.newaxis] * (xHi - xLo)[numpy.newaxis, :]
+    target = numpy.rint(rank * (numNeighbors - 1)).astype(numpy.int64)
+
+    # Only the area which the neighborhoods cover is copied, with one extra row and column of padding
+    readX0, readY0, readX1, readY1 = int(xLo.min()), int(yLo.min()), int(xHi.max()), int(yHi.max())
+    area = numpy.full((readY1 - readY0 + 1, readX1 - readX0 + 1, 3), 256, dtype=numpy.int16)
+    area[:-1, :-1] = sourceArray[readY0:readY1, readX0:readX1]
+    # The position (within area) of every neighbor along each axis, where positions past the end of a neighborhood
+    #     point at the padding instead
+    width, height = int((xHi - xLo).max()), int((yHi - yLo).max())
+    xIndex = xLo[:, numpy.newaxis] + numpy.arange(width)
+    xIndex = numpy.where(xIndex < xHi[:, numpy.newaxis], xIndex - readX0, area.shape[1] - 1)
+    yIndex = yLo[:, numpy.newaxis] + numpy.arange(height)
+    yIndex = numpy.where(yIndex < yHi[:, numpy.newaxis], yIndex - readY0, area.shape[0] - 1)
+
+    out = numpy.empty((y1 - y0, x1 - x0, 3), dtype=numpy.int64)
+    rowsPerChunk = max(1, _RANK_VALUES_PER_CHUNK // max((x1 - x0) * width * height, 1))
+    for j0 in range(0, y1 - y0, rowsPerChunk):
+        j1 = min(j0 + rowsPerChunk, y1 - y0)
+        # Shaped (rows, height, columns, width, 3), then laid out as one list of neighbors per pixel
+        values = area[yIndex[j0:j1, :, numpy.newaxis, numpy.newaxis], xIndex[numpy.newaxis, numpy.newaxis, :, :]]
+        values = values.transpose(0, 2, 1, 3, 4).reshape(j1 - j0, x1 - x0, height * width, 3)
+        values.sort(axis=2)
+        out[j0:j1] = numpy.take_along_axis(values, target[j0:j1, :, numpy.newaxis, numpy.newaxis], axis=2)[:, :, 0]
+    return out
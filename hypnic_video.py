@@ -0,0 +1,107 @@
+# TODO:
+#  ==============================================================================
+#  S. Each frame is shown for exactly as long as its run of repeats within the animation, including the last one, so
+#     the video lasts exactly as long as every frame of the animation shown at the video's frame rate
+#  ==============================================================================
+#  A. Containers without per-frame timestamps (such as AVI) can't hold a variable frame rate, so repeats are only
+#     collapsed for containers which can, such as MP4 and MKV
+#  B. The timestamps are handed to ffmpeg as a single expression on its command line, which grows with the number of
+#     times the length of a run changes, so an animation whose runs change length thousands of times could run into the
+#     limit on the length of a command line (about 32,000 characters on Windows)
+
+__name__ = "hypnic_video"
+
+# Library Imports
+from pathlib import Path
+import numpy
+# imageio-ffmpeg (which comes with its own copy of the ffmpeg binary) is only required when creating a video
+try:
+    import imageio_ffmpeg
+except ImportError:
+    imageio_ffmpeg = None
+
+# Local Imports
+import hypnic_frames
+
+
+# V I D E O   W R I T E R   C O N V E N T I O N S
+# Videos are written by piping raw RGB frames straight from a FrameStore (see hypnic_frames.py) into an ffmpeg process,
+#   one at a time, so no temporary image files are written and only the frame being sent is ever held in memory. The
+#   pipe blocks whenever ffmpeg falls behind, which keeps the amount of memory used bounded no matter how long the
+#   video is
+# Each run of the same frame number (see hypnic_frames.collapseRepeats()) is sent as a single frame, which ffmpeg gives
+#   the timestamp at which the run starts (counted in frames at framesPerSecond), so it's shown until the next run
+#   starts rather than being encoded over and over. The last run's frame is then sent once more, at the time at which
+#   the run ends, so that the video ends there too rather than a single frame after the last run starts
+# B-frames are turned off for these, as containers such as MP4 work out how long each frame is shown from the order in
+#   which frames are decoded, which B-frames (with timestamps this uneven) throw off
+# Containers which can't hold per-frame timestamps (see CONSTANT_RATE_EXTENSIONS) are instead sent every repeat of
+#   every frame, at a constant framesPerSecond
+# Frames with an odd width or height are padded by a single row or column, as the usual yuv420p output can't hold them
+
+# The extensions of the containers which can't hold per-frame timestamps, and so are always written at a constant rate
+CONSTANT_RATE_EXTENSIONS = (".avi", ".y4m")
+# The filter applied by ffmpeg to every frame, padding odd sizes
+PAD_FILTER = "pad=ceil(iw/2)*2:ceil(ih/2)*2"
+
+
+# Returns whether videos can be written, which requires the imageio-ffmpeg package
+def isAvailable():
+    return imageio_ffmpeg is not None
+
+
+# Returns whether the container of a video at path can hold per-frame timestamps (see CONSTANT_RATE_EXTENSIONS)
+def holdsTimestamps(path):
+    return Path(path).suffix.lower() not in CONSTANT_RATE_EXTENSIONS
+
+
+# Returns the setpts expression giving frame N (from 0) of those sent the timestamp at which it's first shown, where
+#   lengths holds the number of frames at the input frame rate for which each frame sent is shown. The frame sent after
+#   the last of them is given the time at which the last one ends
+# The timestamp of frame N is the sum of lengths[:N], which is found as a sum of ramps (one starting wherever the length
+#   changes) so that the expression only grows with the number of changes rather than with the number of frames
+def timestampExpression(lengths):
+    terms = []
+    previousLength = 0
+    for n, length in enumerate(lengths):
+        if length != previousLength:
+            terms.append("(" + str(length - previousLength) + ")*max(N-" + str(n) + ",0)")
+            previousLength = length
+    return "(" + "+".join(terms) + ")/(FRAME_RATE*TB)"
+
+
+# Writes a video at path showing the frames of frameStore given by frameNumbers in order, at framesPerSecond
+# codec is the name of an ffmpeg encoder (such as "libx264"), or None for ffmpeg's default for the container
+# quality is between 0 and 10 (as used by imageio-ffmpeg), or None to leave it to the encoder
+def writeVideo(path, frameStore, frameNumbers, framesPerSecond, codec=None, quality=5):
+    runs = hypnic_frames.collapseRepeats(frameNumbers)
+    if len(runs) == 0:
+        return
+    firstFrame = frameStore.get(runs[0][0])
+    size = (firstFrame.shape[1], firstFrame.shape[0])
+
+    timestamps = holdsTimestamps(path)
+    if timestamps:
+        # Each frame is sent once and shown for as long as it's repeated, followed by the last frame at the end time
+        filters = PAD_FILTER + ",setpts='" + timestampExpression([count for frameNumber, count in runs]) + "'"
+        outputParameters = ["-vf", filters, "-fps_mode", "vfr", "-bf", "0"]
+    else:
+        outputParameters = ["-vf", PAD_FILTER, "-fps_mode", "cfr"]
+
+    writer = imageio_ffmpeg.write_frames(str(path), size, pix_fmt_in="rgb24", fps=framesPerSecond, codec=codec,
+                                         quality=quality, macro_block_size=1, output_params=outputParameters)
+    # Starts the ffmpeg process
+    writer.send(None)
+    try:
+        for frameNumber, count in runs:
+            frameBytes = numpy.ascontiguousarray(frameStore.get(frameNumber)[..., :3]).tobytes()
+            if timestamps:
+                writer.send(frameBytes)
+            else:
+                # Every repeat is sent as a frame of its own (as the same bytes, so it's never read or converted again)
+                for i in range(count):
+                    writer.send(frameBytes)
+        if timestamps:
+            writer.send(frameBytes)
+    finally:
+        writer.close()
@@ -0,0 +1,58 @@
+# TODO:
+#  ==============================================================================
+#  S. Every frame must look exactly as it would if it were encoded whole, in full color, so frames are only ever
+#     encoded losslessly
+#  ==============================================================================
+#  A. PIL is handed every distinct frame at once, and libwebp keeps every encoded frame in memory until the animation is
+#     assembled, so those frames (though not their repeats) and the finished WebP have to fit in memory
+#  B. This relies on PIL's animated WebP support, which is only present when PIL was built with libwebp
+
+__name__ = "hypnic_webp"
+
+# Library Imports
+import numpy
+from PIL import Image, features
+
+# Local Imports
+import hypnic_frames
+
+
+# W E B P   W R I T E R   C O N V E N T I O N S
+# Animated WebPs are written through PIL's own animated WebP support (Image.save() with save_all=True), which hands the
+#   frames to libwebp's animation encoder one at a time, each at the time (in milliseconds) at which it's first shown
+# Frames are encoded losslessly, in full color, so no palette is ever needed. libwebp itself finds the rectangle of
+#   pixels which changed since the frame before (the delta rectangle, as in hypnic_gif.py) and only encodes that, and
+#   adds the duration of any frame identical to the one before it to that frame instead of encoding it again
+# Runs of the same frame number are handed over just once, so libwebp never has to compare them
+
+# The keyframe interval used by libwebp's lossless animations (as used by gif2webp and PIL). At most every
+#   WEBP_MAX_KEYFRAME_INTERVAL frames, a frame is encoded whole, so that players can seek without decoding every frame
+#   since the start, and a frame may only be encoded whole if it's at least WEBP_MIN_KEYFRAME_INTERVAL frames since the
+#   last one
+WEBP_MIN_KEYFRAME_INTERVAL = 9
+WEBP_MAX_KEYFRAME_INTERVAL = 17
+
+
+# Returns whether animated WebPs can be written, which requires PIL to have been built with libwebp, including its
+#   animation encoder (without which PIL doesn't register a way of saving every frame of a WebP)
+def isAvailable():
+    Image.init()
+    return features.check_module("webp") and ("WEBP" in Image.SAVE_ALL)
+
+
+# Writes an animated WebP at path showing the frames of frameStore given by frameNumbers in order, each for
+#   secondsPerFrame seconds
+# method is between 0 (fastest) and 6 (smallest), and effort is between 0 and 100, where higher values spend more time
+#   looking for a smaller encoding. Neither changes the frames themselves
+def writeWebP(path, frameStore, frameNumbers, secondsPerFrame, loop=0, method=4, effort=80):
+    runs = hypnic_frames.collapseRepeats(frameNumbers)
+    if len(runs) == 0:
+        return
+    frames = [Image.fromarray(numpy.ascontiguousarray(frameStore.get(frameNumber)[..., :3])) for frameNumber, _ in runs]
+    durations = [secondsPerFrame * 1000 * count for _, count in runs]
+
+    # Opaque black background, without minimizing size (which would encode every frame in several ways) or mixing
+    #     lossy frames in with lossless ones
+    frames[0].save(path, "WEBP", save_all=True, append_images=frames[1:], duration=durations, loop=loop,
+                   lossless=True, quality=effort, method=method, background=(0, 0, 0, 255), minimize_size=False,
+                   allow_mixed=False, kmin=WEBP_MIN_KEYFRAME_INTERVAL, kmax=WEBP_MAX_KEYFRAME_INTERVAL)
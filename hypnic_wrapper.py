@@ -9,6 +9,7 @@ import random
 
 # Local Inputs
 import hypnic_gui
+import hypnic_random
 
 class HypnicWrapper():
 
@@ -30,6 +31,7 @@ def main():
 
     # Seeds the random number generator
     random.seed(333)
+    hypnic_random.setRootSeed(333)
 
     # Creates and launches the GUI instance
     app = HypnicWrapper()
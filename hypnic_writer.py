@@ -0,0 +1,74 @@
+# TODO:
+#  ==============================================================================
+#  S. Every image handed to an ImageWriter must be a snapshot which nothing else will change, since it is encoded later
+#     on another thread while manipulation carries on with the original
+#  ==============================================================================
+#  A. Errors raised while encoding or writing an image are only seen once wait() is called, rather than when it is
+#     written
+
+__name__ = "hypnic_writer"
+
+# Library Imports
+import concurrent.futures
+import threading
+
+
+# I M A G E   W R I T E R   C O N V E N T I O N S
+# An ImageWriter encodes and saves images on a pool of background threads, so that the next manipulation can start as
+#   soon as an image has been handed over instead of waiting for it to be written
+# PIL releases the GIL while encoding, so encoding overlaps with manipulation even though both run within one process
+# No more than maxPending images are ever waiting to be (or being) written. write() blocks until there is room for
+#   another, so that manipulating far more quickly than images can be written never holds every frame in memory at once
+# Anything which reads the written files (such as ImageManipulator.generateGIF()) must call wait() first
+
+
+class ImageWriter():
+
+    # numWorkers is the number of threads images are written on, and maxPending is the most images that may be waiting
+    #     to be (or being) written at once
+    # saveParameters are passed to every call of PIL.Image.save(), such as {"compress_level": 1} for quick PNGs or
+    #     {"quality": 90} for JPEGs
+    def __init__(self, numWorkers=2, maxPending=4, saveParameters=None):
+
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(numWorkers, 1))
+        # One slot for every image that may be pending, taken by write() and given back once the image is written
+        self.slots = threading.BoundedSemaphore(max(maxPending, 1))
+        self.saveParameters = dict(saveParameters or {})
+        # The futures of every image handed over since the last call of wait()
+        self.futures = []
+
+    # Saves image at path on a background thread, first waiting until fewer than maxPending images are pending
+    # image must not be changed afterwards (see S. above), so callers should pass a copy of anything still in use
+    def write(self, image, path):
+
+        self.slots.acquire()
+        try:
+            future = self.executor.submit(self.saveImage, image, path)
+        except BaseException:
+            self.slots.release()
+            raise
+        future.add_done_callback(lambda done: self.slots.release())
+        self.futures.append(future)
+        return future
+
+    # Encodes and saves a single image, on one of the background threads
+    def saveImage(self, image, path):
+
+        image.save(path, **self.saveParameters)
+        return path
+
+    # Waits until every image handed over so far has been written, raising the first error that any of them raised
+    def wait(self):
+
+        futures = self.futures
+        self.futures = []
+        for future in futures:
+            future.result()
+
+    # Waits until every image has been written, then stops the background threads
+    def close(self):
+
+        try:
+            self.wait()
+        finally:
+            self.executor.shutdown()
@@ -14,6 +14,10 @@ import PIL
 from PIL import Image, ImageTk
 from pathlib import Path
 import math
+import numpy
+
+# Local Imports
+import hypnic_numba
 
 class NumbaMathTiming():
 
@@ -33,3 +37,44 @@ class NumbaMathTiming():
         # OTHER TIMERS
         # List of all timers, initialized as containing only self.initTimer
         self.timers = [self.initTimer]
+
+        # Results of the most recent call of self.timeKernels()
+        # Each element is a tuple of (kernel name, seconds for the first call, seconds for the second call)
+        self.kernelTimings = []
+
+    # Times each of the compiled kernels within hypnic_numba.py on the image currently selected in the GUI
+    # Every kernel is called twice: the first call includes compilation (or loading from the cache) and the second
+    #   shows the time that every later call will take
+    # Returns self.kernelTimings as well, but the function will set the self.kernelTimings variable regardless
+    def timeKernels(self):
+
+        imageIndex = self.gui.controlBoxComboboxes[0].current()
+        sourceArray = numpy.asarray(self.gui.img.pilImages[imageIndex].convert("RGB"))
+        region = (0, 0, sourceArray.shape[1], sourceArray.shape[0])
+
+        # Pairs the name of each kernel with a function that calls it on the entire image
+        kernels = [("modHueShift", lambda: hypnic_numba.modHueShift(sourceArray, *region, 90)),
+                   ("modHueShiftByCoordinates", lambda: hypnic_numba.modHueShiftByCoordinates(sourceArray, *region)),
+                   ("modSaturationShift", lambda: hypnic_numba.modSaturationShift(sourceArray, *region, -0.3)),
+                   ("modValueShift", lambda: hypnic_numba.modValueShift(sourceArray, *region, 0.3)),
+                   ("modFlipSV", lambda: hypnic_numba.modFlipSV(sourceArray, *region)),
+                   ("modSlideSV", lambda: hypnic_numba.modSlideSV(sourceArray, *region, 0.5)),
+                   ("modRotate1RGB", lambda: hypnic_numba.modRotate1RGB(sourceArray, *region)),
+                   ("setToAverageOfNeighbors", lambda: hypnic_numba.setToAverageOfNeighbors(sourceArray, *region,
+                                                                                            4, True)),
+                   ("setToMostFrequentNeighbor", lambda: hypnic_numba.setToMostFrequentNeighbor(sourceArray, *region,
+                                                                                                4, True))]
+
+        self.kernelTimings = []
+        for name, call in kernels:
+            timeStart = default_timer()
+            call()
+            timeFirst = default_timer() - timeStart
+            timeStart = default_timer()
+            call()
+            timeSecond = default_timer() - timeStart
+            self.kernelTimings.append((name, timeFirst, timeSecond))
+            print("NumbaMathTiming.timeKernels(): " + name + " took " + str(round(timeFirst, 4)) +
+                  " seconds on the first call and " + str(round(timeSecond, 4)) + " seconds on the second call")
+
+        return self.kernelTimings